@@ -5,7 +5,6 @@ from flask_migrate import Migrate
 from config import config
 import os
 import logging
-import threading
 import time
 import contextlib
 
@@ -24,33 +23,56 @@ login_manager = LoginManager()
 logger = logging.getLogger(__name__)
 
 
-_ORG_SWITCHER_CONTEXT_CACHE: dict[tuple[int, int | None], tuple[float, dict]] = {}
-_ORG_SWITCHER_CONTEXT_CACHE_LOCK = threading.Lock()
+# Org switcher context lives in the shared cache (see app.services.cache_service) so
+# that invalidations reach every worker. Entries are keyed by a per-user generation
+# token; bumping the token invalidates all of that user's entries at once.
+_ORG_SWITCHER_CACHE_NAMESPACE = 'org_switcher'
+_ORG_SWITCHER_GENERATION_NAMESPACE = 'org_switcher_gen'
+_ORG_SWITCHER_GENERATION_TTL_SECONDS = 60 * 60 * 24 * 7
+
+
+def _org_switcher_generation(user_id: int) -> str:
+    """The user's current org switcher cache generation.
+
+    A missing (never set, expired or evicted) generation is replaced by a fresh one rather
+    than a constant, so entries cached under an earlier generation can never match again.
+    """
+    import uuid
+    from app.services.cache_service import cache_service
+
+    generation = cache_service.get(_ORG_SWITCHER_GENERATION_NAMESPACE, int(user_id))
+    if not generation:
+        generation = uuid.uuid4().hex
+        cache_service.set(
+            _ORG_SWITCHER_GENERATION_NAMESPACE,
+            int(user_id),
+            generation,
+            ttl_seconds=_ORG_SWITCHER_GENERATION_TTL_SECONDS,
+        )
+    return generation
 
 
 def invalidate_org_switcher_context_cache(user_id: int, org_id: int | None = None) -> None:
     """Invalidate cached org switcher/template context for a user.
 
     The org switcher context is intentionally cached (perf), but some actions
-    (like role changes) must reflect immediately in the UI.
+    (like role changes) must reflect immediately in the UI. All of the user's
+    entries (multi-org, None key, etc.) are dropped, not just ``org_id``.
     """
     try:
         user_id_int = int(user_id)
     except Exception:
         return
 
-    try:
-        org_id_int = int(org_id) if org_id is not None else None
-    except Exception:
-        org_id_int = None
+    import uuid
+    from app.services.cache_service import cache_service
 
-    with _ORG_SWITCHER_CONTEXT_CACHE_LOCK:
-        if org_id_int is not None:
-            _ORG_SWITCHER_CONTEXT_CACHE.pop((user_id_int, org_id_int), None)
-        # Also clear any other cached entries for this user (multi-org, None key, etc.)
-        keys_to_delete = [k for k in _ORG_SWITCHER_CONTEXT_CACHE.keys() if k[0] == user_id_int]
-        for k in keys_to_delete:
-            _ORG_SWITCHER_CONTEXT_CACHE.pop(k, None)
+    cache_service.set(
+        _ORG_SWITCHER_GENERATION_NAMESPACE,
+        user_id_int,
+        uuid.uuid4().hex,
+        ttl_seconds=_ORG_SWITCHER_GENERATION_TTL_SECONDS,
+    )
 
 
 def _maybe_enable_system_cert_store() -> None:
@@ -204,6 +226,13 @@ def create_app(config_name=None):
     # Initialize database extensions
     db.init_app(app)
     migrate.init_app(app, db)
+
+    # Session flush hooks that keep organization_stats in step with documents/memberships.
+    from app.services import org_stats  # noqa: F401
+
+    # Shared cache backend (memory / file / redis)
+    from app.services.cache_service import cache_service
+    cache_service.init_app(app)
     
     # Initialize logging system (Milestone 2)
     from app.services.logging_service import app_logger
@@ -523,15 +552,14 @@ def create_app(config_name=None):
 
             # Aggressive cache: 5 minutes instead of 30 seconds
             cache_seconds = int((app.config.get('ORG_SWITCHER_CACHE_SECONDS') or 300))
+            cache_key = None
             if cache_seconds > 0:
-                cache_key = (user_id, active_org_id)
-                now = time.monotonic()
-                with _ORG_SWITCHER_CONTEXT_CACHE_LOCK:
-                    cached = _ORG_SWITCHER_CONTEXT_CACHE.get(cache_key)
-                if cached:
-                    expires_at, payload = cached
-                    if now < expires_at:
-                        return payload
+                from app.services.cache_service import cache_service
+
+                cache_key = (user_id, active_org_id, _org_switcher_generation(user_id))
+                cached = cache_service.get(_ORG_SWITCHER_CACHE_NAMESPACE, cache_key)
+                if cached is not None:
+                    return cached
 
             from app.models import Organization, OrganizationMembership
 
@@ -635,14 +663,8 @@ def create_app(config_name=None):
                 'user_departments': [{'id': d.id, 'name': d.name} for d in (user_departments or [])],
             }
 
-            if cache_seconds > 0:
-                try:
-                    cache_key = (user_id, active_org_id)
-                    expires_at = time.monotonic() + max(1, cache_seconds)
-                    with _ORG_SWITCHER_CONTEXT_CACHE_LOCK:
-                        _ORG_SWITCHER_CONTEXT_CACHE[cache_key] = (expires_at, payload)
-                except Exception:
-                    pass
+            if cache_key is not None:
+                cache_service.set(_ORG_SWITCHER_CACHE_NAMESPACE, cache_key, payload, ttl_seconds=max(1, cache_seconds))
 
             return payload
         except Exception:
@@ -693,6 +715,89 @@ def create_app(config_name=None):
         # Otherwise treat as instance-relative (Flask-SQLAlchemy behavior for sqlite:///relative.db).
         return os.path.abspath(os.path.join(app.instance_path, rel))
 
+    @app.cli.command('ingest-compliance-results')
+    @click.option('--org-id', type=int, default=None, help='Only ingest this organization.')
+    def ingest_compliance_results_command(org_id: int | None):
+        """Store new/changed ADLS compliance result files as precomputed DB summaries.
+
+        Run on a schedule (e.g. every few minutes); unchanged files are skipped by etag.
+        """
+        from app.services.compliance_summary_store import ingest_all_compliance_results
+
+        results = ingest_all_compliance_results(organization_id=org_id)
+        if not results:
+            click.echo('No active memberships to ingest.')
+            return
+        failures = 0
+        for r in results:
+            prefix = f"org={r['organization_id']} user={r['user_id']}"
+            if not r.get('success'):
+                failures += 1
+                click.echo(f"{prefix}: FAILED ({r.get('error')})")
+                continue
+            click.echo(
+                f"{prefix}: ingested={r['ingested']} unchanged={r['unchanged']} "
+                f"removed={r['removed']} failed={r['failed']}"
+            )
+        if failures:
+            raise click.ClickException(f'{failures} ingestion(s) failed.')
+
+    @app.cli.command('process-upload-jobs')
+    @click.option('--once', is_flag=True, help='Process the jobs that are due now, then exit.')
+    @click.option('--batch-size', type=int, default=10, show_default=True)
+    @click.option('--poll-interval', type=float, default=2.0, show_default=True, help='Seconds to sleep when idle.')
+    def process_upload_jobs_command(once: bool, batch_size: int, poll_interval: float):
+        """Run the worker that finalises uploads queued with UPLOAD_PROCESSING_MODE=queued."""
+        import socket
+
+        from app.services.upload_jobs import process_pending_jobs
+
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        while True:
+            counts = process_pending_jobs(worker_id, limit=max(1, batch_size))
+            if counts['claimed']:
+                click.echo(
+                    f"claimed={counts['claimed']} done={counts['done']} "
+                    f"retried={counts['retried']} failed={counts['failed']} superseded={counts['superseded']}"
+                )
+            if once:
+                if counts['claimed'] == max(1, batch_size):
+                    continue
+                return
+            if not counts['claimed']:
+                time.sleep(poll_interval)
+
+    @app.cli.command('reconcile-org-stats')
+    @click.option('--org-id', type=int, multiple=True, help='Only these organizations (repeatable).')
+    def reconcile_org_stats_command(org_id):
+        """Recompute organization_stats from documents and memberships, fixing any drift."""
+        from app.services.org_stats import reconcile_org_stats
+
+        try:
+            corrected = reconcile_org_stats(list(org_id) or None)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise click.ClickException(f'Failed to reconcile organization stats: {e}')
+        click.echo(f'Corrected {corrected} organization stats row(s).')
+
+    @app.cli.command('prune-login-events')
+    @click.option('--batch-size', type=int, default=5000, show_default=True, help='Rows per delete batch (non-partitioned databases).')
+    def prune_login_events_command(batch_size: int):
+        """Roll up and remove login events older than LOG_RETENTION_DAYS (run daily)."""
+        from app.services.login_event_retention import prune_login_events
+
+        try:
+            result = prune_login_events(batch_size=max(1, batch_size))
+        except Exception as e:
+            db.session.rollback()
+            raise click.ClickException(f'Failed to prune login events: {e}')
+        click.echo(
+            f"mode={result['mode']} cutoff={result['cutoff']:%Y-%m-%d} "
+            f"rolled_up={result['rolled_up']} deleted={result['deleted']} "
+            f"partitions_dropped={result['partitions_dropped']} partitions_created={result['partitions_created']}"
+        )
+
     @app.cli.command('reset-local-db')
     @click.option('--yes', is_flag=True, help='Skip confirmation prompt.')
     def reset_local_db(yes: bool):
@@ -882,6 +987,7 @@ def create_app(config_name=None):
         """
 
         from app.models import User, Document, LoginEvent
+        from app.services.org_stats import reconcile_org_stats
 
         is_debug = bool(app.config.get('DEBUG'))
         allow_force = (os.environ.get('ALLOW_DATA_WIPE') or '').strip().lower() in {'1', 'true', 'yes', 'on'}
@@ -919,6 +1025,11 @@ def create_app(config_name=None):
 
             try:
                 # Delete documents uploaded by this user.
+                affected_orgs = [
+                    org for (org,) in db.session.query(Document.organization_id)
+                    .filter(Document.uploaded_by == uid, Document.organization_id.isnot(None))
+                    .distinct()
+                ]
                 Document.query.filter(Document.uploaded_by == uid).delete(synchronize_session=False)
 
                 # Delete login events for this user (or matching email fallback).
@@ -927,6 +1038,8 @@ def create_app(config_name=None):
                 # Delete user (memberships cascade via relationship).
                 db.session.delete(user)
                 db.session.flush()
+                if affected_orgs:
+                    reconcile_org_stats(affected_orgs)
                 deleted_users += 1
                 click.echo(f'Purged: {email}')
             except Exception as e:
@@ -322,16 +322,32 @@ def _log_login_event(
     reason: str | None = None,
 ) -> None:
     try:
-        evt = LoginEvent(
-            user_id=int(user.id) if user else None,
-            email=(email or (user.email if user else None) or None),
-            provider=(provider or 'password')[:20],
-            success=bool(success),
-            reason=(reason or None)[:80] if (reason or '').strip() else None,
-            ip_address=(_client_ip() or None),
-            user_agent=((request.user_agent.string or '')[:255] or None),
-        )
-        db.session.add(evt)
+        # One row per organisation the user is an active member of, so each org's
+        # audit log (and its retention rollups) sees the event on its own index range.
+        org_ids = []
+        if user:
+            org_ids = [
+                int(org_id)
+                for (org_id,) in db.session.query(OrganizationMembership.organization_id)
+                .filter_by(user_id=int(user.id), is_active=True)
+                .order_by(OrganizationMembership.organization_id)
+            ]
+            if not org_ids and user.organization_id:
+                org_ids = [int(user.organization_id)]
+
+        created_at = datetime.now(timezone.utc)
+        for org_id in org_ids or [None]:
+            db.session.add(LoginEvent(
+                user_id=int(user.id) if user else None,
+                email=(email or (user.email if user else None) or None),
+                provider=(provider or 'password')[:20],
+                success=bool(success),
+                reason=(reason or None)[:80] if (reason or '').strip() else None,
+                ip_address=(_client_ip() or None),
+                user_agent=((request.user_agent.string or '')[:255] or None),
+                organization_id=org_id,
+                created_at=created_at,
+            ))
         db.session.commit()
     except Exception:
         db.session.rollback()
@@ -4,8 +4,10 @@ from app.main import bp
 from app.models import Document, Organization, OrganizationMembership, User
 from app import db, mail
 from app.services.azure_data_service import azure_data_service
+from app.services.compliance_summary_store import get_compliance_summary
+from app.services.keyset_pagination import paginate_newest_first
+from app.services.org_stats import get_org_stats
 
-import threading
 import time
 
 from flask_mail import Message
@@ -21,8 +23,8 @@ _RESEND_ORG_INVITE_COOLDOWN_SECONDS = 60 * 5
 _ORG_INVITE_TOKEN_SALT = 'org-invite'
 
 
-_ORG_LOGO_CACHE: dict[tuple[int, str], tuple[float, bytes, str | None]] = {}
-_ORG_LOGO_CACHE_LOCK = threading.Lock()
+# Org logo bytes are kept in the shared cache, keyed by (org_id, blob_name).
+_ORG_LOGO_CACHE_NAMESPACE = 'org_logo'
 
 
 def _safe_int_env(name: str, default: int) -> int:
@@ -62,28 +64,219 @@ def _etag_matches_if_none_match(if_none_match: str | None, etag: str) -> bool:
     return (etag in candidates) or (strong_etag in candidates)
 
 
-def _get_cached_org_logo(org_id: int, blob_name: str) -> tuple[bytes, str | None] | None:
-    now = time.monotonic()
-    with _ORG_LOGO_CACHE_LOCK:
-        cached = _ORG_LOGO_CACHE.get((org_id, blob_name))
-        if not cached:
-            return None
-        expires_at, data, content_type = cached
-        if now >= expires_at:
+def _single_etag(if_none_match: str | None) -> str | None:
+    """The entity tag of a single-valued If-None-Match header (weak prefix dropped), else None."""
+    value = (if_none_match or '').strip()
+    if not value or value == '*' or ',' in value:
+        return None
+    return value[2:] if value.startswith('W/') else value
+
+
+def _requested_byte_range() -> tuple[int, int | None] | None:
+    """(offset, length) of a single ``Range: bytes=`` request, else None.
+
+    Multi-range and suffix (``bytes=-N``) requests are answered with the full body,
+    which RFC 9110 allows.
+    """
+    byte_range = request.range
+    if byte_range is None or byte_range.units != 'bytes' or len(byte_range.ranges) != 1:
+        return None
+    start, stop = byte_range.ranges[0]
+    if start < 0:
+        return None
+    return start, (stop - start) if stop is not None else None
+
+
+def _attachment_headers(download_name: str) -> dict:
+    """Content-Disposition parameters for an attachment, as ``send_file`` builds them."""
+    import unicodedata
+    from urllib.parse import quote
+
+    try:
+        download_name.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': simple, 'filename*': f"UTF-8''{quote(download_name, safe='!#$&+-.^_`|~')}"}
+    return {'filename': download_name}
+
+
+def _download_redirect_enabled() -> bool:
+    return (current_app.config.get('DOWNLOAD_DELIVERY_MODE') or 'proxy') == 'redirect'
+
+
+def _download_sas_ttl_seconds() -> int:
+    try:
+        return max(30, int(current_app.config.get('DOWNLOAD_SAS_TTL_SECONDS') or 300))
+    except Exception:
+        return 300
+
+
+def _sas_redirect(url: str, cache_seconds: int = 0):
+    """302 to a signed blob URL. Only cacheable (privately) for part of the URL's lifetime."""
+    resp = redirect(url, code=302)
+    if cache_seconds > 0:
+        resp.headers['Cache-Control'] = f'private, max-age={int(cache_seconds)}'
+    else:
+        resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+def _org_logo_redirect(org_id: int, organization: Organization):
+    """SAS redirect for an org logo in redirect delivery mode; None to serve it inline."""
+    if not _download_redirect_enabled():
+        return None
+    from app.services.azure_storage_service import azure_storage_service
+
+    ttl_seconds = _download_sas_ttl_seconds()
+    url = azure_storage_service.get_sas_url(
+        organization.logo_blob_name, organization_id=int(org_id), ttl_seconds=ttl_seconds
+    )
+    if not url:
+        return None
+    return _sas_redirect(url, cache_seconds=ttl_seconds // 2)
+
+
+def _tee_to_blob_cache(chunks, cache_writer):
+    """Yield download chunks while copying them into the blob disk cache.
+
+    The entry is only published once the whole blob has been sent; an aborted download
+    (client disconnect, Azure error) discards the partial copy.
+    """
+    try:
+        for chunk in chunks:
+            cache_writer.write(chunk)
+            yield chunk
+        cache_writer.commit()
+    finally:
+        cache_writer.discard()
+
+
+def _cached_blob_response(path: str, properties: dict, download_name: str, mimetype: str | None):
+    """Serve a blob from the disk cache; send_file handles Range/If-Range/If-None-Match."""
+    from flask import send_file
+
+    resp = send_file(
+        path,
+        mimetype=properties.get('content_type') or mimetype or 'application/octet-stream',
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        # Azure etags are already quoted; werkzeug adds the quotes back.
+        etag=(properties.get('etag') or '').strip('"') or False,
+        last_modified=properties.get('last_modified'),
+        max_age=None,
+    )
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+
+def _streamed_blob_response(storage_service, blob_name: str, download_name: str, mimetype: str | None):
+    """Stream a blob to the client chunk by chunk, honouring Range, If-Range and If-None-Match.
+
+    Memory use is one download chunk (AZURE_DOWNLOAD_CHUNK_SIZE) regardless of the blob
+    size, and interrupted downloads can be resumed with a range request. Properties come
+    from the download response itself. With the blob disk cache enabled, the download is
+    conditional on the locally cached version, so an unchanged blob costs one empty 304
+    from Azure and is served from local disk.
+    """
+    from app.services.blob_disk_cache import get_blob_disk_cache
+
+    byte_range = _requested_byte_range()
+    offset, length = byte_range if byte_range else (None, None)
+    if_none_match = request.headers.get('If-None-Match')
+    if_range = (request.headers.get('If-Range') or '').strip() or None
+
+    def _download(etag):
+        return storage_service.open_download(
+            blob_name,
+            offset=offset,
+            length=length,
+            if_none_match=etag,
+            if_range=if_range if byte_range else None,
+        )
+
+    blob_cache = get_blob_disk_cache()
+    cached = blob_cache.latest(blob_name) if blob_cache is not None else None
+    if cached is not None:
+        cached_path, cached_properties = cached
+        result = _download(cached_properties['etag'])
+        if result.get('error_code') == 'NOT_MODIFIED':
             try:
-                del _ORG_LOGO_CACHE[(org_id, blob_name)]
-            except KeyError:
-                pass
-            return None
-        return data, content_type
+                return _cached_blob_response(cached_path, cached_properties, download_name, mimetype)
+            except FileNotFoundError:
+                result = _download(_single_etag(if_none_match))  # evicted since the lookup
+    else:
+        result = _download(_single_etag(if_none_match))
+
+    if not result.get('success'):
+        error_code = result.get('error_code')
+        if error_code == 'NOT_MODIFIED':
+            resp = make_response('', 304)
+            resp.headers['ETag'] = result['etag']
+            resp.headers['Cache-Control'] = 'private, no-cache'
+            return resp
+        if error_code == 'RANGE_NOT_SATISFIABLE':
+            # The failed download carries no size; one properties request fills in Content-Range.
+            resp = make_response('', 416)
+            properties = storage_service.get_file_properties(blob_name)
+            if properties.get('success') and properties.get('size') is not None:
+                resp.headers['Content-Range'] = f"bytes */{properties['size']}"
+            return resp
+        if error_code == 'FILE_NOT_FOUND':
+            abort(404)
+        abort(500)
+
+    etag = result.get('etag')
+    if etag and _etag_matches_if_none_match(if_none_match, etag):
+        resp = make_response('', 304)
+        resp.headers['ETag'] = etag
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+
+    chunks = result['chunks']
+    cache_writer = None
+    if blob_cache is not None and not result['partial']:
+        cache_writer = blob_cache.writer(blob_name, etag, expected_size=result['size'], properties=result)
+    if cache_writer is not None:
+        chunks = _tee_to_blob_cache(chunks, cache_writer)
+
+    resp = current_app.response_class(
+        chunks,
+        status=206 if result['partial'] else 200,
+        # Azure keeps the full MIME type; documents.content_type may be truncated.
+        mimetype=result.get('content_type') or mimetype or 'application/octet-stream',
+        direct_passthrough=True,
+    )
+    resp.headers['Content-Length'] = str(result['size'])
+    resp.headers['Accept-Ranges'] = 'bytes'
+    if result['partial']:
+        end = result['offset'] + result['size'] - 1
+        resp.headers['Content-Range'] = f"bytes {result['offset']}-{end}/{result['total_size']}"
+    if etag:
+        resp.headers['ETag'] = etag
+    if result.get('last_modified'):
+        resp.last_modified = result['last_modified']
+    resp.headers.set('Content-Disposition', 'attachment', **_attachment_headers(download_name))
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+
+def _get_cached_org_logo(org_id: int, blob_name: str) -> tuple[bytes, str | None] | None:
+    from app.services.cache_service import cache_service
+
+    cached = cache_service.get(_ORG_LOGO_CACHE_NAMESPACE, (org_id, blob_name))
+    if not cached:
+        return None
+    data, content_type = cached
+    return data, content_type
 
 
 def _set_cached_org_logo(org_id: int, blob_name: str, data: bytes, content_type: str | None, ttl_seconds: int) -> None:
     if ttl_seconds <= 0:
         return
-    expires_at = time.monotonic() + ttl_seconds
-    with _ORG_LOGO_CACHE_LOCK:
-        _ORG_LOGO_CACHE[(org_id, blob_name)] = (expires_at, data, content_type)
+    from app.services.cache_service import cache_service
+
+    cache_service.set(_ORG_LOGO_CACHE_NAMESPACE, (org_id, blob_name), (data, content_type), ttl_seconds=ttl_seconds)
 
 
 def _org_logo_disk_cache_paths(org_id: int, blob_name: str) -> tuple[str, str]:
@@ -411,7 +604,7 @@ def org_admin_dashboard():
     can_current_user_leave_org = (not current_is_active_admin) or (active_admin_count > 1)
 
     user_count = sum(1 for m in members if bool(m.is_active))
-    document_count = Document.query.filter_by(organization_id=int(org_id), is_active=True).count()
+    document_count = get_org_stats(int(org_id)).document_count
 
     invite_form = InviteMemberForm()
     try:
@@ -1413,8 +1606,8 @@ def dashboard():
         .limit(5)
         .all()
     )
-    # Avoid full table scan for count; use an approximate or limit scope.
-    total_documents = Document.query.filter_by(organization_id=org_id, is_active=True).limit(1000).count()
+    # Maintained counter (organization_stats) instead of a COUNT over the org's documents.
+    total_documents = get_org_stats(int(org_id)).document_count
     
     # ML/ADLS data is deferred by default; provide a lightweight placeholder for the template.
     if current_app.config.get('TESTING') or skip_adls:
@@ -1428,7 +1621,7 @@ def dashboard():
             'connection_status': 'Loading…',
         }
     else:
-        ml_summary = azure_data_service.get_dashboard_summary(user_id=current_user.id, organization_id=org_id)
+        ml_summary = get_compliance_summary(current_user.id, org_id)
     
     return render_template('main/dashboard.html', 
                          title='Dashboard',
@@ -1447,6 +1640,24 @@ def upload():
         return maybe
     return render_template('main/upload.html', title='Upload Document')
 
+def _documents_page(org_id):
+    """One keyset page of the org's active documents, newest first (?cursor=&per_page=)."""
+    per_page = request.args.get('per_page', 50, type=int) or 50
+    per_page = min(max(per_page, 10), 200)  # clamp between 10-200
+
+    # Seek on (uploaded_at, id) via ix_documents_org_active_uploaded_at; no OFFSET or COUNT.
+    from sqlalchemy.orm import joinedload
+    query = (
+        Document.query
+        .options(joinedload(Document.uploader))
+        .filter_by(organization_id=org_id, is_active=True)
+    )
+    return paginate_newest_first(
+        query, Document.uploaded_at, Document.id,
+        cursor=request.args.get('cursor'), per_page=per_page,
+    )
+
+
 @bp.route('/documents')
 @login_required
 def documents():
@@ -1458,11 +1669,11 @@ def documents():
     org_id = _active_org_id()
     if not current_user.has_permission('documents.view', org_id=int(org_id)):
         abort(403)
-    query = Document.query.filter_by(organization_id=org_id, is_active=True)
-    user_documents = query.order_by(Document.uploaded_at.desc()).all()
-    return render_template('main/documents.html', 
+    page = _documents_page(org_id)
+    return render_template('main/evidence_repository.html',
                          title='My Documents',
-                         documents=user_documents)
+                         documents=page.items,
+                         pagination=page)
 
 @bp.route('/evidence-repository')
 @login_required
@@ -1476,33 +1687,16 @@ def evidence_repository():
     if not current_user.has_permission('documents.view', org_id=int(org_id)):
         abort(403)
     
-    # Pagination to avoid loading thousands of documents at once.
-    page = request.args.get('page', 1, type=int)
-    per_page = int(request.args.get('per_page', '50') or 50)
-    per_page = min(max(per_page, 10), 200)  # clamp between 10-200
-    
-    # Use options to eager-load relationships and avoid N+1 queries
-    from sqlalchemy.orm import joinedload
-    query = (
-        Document.query
-        .options(joinedload(Document.uploader))
-        .filter_by(organization_id=org_id, is_active=True)
-    )
-    pagination = query.order_by(Document.uploaded_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    documents = pagination.items
+    pagination = _documents_page(org_id)
     return render_template('main/evidence_repository.html', 
                          title='Evidence Repository',
-                         documents=documents,
+                         documents=pagination.items,
                          pagination=pagination)
 
 @bp.route('/document/<int:doc_id>/download')
 def download_document(doc_id):
-    """Download a document."""
-    from flask import send_file, abort
+    """Download a document (streamed; supports Range and If-None-Match)."""
     from app.services.azure_storage import AzureBlobStorageService
-    import io
 
     # For document downloads, do not leak existence via redirects.
     # Return 404 for any unauthenticated/unauthorized access.
@@ -1533,32 +1727,26 @@ def download_document(doc_id):
     if int(document.organization_id) != int(org_id):
         abort(404)
     
-    try:
-        storage_service = AzureBlobStorageService()
-        result = storage_service.download_file(document.blob_name)
-        if not result.get('success'):
-            if result.get('error_code') == 'FILE_NOT_FOUND':
-                abort(404)
-            abort(500)
+    storage_service = AzureBlobStorageService()
+    if _download_redirect_enabled():
+        from werkzeug.http import dump_options_header
 
-        blob_data = result.get('data')
-        if not blob_data:
-            abort(404)
-        
-        # Create file-like object
-        file_stream = io.BytesIO(blob_data)
-        file_stream.seek(0)
-        
-        # Send file to user
-        return send_file(
-            file_stream,
-            mimetype=document.content_type,
-            as_attachment=True,
-            download_name=document.filename
+        signed = storage_service.get_file_url(
+            document.blob_name,
+            expiry_seconds=_download_sas_ttl_seconds(),
+            content_disposition=dump_options_header('attachment', _attachment_headers(document.filename)),
         )
-    except Exception as e:
-        print(f"Error downloading document: {e}")
-        abort(500)
+        if signed.get('success'):
+            return _sas_redirect(signed['url'])
+        # e.g. SAS-only credentials that cannot sign: fall back to streaming.
+        current_app.logger.warning('SAS redirect unavailable for document %s: %s', doc_id, signed.get('error'))
+
+    return _streamed_blob_response(
+        storage_service,
+        document.blob_name,
+        download_name=document.filename,
+        mimetype=document.content_type,
+    )
 
 @bp.route('/document/<int:doc_id>/delete', methods=['POST'])
 @login_required
@@ -1587,16 +1775,21 @@ def delete_document(doc_id):
         return redirect(url_for('main.evidence_repository'))
     
     try:
+        from app.services.document_blobs import release_blob
+
+        # Soft delete from database
+        document.is_active = False
+
         if getattr(document, 'blob_name', None):
-            storage_service = AzureBlobStorageService()
-            delete_result = storage_service.delete_file(document.blob_name)
-            if not delete_result.get('success'):
-                raise Exception(delete_result.get('error') or 'Delete failed')
+            # Identical uploads share one blob; only delete it with the last reference.
+            if release_blob(int(org_id), document.blob_name):
+                storage_service = AzureBlobStorageService()
+                delete_result = storage_service.delete_file(document.blob_name)
+                if not delete_result.get('success'):
+                    raise Exception(delete_result.get('error') or 'Delete failed')
         else:
             current_app.logger.warning('Document %s has no blob_name; skipping Azure deletion', document.id)
         
-        # Soft delete from database
-        document.is_active = False
         db.session.commit()
         
         flash(f'Document "{document.filename}" deleted successfully.', 'success')
@@ -1646,10 +1839,7 @@ def ai_evidence():
         abort(403)
 
     # Get real ADLS data (org-scoped) — reuses cached result from dashboard if recent
-    summary = azure_data_service.get_dashboard_summary(
-        user_id=current_user.id,
-        organization_id=org_id,
-    )
+    summary = get_compliance_summary(current_user.id, org_id)
     
     # Transform ADLS data into AI evidence entries
     ai_evidence_entries = []
@@ -1784,6 +1974,10 @@ def organization_logo():
         current_app.logger.info('Org logo 304 (etag match) org_id=%s', org_id)
         return resp
 
+    offloaded = _org_logo_redirect(int(org_id), organization)
+    if offloaded is not None:
+        return offloaded
+
     # Cache logo bytes in-memory to avoid repeated Azure fetches.
     try:
         logo_cache_seconds = int((current_app.config.get('ORG_LOGO_CACHE_SECONDS') or 300))
@@ -1864,6 +2058,10 @@ def organization_logo_by_id(org_id):
         current_app.logger.info('Org logo(by_id) 304 (etag match) org_id=%s', org_id)
         return resp
 
+    offloaded = _org_logo_redirect(int(org_id), organization)
+    if offloaded is not None:
+        return offloaded
+
     try:
         logo_cache_seconds = int((current_app.config.get('ORG_LOGO_CACHE_SECONDS') or 300))
     except Exception:
@@ -1959,7 +2157,7 @@ def gap_analysis():
         abort(403)
 
     # Get real ADLS data (org-scoped). Keep this endpoint quiet to avoid slow log I/O.
-    summary = azure_data_service.get_dashboard_summary(user_id=current_user.id, organization_id=org_id)
+    summary = get_compliance_summary(current_user.id, org_id)
     
     # Build gap analysis data from ADLS
     gap_data = []
@@ -2302,7 +2500,7 @@ def api_ml_summary():
             'connection_status': 'Coming soon',
         })
 
-    summary = azure_data_service.get_dashboard_summary(user_id=current_user.id, organization_id=org_id)
+    summary = get_compliance_summary(current_user.id, org_id)
     return jsonify(summary)
 
 @bp.route('/adls-raw-data')
@@ -2368,6 +2566,7 @@ def debug_adls():
         'connection_string_set': bool(os.getenv('AZURE_STORAGE_CONNECTION_STRING')),
         'user_id': current_user.id,
         'service_client_initialized': azure_data_service.service_client is not None,
+        'coalescing': azure_data_service.coalescing_stats(),
     }
     
     # Try to get files
@@ -2426,7 +2625,7 @@ def generate_report(report_type):
     }
     
     # Get gap analysis data
-    summary = azure_data_service.get_dashboard_summary(user_id=current_user.id, organization_id=org_id)
+    summary = get_compliance_summary(current_user.id, org_id)
     gap_data = []
     
     if summary.get('file_summaries'):
@@ -2560,81 +2759,114 @@ def system_logs():
     start_time = now - time_delta
     
     logs = []
+    pagination = None
+    total_logs = 0
+    failed_logins = 0
 
     # NOTE: We currently back System Logs with persisted DB events.
-    # `LoginEvent` captures login success/failure, and we scope to the active organisation
-    # by selecting events for users who are members of that organisation.
+    # `LoginEvent` captures login success/failure with one row per organisation the user was
+    # an active member of, so scoping is a range scan on ix_login_events_org_created_at.
+    # Events of users no longer active in this org are hidden by the membership check.
     if log_type in ['all', 'security']:
         from app.models import LoginEvent
-        from sqlalchemy import desc
-
-        member_ids = [m.user_id for m in OrganizationMembership.query.filter_by(organization_id=org_id).all()]
+        from sqlalchemy import func
+
+        active_member = (
+            db.session.query(OrganizationMembership.id)
+            .filter(
+                OrganizationMembership.user_id == LoginEvent.user_id,
+                OrganizationMembership.organization_id == int(org_id),
+                OrganizationMembership.is_active.is_(True),
+            )
+            .exists()
+        )
 
-        if member_ids:
-            q = LoginEvent.query.filter(LoginEvent.user_id.in_(member_ids))
-            if start_time is not None:
-                q = q.filter(LoginEvent.created_at >= start_time)
+        def _scoped(q):
+            q = q.filter(
+                LoginEvent.organization_id == int(org_id),
+                LoginEvent.created_at >= start_time,
+                active_member,
+            )
 
             if (user_id_filter or '').strip():
                 try:
                     q = q.filter(LoginEvent.user_id == int(user_id_filter))
                 except Exception:
                     pass
+            return q
+
+        # Statistics: one GROUP BY over the filtered window rather than counting rows in Python.
+        for success, count in (
+            _scoped(db.session.query(LoginEvent.success, func.count(LoginEvent.id)).select_from(LoginEvent))
+            .group_by(LoginEvent.success)
+        ):
+            if (event_type or '').strip() == 'LOGIN_SUCCESS' and not success:
+                continue
+            if (event_type or '').strip() == 'LOGIN_FAILURE' and success:
+                continue
+            total_logs += int(count)
+            if not success:
+                failed_logins += int(count)
+
+        q = _scoped(LoginEvent.query)
+        if (event_type or '').strip() == 'LOGIN_SUCCESS':
+            q = q.filter(LoginEvent.success.is_(True))
+        elif (event_type or '').strip() == 'LOGIN_FAILURE':
+            q = q.filter(LoginEvent.success.is_(False))
+
+        per_page = request.args.get('per_page', 100, type=int) or 100
+        pagination = paginate_newest_first(
+            q, LoginEvent.created_at, LoginEvent.id,
+            cursor=request.args.get('cursor'), per_page=min(max(per_page, 10), 200),
+        )
+
+        # Only the rows on this page are formatted for display.
+        for evt in pagination.items:
+            created_at = evt.created_at
+            if created_at and getattr(created_at, 'tzinfo', None) is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
 
-            if (event_type or '').strip() == 'LOGIN_SUCCESS':
-                q = q.filter(LoginEvent.success.is_(True))
-            elif (event_type or '').strip() == 'LOGIN_FAILURE':
-                q = q.filter(LoginEvent.success.is_(False))
+            created_at_local = None
+            try:
+                created_at_local = created_at.astimezone(display_tz) if created_at else None
+            except Exception:
+                created_at_local = created_at
 
-            events = q.order_by(desc(LoginEvent.created_at)).limit(500).all()
-            for evt in events:
-                created_at = evt.created_at
-                if created_at and getattr(created_at, 'tzinfo', None) is None:
-                    created_at = created_at.replace(tzinfo=timezone.utc)
+            is_success = bool(evt.success)
+            derived_event_type = 'LOGIN_SUCCESS' if is_success else 'LOGIN_FAILURE'
+            derived_description = 'User logged in successfully' if is_success else 'Failed login attempt'
 
-                created_at_local = None
+            user_name = None
+            user_email = None
+            if getattr(evt, 'user', None) is not None:
                 try:
-                    created_at_local = created_at.astimezone(display_tz) if created_at else None
+                    user_name = evt.user.display_name()
                 except Exception:
-                    created_at_local = created_at
-
-                is_success = bool(evt.success)
-                derived_event_type = 'LOGIN_SUCCESS' if is_success else 'LOGIN_FAILURE'
-                derived_description = 'User logged in successfully' if is_success else 'Failed login attempt'
-
-                user_name = None
-                user_email = None
-                if getattr(evt, 'user', None) is not None:
-                    try:
-                        user_name = evt.user.display_name()
-                    except Exception:
-                        user_name = None
-                    user_email = getattr(evt.user, 'email', None)
-
-                logs.append({
-                    'timestamp': created_at_local.strftime('%Y-%m-%d %H:%M:%S %Z') if created_at_local else None,
-                    'log_type': 'security',
-                    'event_type': derived_event_type,
-                    'event_description': derived_description,
-                    'user_id': evt.user_id,
-                    'user_name': user_name,
-                    'user_email': user_email or evt.email,
-                    'organization_id': org_id,
-                    'ip_address': evt.ip_address,
-                    'details': {
-                        'email': evt.email,
-                        'provider': evt.provider,
-                        'success': is_success,
-                        'reason': evt.reason,
-                        'user_agent': evt.user_agent,
-                    }
-                })
-    
-    # Statistics
-    total_logs = len(logs)
-    security_events = len([l for l in logs if l.get('log_type') == 'security'])
-    error_count = len([l for l in logs if l.get('log_type') == 'error'])
-    failed_logins = len([l for l in logs if l.get('event_type') == 'LOGIN_FAILURE'])
+                    user_name = None
+                user_email = getattr(evt.user, 'email', None)
+
+            logs.append({
+                'timestamp': created_at_local.strftime('%Y-%m-%d %H:%M:%S %Z') if created_at_local else None,
+                'log_type': 'security',
+                'event_type': derived_event_type,
+                'event_description': derived_description,
+                'user_id': evt.user_id,
+                'user_name': user_name,
+                'user_email': user_email or evt.email,
+                'organization_id': org_id,
+                'ip_address': evt.ip_address,
+                'details': {
+                    'email': evt.email,
+                    'provider': evt.provider,
+                    'success': is_success,
+                    'reason': evt.reason,
+                    'user_agent': evt.user_agent,
+                }
+            })
+
+    # Every persisted event is currently a security (login) event.
+    security_events = total_logs
+    error_count = 0
     
     appinsights_enabled = current_app.config.get('APPINSIGHTS_ENABLED', False)
     
@@ -2645,6 +2877,7 @@ def system_logs():
                          event_type=event_type,
                          time_range=time_range,
                          user_id=user_id_filter,
+                         pagination=pagination,
                          total_logs=total_logs,
                          security_events=security_events,
                          error_count=error_count,
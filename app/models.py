@@ -1,14 +1,12 @@
 from datetime import datetime, timezone
-import threading
-import time
 from flask import g
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
 
 
-_RBAC_EFFECTIVE_PERMS_CACHE: dict[int, tuple[float, set[str]]] = {}
-_RBAC_EFFECTIVE_PERMS_CACHE_LOCK = threading.Lock()
+# Effective permission sets are cached in the shared cache (keyed by role id).
+_RBAC_EFFECTIVE_PERMS_CACHE_NAMESPACE = 'rbac_effective_perms'
 
 
 def _rbac_effective_perms_cache_ttl_seconds() -> int:
@@ -282,15 +280,70 @@ class Document(db.Model):
     blob_name = db.Column(db.String(255))
     file_size = db.Column(db.Integer)
     content_type = db.Column(db.String(50))
-    uploaded_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    uploaded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     is_active = db.Column(db.Boolean, default=True)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id'), nullable=True)
+    # SHA-256 of the file content (hex); identical files in an org share one blob (see DocumentBlob).
+    content_hash = db.Column(db.String(64), nullable=True)
 
     uploader = db.relationship('User', foreign_keys=[uploaded_by], lazy='select')
 
     __table_args__ = (
         db.Index('ix_documents_org_active_uploaded_at', 'organization_id', 'is_active', 'uploaded_at'),
+        db.Index('ix_documents_org_content_hash', 'organization_id', 'content_hash'),
+        db.Index('ix_documents_org_filename', 'organization_id', 'filename'),
+    )
+
+
+class DocumentFilenameVersion(db.Model):
+    """Per-org counter of the last version number handed out for an uploaded filename.
+
+    ``last_version`` 0 means the plain name is taken; N means "name (N).ext" was the last
+    one allocated. See app/services/document_names.py.
+    """
+
+    __tablename__ = 'document_filename_versions'
+
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    filename = db.Column(db.String(255), primary_key=True)
+    last_version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class OrganizationStats(db.Model):
+    """Per-org counters kept in step with documents and memberships by app.services.org_stats.
+
+    Dashboards read this row instead of counting; ``flask reconcile-org-stats`` recomputes it.
+    """
+
+    __tablename__ = 'organization_stats'
+
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+    # Sum of file_size over active documents (before blob deduplication).
+    document_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    member_count = db.Column(db.Integer, nullable=False, default=0)
+    active_member_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class DocumentBlob(db.Model):
+    """A stored blob shared by every active Document in an org with the same content hash."""
+
+    __tablename__ = 'document_blobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    blob_name = db.Column(db.String(255), nullable=False, unique=True)
+    file_size = db.Column(db.Integer, nullable=True)
+    content_type = db.Column(db.String(120), nullable=True)
+    # Number of active documents pointing at blob_name; the blob is deleted when it drops to 0.
+    ref_count = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('organization_id', 'content_hash', name='uq_document_blobs_org_hash'),
     )
 
 
@@ -348,16 +401,14 @@ class RBACRole(db.Model):
         except Exception:
             rid = 0
 
+        from app.services.cache_service import cache_service
+
         ttl = _rbac_effective_perms_cache_ttl_seconds()
         if rid and ttl > 0:
-            now = time.monotonic()
-            with _RBAC_EFFECTIVE_PERMS_CACHE_LOCK:
-                cached = _RBAC_EFFECTIVE_PERMS_CACHE.get(rid)
-            if cached:
-                expires_at, codes = cached
-                if now < expires_at:
-                    # Return a copy to avoid accidental mutation of cached set.
-                    return set(codes)
+            cached = cache_service.get(_RBAC_EFFECTIVE_PERMS_CACHE_NAMESPACE, rid)
+            if cached is not None:
+                # Return a copy to avoid accidental mutation of cached set.
+                return set(cached)
 
         seen_role_ids: set[int] = set()
         codes: set[str] = set()
@@ -381,12 +432,7 @@ class RBACRole(db.Model):
         walk(self)
 
         if rid and ttl > 0:
-            try:
-                expires_at = time.monotonic() + max(1, ttl)
-                with _RBAC_EFFECTIVE_PERMS_CACHE_LOCK:
-                    _RBAC_EFFECTIVE_PERMS_CACHE[rid] = (expires_at, set(codes))
-            except Exception:
-                pass
+            cache_service.set(_RBAC_EFFECTIVE_PERMS_CACHE_NAMESPACE, rid, set(codes), ttl_seconds=max(1, ttl))
         return codes
 
 
@@ -401,16 +447,34 @@ class LoginEvent(db.Model):
     reason = db.Column(db.String(80), nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)
     user_agent = db.Column(db.String(255), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), nullable=False)
+    # One row per organization the user was an active member of when the event was written,
+    # so org-scoped audit views read one index range instead of resolving memberships first.
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     user = db.relationship('User', lazy='joined')
 
     __table_args__ = (
         db.Index('ix_login_events_user_id_created_at', 'user_id', 'created_at'),
         db.Index('ix_login_events_ip_created_at', 'ip_address', 'created_at'),
+        db.Index('ix_login_events_org_created_at', 'organization_id', 'created_at'),
     )
 
 
+class LoginEventDailyRollup(db.Model):
+    """Per-org daily login counts, kept after the raw login_events rows expire.
+
+    Written by app.services.login_event_retention just before events leave the retention window.
+    """
+
+    __tablename__ = 'login_event_daily_rollups'
+
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    success_count = db.Column(db.Integer, nullable=False, default=0)
+    failure_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class SuspiciousIP(db.Model):
     __tablename__ = 'suspicious_ips'
 
@@ -424,4 +488,136 @@ class SuspiciousIP(db.Model):
 
     __table_args__ = (
         db.Index('ix_suspicious_ips_blocked_until', 'blocked_until'),
-    )
\ No newline at end of file
+    )
+
+
+class ComplianceResultFile(db.Model):
+    """One ingested ADLS result file with its precomputed summary."""
+
+    __tablename__ = 'compliance_result_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    file_path = db.Column(db.String(1024), nullable=False)
+    file_name = db.Column(db.String(255), nullable=False)
+    framework = db.Column(db.String(120), nullable=True)
+    # etag (or last_modified) of the blob this row was computed from; unchanged files are skipped.
+    source_version = db.Column(db.String(120), nullable=True)
+    last_modified = db.Column(db.DateTime, nullable=True)
+    compliancy_rate = db.Column(db.Float, nullable=False, default=0)
+    overall_status = db.Column(db.String(40), nullable=True)
+    total_requirements = db.Column(db.Integer, nullable=False, default=0)
+    complete_count = db.Column(db.Integer, nullable=False, default=0)
+    needs_review_count = db.Column(db.Integer, nullable=False, default=0)
+    missing_count = db.Column(db.Integer, nullable=False, default=0)
+    ingested_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    scores = db.relationship(
+        'ComplianceFrameworkScore',
+        backref='result_file',
+        lazy='select',
+        cascade='all, delete-orphan',
+        order_by='ComplianceFrameworkScore.position',
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint('organization_id', 'user_id', 'file_path', name='uq_compliance_result_files_org_user_path'),
+        db.Index('ix_compliance_result_files_org_user_modified', 'organization_id', 'user_id', 'last_modified'),
+    )
+
+
+class ComplianceFrameworkScore(db.Model):
+    """A single framework/requirement score row from an ingested result file."""
+
+    __tablename__ = 'compliance_framework_scores'
+
+    id = db.Column(db.Integer, primary_key=True)
+    result_file_id = db.Column(
+        db.Integer,
+        db.ForeignKey('compliance_result_files.id', ondelete='CASCADE'),
+        nullable=False,
+    )
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    # Row order within the source file, so reads reproduce the file's ordering.
+    position = db.Column(db.Integer, nullable=False, default=0)
+    framework_name = db.Column(db.String(255), nullable=False)
+    score = db.Column(db.Float, nullable=False, default=0)
+    status = db.Column(db.String(40), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_compliance_framework_scores_file_position', 'result_file_id', 'position'),
+        db.Index('ix_compliance_framework_scores_org_framework', 'organization_id', 'framework_name'),
+    )
+
+
+class UploadSession(db.Model):
+    """Server-side state of a resumable chunked upload (init -> PUT chunks -> commit)."""
+
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(36), primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(120), nullable=True)
+    file_size = db.Column(db.BigInteger, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    total_chunks = db.Column(db.Integer, nullable=False)
+    blob_name = db.Column(db.String(255), nullable=False)
+    # uploading | committed | failed
+    status = db.Column(db.String(20), nullable=False, default='uploading')
+    error = db.Column(db.String(255), nullable=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('documents.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    chunks = db.relationship('UploadSessionChunk', lazy='select', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_upload_sessions_user_created_at', 'user_id', 'created_at'),
+    )
+
+
+class UploadSessionChunk(db.Model):
+    """A chunk of an UploadSession that has been staged as an Azure block."""
+
+    __tablename__ = 'upload_session_chunks'
+
+    upload_id = db.Column(db.String(36), db.ForeignKey('upload_sessions.id', ondelete='CASCADE'), primary_key=True)
+    chunk_index = db.Column(db.Integer, primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    received_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class UploadJob(db.Model):
+    """Durable background job queued by an upload (see app/services/upload_jobs.py).
+
+    ``payload`` is JSON; its shape depends on ``kind``. Workers claim pending jobs whose
+    ``run_after`` has passed, and failed attempts are retried with backoff until
+    ``max_attempts`` is reached.
+    """
+
+    __tablename__ = 'upload_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    payload = db.Column(db.Text, nullable=False)
+    # pending | running | done | failed
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('documents.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_upload_jobs_status_run_after', 'status', 'run_after'),
+        db.Index('ix_upload_jobs_user_created_at', 'user_id', 'created_at'),
+    )
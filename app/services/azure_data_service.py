@@ -3,36 +3,78 @@ Azure Data Lake Storage service for ML results integration.
 Connects to ADLS and processes compliance analysis results.
 """
 
+import codecs
 import os
+import re
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 try:
     from azure.storage.filedatalake import DataLakeServiceClient
     from azure.core.exceptions import ResourceNotFoundError
     from azure.core.exceptions import HttpResponseError
+    from azure.core.exceptions import ResourceNotModifiedError
+    from azure.core import MatchConditions
 except ImportError:
     DataLakeServiceClient = None
     ResourceNotFoundError = Exception
     HttpResponseError = Exception
+    ResourceNotModifiedError = None
+    MatchConditions = None
 
 try:
     from azure.storage.blob import BlobServiceClient
 except ImportError:
     BlobServiceClient = None
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
 import json
+from itertools import islice
+from operator import itemgetter
+
+from app.services.cache_service import SingleFlight, cache_service
 
 logger = logging.getLogger(__name__)
 
 
-# Very small in-memory cache to avoid hitting ADLS on every page load.
-# This is safe for local/dev and also helpful in production (per-worker cache).
-_DASHBOARD_SUMMARY_CACHE: dict[tuple[int | None, int | None], tuple[float, Dict]] = {}
+# Dashboard summaries, list results (and recent list failures) are kept in the shared
+# cache (see app.services.cache_service) so every worker benefits from one ADLS fetch.
+# Values are stored as (cached_at, value) so callers can apply their own freshness rules.
+_DASHBOARD_SUMMARY_CACHE_NAMESPACE = 'adls_dashboard_summary'
+_COMPLIANCE_FILES_CACHE_NAMESPACE = 'adls_compliance_files'
+_COMPLIANCE_FILES_FAILURE_CACHE_NAMESPACE = 'adls_compliance_files_failure'
+# Short-lived marker so only one worker refreshes a given stale summary at a time.
+_DASHBOARD_REFRESH_LEASE_NAMESPACE = 'adls_dashboard_refresh_lease'
+# Aggregated summaries of individual result files, stored as (etag, last_modified, summary)
+# per file path; the rows themselves are never cached. The etag drives conditional downloads;
+# a matching listing version skips the request entirely.
+_FILE_SUMMARY_CACHE_NAMESPACE = 'adls_file_summary'
+# Per-org listing of every org-scoped result file, partitioned by month; shared by all users.
+_ORG_LISTING_INDEX_NAMESPACE = 'adls_org_listing_index'
+_ORG_LISTING_INDEX_TTL_SECONDS = 60 * 60 * 24 * 45
+
+
+# Per-user segment of an org-scoped result path; listing caps apply per user.
+_USER_SEGMENT = re.compile(r'/user_(\d+)/')
+
+
+def _user_segment(file_path: str) -> Optional[str]:
+    match = _USER_SEGMENT.search(file_path or '')
+    return match.group(1) if match else None
+
 
-# Cache for list operations (and recent failures) because ADLS list calls can be slow.
-_COMPLIANCE_FILES_CACHE: dict[tuple[int | None, int | None], tuple[float, List[Dict]]] = {}
-_COMPLIANCE_FILES_FAILURE_CACHE: dict[tuple[int | None, int | None], tuple[float, str]] = {}
+# Below this many rows the plain Python aggregation beats building a DataFrame.
+_VECTORISE_MIN_ROWS = 256
+# Rows held at once while a result file streams into its summary.
+_SUMMARY_BATCH_ROWS = 4096
 
 
 def _safe_int_env(name: str, default: int) -> int:
@@ -41,6 +83,111 @@ def _safe_int_env(name: str, default: int) -> int:
     except Exception:
         return default
 
+
+def _iter_download_lines(download) -> Iterator[str]:
+    """Yield decoded text lines from an Azure download stream one chunk at a time.
+
+    Uses an incremental UTF-8 decoder so multi-byte characters split across chunk
+    boundaries decode correctly. Memory is bounded by the SDK chunk size plus one line.
+    """
+    chunks = download.chunks() if hasattr(download, 'chunks') else [download.readall()]
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if '\n' not in pending:
+            continue
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def _recent_months(now: datetime, count: int) -> List[tuple[int, int]]:
+    """(year, month) pairs for the current month and the ``count - 1`` before it, newest first."""
+    year, month = now.year, now.month
+    months = []
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months
+
+
+def file_version(file_info: Dict) -> Optional[str]:
+    """Version token for a listed file: its etag, else its last_modified timestamp."""
+    etag = file_info.get('etag')
+    if etag:
+        return str(etag)
+    last_modified = file_info.get('last_modified')
+    if isinstance(last_modified, datetime):
+        return last_modified.isoformat()
+    return str(last_modified) if last_modified else None
+
+
+def select_dashboard_files(files: List[Dict], max_files: int) -> List[Dict]:
+    """Pick the files the dashboard summarises.
+
+    Prefer a single precomputed summary file when present to avoid downloading/parsing many
+    files; otherwise take the newest ``max_files`` to keep the dashboard responsive.
+    """
+    files_sorted = sorted(
+        files,
+        key=lambda f: (str(f.get('file_name') or '').lower(), f.get('last_modified') or datetime.min),
+        reverse=True,
+    )
+    lower_name = lambda f: str(f.get('file_name') or '').lower()
+    summary_candidates = [f for f in files_sorted if 'compliance_summary' in lower_name(f)]
+    if not summary_candidates:
+        summary_candidates = [f for f in files_sorted if 'summary' in lower_name(f)]
+
+    return summary_candidates[:1] if summary_candidates else files_sorted[: max(1, max_files)]
+
+
+def merge_dashboard_summaries(files: List[Dict], summaries: List[Dict], total_files: int) -> Dict:
+    """Combine per-file analysis summaries (in ``files`` order) into the dashboard totals."""
+    file_summaries = []
+    total_requirements = 0
+    total_complete = 0
+    total_needs_review = 0
+    total_missing = 0
+    compliancy_rates = []
+
+    for file_info, summary in zip(files, summaries):
+        file_summaries.append({
+            'file_name': summary['file_name'],
+            'framework': file_info.get('framework', 'Unknown'),
+            'compliancy_rate': summary['compliancy_rate'],
+            'overall_status': summary['overall_status'],
+            'total_requirements': summary['total_requirements'],
+            'complete_count': summary['complete_count'],
+            'needs_review_count': summary['needs_review_count'],
+            'missing_count': summary['missing_count'],
+            'last_updated': file_info['last_modified'],
+            'frameworks': summary.get('frameworks', [])
+        })
+
+        total_requirements += summary['total_requirements']
+        total_complete += summary['complete_count']
+        total_needs_review += summary['needs_review_count']
+        total_missing += summary['missing_count']
+        compliancy_rates.append(summary['compliancy_rate'])
+
+    avg_compliancy_rate = sum(compliancy_rates) / len(compliancy_rates) if compliancy_rates else 0
+
+    return {
+        'total_files': total_files,
+        'avg_compliancy_rate': round(avg_compliancy_rate, 1),
+        'total_requirements': total_requirements,
+        'total_complete': total_complete,
+        'total_needs_review': total_needs_review,
+        'total_missing': total_missing,
+        'last_updated': max([f['last_updated'] for f in file_summaries]) if file_summaries else datetime.now(),
+        'file_summaries': file_summaries,
+    }
+
+
 class AzureDataLakeService:
     """Service to interact with Azure Data Lake Storage for ML results."""
     
@@ -56,6 +203,18 @@ class AzureDataLakeService:
         self.blob_service_client = None
         self._initialize_client()
 
+        # Request coalescing: concurrent misses for the same listing / file share one ADLS call.
+        self._list_flight = SingleFlight()
+        self._read_flight = SingleFlight()
+        self._index_flight = SingleFlight()
+
+        # Stale-while-revalidate: background refreshes of dashboard summaries.
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        # Bounded pool used to download/parse several result files concurrently.
+        self._fetch_executor: Optional[ThreadPoolExecutor] = None
+        self._refresh_in_flight: set[tuple[int | None, int | None]] = set()
+        self._refresh_lock = threading.Lock()
+
     @staticmethod
     def _is_endpoint_unsupported_account_features(exc: Exception) -> bool:
         # Azure sometimes returns this when using ADLS Gen2 path ops against accounts with
@@ -86,10 +245,17 @@ class AzureDataLakeService:
             self.service_client = None
             self.blob_service_client = None
 
-    def _list_files_via_blob(self, search_path: str, timeout_seconds: int) -> List[Dict]:
-        """Fallback: list files via Blob API when ADLS path operations are unsupported."""
+    def _list_files_via_blob(self, search_path: str, timeout_seconds: int, per_user_cap: bool = False) -> Optional[List[Dict]]:
+        """Fallback: list files via Blob API when ADLS path operations are unsupported; None on failure.
+
+        At most AZURE_ADLS_LIST_MAX_BLOBS files are returned. With ``per_user_cap`` (org-wide
+        listings shared by all users) the limit applies to each ``user_<id>`` segment
+        separately and listing pages on past users that reached it, so one busy user
+        cannot push another's files out of the listing.
+        """
         if not self.blob_service_client:
-            return []
+            logger.warning(f"No Blob client for fallback listing of '{search_path}'")
+            return None
 
         try:
             container_client = self.blob_service_client.get_container_client(self.container_name)
@@ -99,6 +265,7 @@ class AzureDataLakeService:
 
             max_blobs = _safe_int_env('AZURE_ADLS_LIST_MAX_BLOBS', 250)
             files: list[Dict] = []
+            per_user: dict[Optional[str], int] = {}
 
             try:
                 blobs = container_client.list_blobs(name_starts_with=prefix, timeout=timeout_seconds)
@@ -112,6 +279,12 @@ class AzureDataLakeService:
                 if not (name.endswith('.csv') or name.endswith('.json')):
                     continue
 
+                if per_user_cap and max_blobs > 0:
+                    user = _user_segment(name)
+                    if per_user.get(user, 0) >= max_blobs:
+                        continue
+                    per_user[user] = per_user.get(user, 0) + 1
+
                 file_name = os.path.basename(name)
                 framework = 'Multiple Frameworks'
                 if 'summary' in file_name.lower():
@@ -121,20 +294,144 @@ class AzureDataLakeService:
                     'file_name': file_name,
                     'file_path': name,
                     'last_modified': getattr(blob, 'last_modified', None),
+                    'etag': getattr(blob, 'etag', None),
                     'file_size': getattr(blob, 'size', 0) or 0,
                     'framework': framework,
                 })
 
-                if max_blobs > 0 and len(files) >= max_blobs:
+                if not per_user_cap and max_blobs > 0 and len(files) >= max_blobs:
                     break
 
             return files
         except Exception as e:
             logger.error(f"Blob fallback list failed for prefix '{search_path}': {e}")
-            return []
+            return None
     
+    def coalescing_stats(self) -> Dict:
+        """Counters showing how many ADLS list/read calls were coalesced."""
+        return {
+            'list': self._list_flight.stats(),
+            'read': self._read_flight.stats(),
+            'org_index': self._index_flight.stats(),
+        }
+
+    def _list_search_path(
+        self, file_system_client, search_path: str, timeout_seconds: int, per_user_cap: bool = False
+    ) -> Optional[List[Dict]]:
+        """List CSV/JSON result files under one path; [] if it doesn't exist, None on failure."""
+        if not file_system_client:
+            # No ADLS client: attempt Blob fallback.
+            return self._list_files_via_blob(search_path, timeout_seconds=timeout_seconds, per_user_cap=per_user_cap)
+
+        files: list[Dict] = []
+        try:
+            try:
+                paths = file_system_client.get_paths(path=search_path, timeout=timeout_seconds)
+            except TypeError:
+                paths = file_system_client.get_paths(path=search_path)
+
+            for path in paths:
+                if not path.is_directory and (path.name.endswith('.csv') or path.name.endswith('.json')):
+                    file_name = os.path.basename(path.name)
+
+                    framework = 'Multiple Frameworks'
+                    if 'summary' in file_name.lower():
+                        framework = 'Compliance Summary'
+
+                    files.append({
+                        'file_name': file_name,
+                        'file_path': path.name,
+                        'last_modified': path.last_modified,
+                        'etag': getattr(path, 'etag', None),
+                        'file_size': path.content_length or 0,
+                        'framework': framework,
+                    })
+            return files
+        except ResourceNotFoundError:
+            return []
+        except Exception as e:
+            # If the account doesn't support ADLS path operations, fall back to Blob listing.
+            if self._is_endpoint_unsupported_account_features(e):
+                return self._list_files_via_blob(search_path, timeout_seconds=timeout_seconds, per_user_cap=per_user_cap)
+            logger.warning(f"ADLS list failed for {search_path}: {e}")
+            return None
+
+    def _get_org_listing_index(self, organization_id: int, file_system_client, timeout_seconds: int) -> List[Dict]:
+        """All result files under the org-scoped prefixes for the last AZURE_ADLS_INDEX_MONTHS months.
+
+        The index is kept in the shared cache per org and refreshed one month partition at a
+        time: the current month is re-listed every AZURE_ADLS_LIST_CACHE_SECONDS, while a past
+        month is listed once more after it has settled and then served from the index.
+        """
+        return self._index_flight.do(
+            organization_id,
+            lambda: self._refresh_org_listing_index(organization_id, file_system_client, timeout_seconds),
+        )
+
+    def _refresh_org_listing_index(self, organization_id: int, file_system_client, timeout_seconds: int) -> List[Dict]:
+        now = datetime.now()
+        refresh_seconds = _safe_int_env('AZURE_ADLS_LIST_CACHE_SECONDS', 300)
+        settle_seconds = _safe_int_env('AZURE_ADLS_INDEX_SETTLE_SECONDS', 3600)
+        index = cache_service.get(_ORG_LISTING_INDEX_NAMESPACE, organization_id) or {}
+
+        max_blobs = _safe_int_env('AZURE_ADLS_LIST_MAX_BLOBS', 250)
+
+        updated: dict[str, Dict] = {}
+        changed = False
+        for year, month in _recent_months(now, max(1, _safe_int_env('AZURE_ADLS_INDEX_MONTHS', 2))):
+            partition = f"{year}/{month:02d}"
+            entry = index.get(partition)
+            if entry and (entry['settled'] or (time.time() - entry['listed_at']) < refresh_seconds):
+                updated[partition] = entry
+                continue
+
+            listed_at = time.time()
+            files: dict[str, Dict] = {}
+            failed = False
+            capped = False
+            for prefix in (
+                f"{self.results_path}/{partition}/org_{organization_id}",
+                f"{self.results_path}/{partition}/organizations/{organization_id}",
+            ):
+                found = self._list_search_path(file_system_client, prefix, timeout_seconds, per_user_cap=True)
+                if found is None:
+                    failed = True
+                    break
+                # A Blob fallback listing keeps at most AZURE_ADLS_LIST_MAX_BLOBS files per user;
+                # a user at the limit may be missing files.
+                if max_blobs > 0:
+                    per_user: dict[Optional[str], int] = {}
+                    for f in found:
+                        user = _user_segment(f['file_path'])
+                        per_user[user] = per_user.get(user, 0) + 1
+                    capped = capped or any(count >= max_blobs for count in per_user.values())
+                for f in found:
+                    files[f['file_path']] = f
+
+            if failed:
+                # Keep serving the previous listing for this month, if any.
+                if entry:
+                    updated[partition] = entry
+                continue
+
+            month_end = datetime(year + (month == 12), month % 12 + 1, 1).timestamp()
+            updated[partition] = {
+                'listed_at': listed_at,
+                'settled': not capped and listed_at >= month_end + settle_seconds,
+                'files': files,
+            }
+            changed = True
+
+        if changed:
+            cache_service.set(_ORG_LISTING_INDEX_NAMESPACE, organization_id, updated, ttl_seconds=_ORG_LISTING_INDEX_TTL_SECONDS)
+        return [f for entry in updated.values() for f in entry['files'].values()]
+
     def get_compliance_files(self, user_id: int = None, organization_id: int = None) -> List[Dict]:
-        """Get list of compliance result files from ADLS."""
+        """Get list of compliance result files from ADLS (coalesced per user/org)."""
+        flight_key = (int(user_id) if user_id is not None else None, int(organization_id) if organization_id is not None else None)
+        return self._list_flight.do(flight_key, lambda: self._get_compliance_files(user_id, organization_id))
+
+    def _get_compliance_files(self, user_id: int = None, organization_id: int = None) -> List[Dict]:
         try:
             if not self.service_client and not self.blob_service_client:
                 logger.warning("No ADLS/Blob client available")
@@ -145,7 +442,7 @@ class AzureDataLakeService:
             # If the endpoint is failing (auth/config/account features), don't block every page load.
             failure_ttl = _safe_int_env('AZURE_ADLS_FAILURE_CACHE_SECONDS', 120)
             if failure_ttl > 0:
-                failure = _COMPLIANCE_FILES_FAILURE_CACHE.get(cache_key)
+                failure = cache_service.get(_COMPLIANCE_FILES_FAILURE_CACHE_NAMESPACE, cache_key)
                 if failure:
                     failed_at, _msg = failure
                     if (time.time() - failed_at) < failure_ttl:
@@ -155,7 +452,7 @@ class AzureDataLakeService:
             # Default higher to avoid paying ADLS list latency on frequent dashboard refreshes.
             list_cache_ttl = _safe_int_env('AZURE_ADLS_LIST_CACHE_SECONDS', 300)
             if list_cache_ttl > 0:
-                cached = _COMPLIANCE_FILES_CACHE.get(cache_key)
+                cached = cache_service.get(_COMPLIANCE_FILES_CACHE_NAMESPACE, cache_key)
                 if cached:
                     cached_at, cached_files = cached
                     if (time.time() - cached_at) < list_cache_ttl:
@@ -169,106 +466,61 @@ class AzureDataLakeService:
             if self.service_client:
                 file_system_client = self.service_client.get_file_system_client(self.container_name)
             
-            from datetime import datetime
-            year = datetime.now().year
-            month = datetime.now().month
-
-            # Prefer org-scoped paths when org_id is known; fall back to legacy per-user path.
+            files_by_path: dict[str, Dict] = {}
             search_paths: list[str] = []
-            if user_id and organization_id:
-                org_id_int = int(organization_id)
-                user_id_int = int(user_id)
-                search_paths.append(f"{self.results_path}/{year}/{month:02d}/org_{org_id_int}/user_{user_id_int}")
-                search_paths.append(f"{self.results_path}/{year}/{month:02d}/organizations/{org_id_int}/user_{user_id_int}")
-
-            if user_id:
-                search_paths.append(f"{self.results_path}/{year}/{month:02d}/user_{int(user_id)}")
-            else:
-                search_paths.append(self.results_path)
 
-            files_by_path: dict[str, Dict] = {}
-            for search_path in search_paths:
-                # Prefer ADLS path listing when available.
-                if file_system_client:
-                    try:
-                        try:
-                            paths = file_system_client.get_paths(path=search_path, timeout=timeout_seconds)
-                        except TypeError:
-                            paths = file_system_client.get_paths(path=search_path)
-
-                        for path in paths:
-                            if not path.is_directory and (path.name.endswith('.csv') or path.name.endswith('.json')):
-                                file_name = os.path.basename(path.name)
-
-                                framework = 'Multiple Frameworks'
-                                if 'summary' in file_name.lower():
-                                    framework = 'Compliance Summary'
-
-                                files_by_path[path.name] = {
-                                    'file_name': file_name,
-                                    'file_path': path.name,
-                                    'last_modified': path.last_modified,
-                                    'file_size': path.content_length or 0,
-                                    'framework': framework,
-                                }
-                    except Exception as e:
-                        # If the account doesn't support ADLS path operations, fall back to Blob listing.
-                        if self._is_endpoint_unsupported_account_features(e):
-                            blob_files = self._list_files_via_blob(search_path, timeout_seconds=timeout_seconds)
-                            for f in blob_files:
-                                files_by_path[f['file_path']] = f
-                        else:
-                            continue
-                else:
-                    # No ADLS client: attempt Blob fallback.
-                    blob_files = self._list_files_via_blob(search_path, timeout_seconds=timeout_seconds)
-                    for f in blob_files:
+            # Org-scoped results come from the shared per-org index (one listing per org for all
+            # of its users, spanning recent months); legacy per-user paths are the fallback.
+            if user_id and organization_id:
+                user_marker = f"/user_{int(user_id)}/"
+                for f in self._get_org_listing_index(int(organization_id), file_system_client, timeout_seconds):
+                    if user_marker in f['file_path']:
                         files_by_path[f['file_path']] = f
-
-                # If we found anything in the preferred path, stop early.
-                if files_by_path and (user_id and organization_id):
-                    break
+                search_paths.append(f"org index {int(organization_id)}")
+
+            if not files_by_path:
+                now = datetime.now()
+                legacy_path = (
+                    f"{self.results_path}/{now.year}/{now.month:02d}/user_{int(user_id)}"
+                    if user_id else self.results_path
+                )
+                search_paths.append(legacy_path)
+                for f in self._list_search_path(file_system_client, legacy_path, timeout_seconds) or []:
+                    files_by_path[f['file_path']] = f
 
             files = list(files_by_path.values())
             logger.info(f"Found {len(files)} compliance files in ADLS (searched: {search_paths})")
 
             if list_cache_ttl > 0:
-                _COMPLIANCE_FILES_CACHE[cache_key] = (time.time(), files)
+                cache_service.set(_COMPLIANCE_FILES_CACHE_NAMESPACE, cache_key, (time.time(), files), ttl_seconds=list_cache_ttl)
             return files
             
         except Exception as e:
             try:
                 cache_key = (int(user_id) if user_id is not None else None, int(organization_id) if organization_id is not None else None)
-                _COMPLIANCE_FILES_FAILURE_CACHE[cache_key] = (time.time(), str(e))
+                failure_ttl = _safe_int_env('AZURE_ADLS_FAILURE_CACHE_SECONDS', 120)
+                cache_service.set(_COMPLIANCE_FILES_FAILURE_CACHE_NAMESPACE, cache_key, (time.time(), str(e)), ttl_seconds=failure_ttl)
             except Exception:
                 pass
             logger.error(f"Error getting compliance files: {e}")
             return []
     
-    def get_file_analysis_summary(self, file_path: str) -> Dict:
-        """Get analysis summary for a specific file from ADLS."""
+    def get_file_analysis_summary(self, file_path: str, version=None) -> Dict:
+        """Get analysis summary for a specific file from ADLS.
+
+        ``version`` is the etag (or last_modified) from the listing; see ``summarise_adls_file``.
+        Raw rows are not kept, so ``requirements`` is empty; per-framework results are in
+        ``frameworks``. A file that could not be read is reported as 'No Data' with
+        ``read_error`` set, so callers can tell it apart from a genuinely empty file.
+        """
         try:
             file_name = os.path.basename(file_path)
             
-            # Read actual data from ADLS
-            raw_data = self.read_adls_file(file_path)
-            
-            if not raw_data:
-                return {
-                    'file_name': file_name,
-                    'total_requirements': 0,
-                    'complete_count': 0,
-                    'needs_review_count': 0,
-                    'missing_count': 0,
-                    'overall_status': 'No Data',
-                    'compliancy_rate': 0,
-                    'weighted_score': 0,
-                    'last_updated': datetime.now(),
-                    'requirements': []
-                }
-            
-            # Process the real ADLS data
-            summary = self.process_adls_data(raw_data)
+            # Stream the ADLS data straight into the aggregation
+            summary = self.summarise_adls_file(file_path, version=version)
+            read_error = summary is None
+            if read_error:
+                summary = self.process_adls_data([])
             
             return {
                 'file_name': file_name,
@@ -280,8 +532,9 @@ class AzureDataLakeService:
                 'compliancy_rate': summary['compliancy_rate'],
                 'weighted_score': summary['weighted_score'],
                 'last_updated': datetime.now(),
-                'requirements': raw_data,  # Your actual ADLS data
-                'frameworks': summary.get('frameworks', [])  # ADD THIS!
+                'requirements': [],
+                'frameworks': summary.get('frameworks', []),
+                'read_error': read_error
             }
                 
         except Exception as e:
@@ -299,84 +552,158 @@ class AzureDataLakeService:
                 'requirements': []
             }
     
+    def summarise_adls_file(self, file_path: str, version: Optional[str] = None) -> Optional[Dict]:
+        """Aggregate a CSV/JSON result file from ADLS (coalesced per file path).
+
+        Rows stream from the download into ``summarise_adls_rows`` and only the summary is
+        cached, with the blob's etag/last_modified. When ``version`` (from
+        ``get_compliance_files``) matches the cached entry no request is made at all;
+        otherwise the download is conditional on the cached etag, so an unchanged blob is
+        neither transferred nor re-parsed. Returns None when the file cannot be read.
+        """
+        cached = cache_service.get(_FILE_SUMMARY_CACHE_NAMESPACE, file_path)
+        if cached and version and version in (cached[0], cached[1]):
+            return cached[2]
+        return self._read_flight.do(file_path, lambda: self._summarise_adls_file(file_path))
+
     def read_adls_file(self, file_path: str) -> List[Dict]:
-        """Read and parse a CSV/JSON file from ADLS."""
+        """Read and parse a CSV/JSON file from ADLS into rows (uncached, for diagnostics)."""
         try:
-            if not self.service_client and not self.blob_service_client:
-                logger.warning("No ADLS/Blob client available")
+            download, _not_modified = self._open_result_download(file_path, None)
+            if download is None:
                 return []
+            data = list(self._iter_download_rows(file_path, download))
+            logger.info(f"Successfully read {len(data)} rows from {file_path}")
+            return data
+        except Exception as e:
+            logger.error(f"Error reading ADLS file {file_path}: {e}")
+            return []
 
-            # Best-effort timeout for ADLS download operations (seconds). Some SDK versions support it.
-            timeout_seconds = _safe_int_env('AZURE_ADLS_TIMEOUT_SECONDS', 10)
-            
-            content = None
+    def _download_conditional(self, client, method: str, timeout_seconds: int, etag: Optional[str]):
+        """Call ``download_file``/``download_blob``; returns None when the blob still matches ``etag``."""
+        download = getattr(client, method)
+        kwargs = {}
+        if etag and MatchConditions is not None:
+            kwargs = {'etag': etag, 'match_condition': MatchConditions.IfModified}
+        try:
+            try:
+                return download(timeout=timeout_seconds, **kwargs)
+            except TypeError:
+                return download(**kwargs)
+        except Exception as e:
+            if ResourceNotModifiedError is not None and isinstance(e, ResourceNotModifiedError):
+                return None
+            if getattr(e, 'status_code', None) == 304:
+                return None
+            raise
+
+    def _open_result_download(self, file_path: str, etag: Optional[str]):
+        """Start downloading ``file_path``; returns ``(download, not_modified)``.
+
+        ``download`` is None when no client is available or the blob still matches ``etag``.
+        """
+        if not self.service_client and not self.blob_service_client:
+            logger.warning("No ADLS/Blob client available")
+            return None, False
+
+        # Best-effort timeout for ADLS download operations (seconds). Some SDK versions support it.
+        timeout_seconds = _safe_int_env('AZURE_ADLS_TIMEOUT_SECONDS', 10)
+
+        # Prefer ADLS file client when available.
+        if self.service_client:
+            try:
+                file_client = self.service_client.get_file_client(self.container_name, file_path)
+                download = self._download_conditional(file_client, 'download_file', timeout_seconds, etag)
+                return download, download is None
+            except Exception as e:
+                # Fallback to blob if ADLS path ops are unsupported.
+                if not self._is_endpoint_unsupported_account_features(e):
+                    raise
+
+        if not self.blob_service_client:
+            return None, False
+        blob_client = self.blob_service_client.get_blob_client(container=self.container_name, blob=file_path)
+        download = self._download_conditional(blob_client, 'download_blob', timeout_seconds, etag)
+        return download, download is None
+
+    def _iter_download_rows(self, file_path: str, download) -> Iterator[Dict]:
+        if file_path.endswith('.csv'):
+            # Stream CSVs chunk by chunk so the raw bytes and decoded text are never held whole.
+            return self._iter_csv_rows(_iter_download_lines(download))
+        content = download.readall().decode('utf-8')
+        return iter(self._parse_file_content(file_path, content))
+
+    def _summarise_adls_file(self, file_path: str) -> Optional[Dict]:
+        try:
+            cached = cache_service.get(_FILE_SUMMARY_CACHE_NAMESPACE, file_path)
+            download, not_modified = self._open_result_download(file_path, cached[0] if cached else None)
+
+            if not_modified:
+                logger.info(f"ADLS file unchanged, using cached summary: {file_path}")
+                return cached[2]
+            if download is None:
+                return None
+
+            summary = self.summarise_adls_rows(self._iter_download_rows(file_path, download))
+
+            properties = getattr(download, 'properties', None)
+            etag = getattr(properties, 'etag', None)
+            last_modified = getattr(properties, 'last_modified', None)
+            summary_ttl = _safe_int_env('AZURE_ADLS_PARSED_CACHE_SECONDS', 86400)
+            if etag or last_modified:
+                cache_service.set(
+                    _FILE_SUMMARY_CACHE_NAMESPACE,
+                    file_path,
+                    (str(etag) if etag else None, file_version({'last_modified': last_modified}), summary),
+                    ttl_seconds=summary_ttl,
+                )
+            return summary
 
-            # Prefer ADLS file client when available.
-            if self.service_client:
-                try:
-                    file_client = self.service_client.get_file_client(self.container_name, file_path)
-                    try:
-                        download = file_client.download_file(timeout=timeout_seconds)
-                    except TypeError:
-                        download = file_client.download_file()
-                    content = download.readall().decode('utf-8')
-                except Exception as e:
-                    # Fallback to blob if ADLS path ops are unsupported.
-                    if not self._is_endpoint_unsupported_account_features(e):
-                        raise
-
-            if content is None:
-                if not self.blob_service_client:
-                    return []
-                blob_client = self.blob_service_client.get_blob_client(container=self.container_name, blob=file_path)
-                try:
-                    download = blob_client.download_blob(timeout=timeout_seconds)
-                except TypeError:
-                    download = blob_client.download_blob()
-                content = download.readall().decode('utf-8')
-            
-            # Parse CSV content
-            if file_path.endswith('.csv'):
-                import csv
-                import io
-                
-                csv_reader = csv.DictReader(io.StringIO(content))
-                data = []
-                
-                for row in csv_reader:
-                    # Convert your exact column names to the expected format
-                    processed_row = {}
-                    for key, value in row.items():
-                        clean_key = key.strip()
-                        
-                        # Map your actual columns: Framework, Compliance_Score, Status
-                        if clean_key == 'Framework':
-                            processed_row['Framework'] = value.strip() if value else ''
-                        elif clean_key == 'Compliance_Score':
-                            processed_row['Compliance_Score'] = float(value) if value else 0.0
-                        elif clean_key == 'Status':
-                            processed_row['Status'] = value.strip() if value else ''
-                    
-                    # Only add if we have data
-                    if processed_row:
-                        data.append(processed_row)
-                        logger.debug(f"Parsed row: {processed_row}")
-                
-                logger.info(f"Successfully read {len(data)} rows from {file_path}")
-                logger.debug(f"Data: {data}")
-                return data
-            
-            elif file_path.endswith('.json'):
-                import json
-                data = json.loads(content)
-                return data if isinstance(data, list) else [data]
-            
-            return []
-            
         except Exception as e:
             logger.error(f"Error reading ADLS file {file_path}: {e}")
-            return []
-    
+            return None
+
+    @staticmethod
+    def _iter_csv_rows(lines: Iterable[str]) -> Iterator[Dict]:
+        """Yield result rows from CSV text lines, keeping only the columns we use."""
+        import csv
+
+        for row in csv.DictReader(lines):
+            # Convert your exact column names to the expected format
+            processed_row = {}
+            for key, value in row.items():
+                clean_key = key.strip()
+
+                # Map your actual columns: Framework, Compliance_Score, Status
+                if clean_key == 'Framework':
+                    processed_row['Framework'] = value.strip() if value else ''
+                elif clean_key == 'Compliance_Score':
+                    processed_row['Compliance_Score'] = float(value) if value else 0.0
+                elif clean_key == 'Status':
+                    processed_row['Status'] = value.strip() if value else ''
+
+            # Only add if we have data
+            if processed_row:
+                yield processed_row
+
+    @classmethod
+    def _parse_file_content(cls, file_path: str, content: str) -> List[Dict]:
+        """Parse downloaded CSV/JSON text into result rows."""
+        # Parse CSV content
+        if file_path.endswith('.csv'):
+            import io
+
+            data = list(cls._iter_csv_rows(io.StringIO(content)))
+            logger.info(f"Successfully read {len(data)} rows from {file_path}")
+            return data
+        
+        elif file_path.endswith('.json'):
+            import json
+            data = json.loads(content)
+            return data if isinstance(data, list) else [data]
+        
+        return []
+
     def process_adls_data(self, raw_data: List[Dict]) -> Dict:
         """Process raw ADLS data into summary format."""
         if not raw_data:
@@ -391,6 +718,109 @@ class AzureDataLakeService:
                 'frameworks': []
             }
         
+        if pd is not None and len(raw_data) >= _VECTORISE_MIN_ROWS:
+            summary = self._process_adls_data_vectorised(raw_data)
+            if summary is not None:
+                return summary
+        return self._process_adls_data_rows(raw_data)
+
+    def summarise_adls_rows(self, rows: Iterable[Dict]) -> Dict:
+        """``process_adls_data`` over a row iterator, holding one batch of rows at a time.
+
+        Batch counts and framework entries are merged in order; as in the row path, the
+        first "Overall" row of the whole file sets the score.
+        """
+        rows = iter(rows)
+        merged = None
+        overall_score = None
+        for batch in iter(lambda: list(islice(rows, _SUMMARY_BATCH_ROWS)), []):
+            summary = self.process_adls_data(batch)
+            if merged is None:
+                merged = summary
+            else:
+                for key in ('total_requirements', 'complete_count', 'needs_review_count', 'missing_count'):
+                    merged[key] += summary[key]
+                merged['frameworks'].extend(summary['frameworks'])
+            if overall_score is None:
+                overall_row = next((r for r in batch if r.get('Framework', '').lower() == 'overall'), None)
+                if overall_row is not None:
+                    overall_score = overall_row.get('Compliance_Score', 0)
+
+        if merged is None:
+            return self.process_adls_data([])
+        compliancy_rate = float(overall_score) if overall_score else 0
+        merged['overall_status'] = self._overall_status(compliancy_rate)
+        merged['compliancy_rate'] = round(compliancy_rate, 2)
+        merged['weighted_score'] = round(compliancy_rate, 2)
+        return merged
+
+    @staticmethod
+    def _overall_status(compliancy_rate: float) -> str:
+        if compliancy_rate >= 9:
+            return 'Excellent'
+        if compliancy_rate >= 7:
+            return 'Good'
+        if compliancy_rate >= 5:
+            return 'Needs Attention'
+        return 'Critical'
+
+    def _process_adls_data_vectorised(self, raw_data: List[Dict]) -> Optional[Dict]:
+        """Columnar version of ``_process_adls_data_rows`` for large result files.
+
+        Rows are transposed once into arrays; labels are factorised so lower-casing and
+        status matching run over the distinct values only, and counts come from a single
+        ``bincount``. Returns None for rows the row-wise path treats specially (missing
+        keys, non-string labels, non-numeric scores) so the caller falls back to it and
+        the output stays identical.
+        """
+        try:
+            framework, score, status = (
+                np.array(column, dtype=object)
+                for column in zip(*map(itemgetter('Framework', 'Compliance_Score', 'Status'), raw_data))
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        infer_dtype = pd.api.types.infer_dtype
+        if infer_dtype(framework, skipna=False) != 'string' or infer_dtype(status, skipna=False) != 'string':
+            return None
+        if infer_dtype(score, skipna=False) not in ('floating', 'integer', 'mixed-integer-float', 'boolean'):
+            return None
+        scores = score.astype(float)
+
+        framework_codes, framework_labels = pd.factorize(framework)
+        overall_codes = [i for i, label in enumerate(framework_labels) if label.lower() == 'overall']
+        is_overall = np.isin(framework_codes, overall_codes)
+        rows = ~is_overall
+
+        status_codes, status_labels = pd.factorize(status[rows])
+        status_counts: dict[str, int] = {}
+        for label, count in zip(status_labels, np.bincount(status_codes, minlength=len(status_labels)).tolist()):
+            key = label.lower()
+            status_counts[key] = status_counts.get(key, 0) + count
+
+        overall_positions = np.flatnonzero(is_overall)
+        overall_score = float(scores[overall_positions[0]]) if len(overall_positions) else 0
+        compliancy_rate = overall_score if overall_score else 0
+
+        frameworks = [
+            {'name': name, 'score': value, 'status': label}
+            for name, value, label in zip(framework[rows].tolist(), scores[rows].tolist(), status[rows].tolist())
+        ]
+
+        return {
+            'total_requirements': len(frameworks),
+            'complete_count': status_counts.get('complete', 0),
+            'needs_review_count': status_counts.get('needs review', 0),
+            'missing_count': status_counts.get('missing', 0),
+            'overall_status': self._overall_status(compliancy_rate),
+            'compliancy_rate': round(compliancy_rate, 2),
+            'weighted_score': round(compliancy_rate, 2),
+            'frameworks': frameworks
+        }
+
+    def _process_adls_data_rows(self, raw_data: List[Dict]) -> Dict:
+        """Row-by-row aggregation; the reference behaviour for ``process_adls_data``."""
         # Filter out "Overall" row for counting
         framework_data = [r for r in raw_data if r.get('Framework', '').lower() != 'overall']
         
@@ -408,14 +838,7 @@ class AzureDataLakeService:
         compliancy_rate = float(overall_score) if overall_score else 0
         
         # Determine overall status based on score
-        if compliancy_rate >= 9:
-            overall_status = 'Excellent'
-        elif compliancy_rate >= 7:
-            overall_status = 'Good'
-        elif compliancy_rate >= 5:
-            overall_status = 'Needs Attention'
-        else:
-            overall_status = 'Critical'
+        overall_status = self._overall_status(compliancy_rate)
         
         # Extract framework details
         frameworks = []
@@ -438,13 +861,17 @@ class AzureDataLakeService:
         }
     
     def get_dashboard_summary(self, user_id: int = None, organization_id: int = None) -> Dict:
-        """Get overall dashboard summary from ADLS compliance files."""
+        """Get overall dashboard summary from ADLS compliance files.
+
+        Fresh cache entries are returned directly. Stale entries (up to
+        AZURE_DASHBOARD_STALE_MAX_SECONDS) are returned immediately as well, and a
+        background refresh is scheduled so the next request sees fresh data.
+        """
         try:
             # Default higher: ADLS calls are high-latency and make the UI feel broken.
             cache_seconds = _safe_int_env('AZURE_DASHBOARD_CACHE_SECONDS', 300)
-            max_files = _safe_int_env('AZURE_DASHBOARD_MAX_FILES', 4)
             cache_key = (int(user_id) if user_id is not None else None, int(organization_id) if organization_id is not None else None)
-            cached = _DASHBOARD_SUMMARY_CACHE.get(cache_key) if cache_seconds > 0 else None
+            cached = cache_service.get(_DASHBOARD_SUMMARY_CACHE_NAMESPACE, cache_key) if cache_seconds > 0 else None
 
             # Serve cached results even if slightly stale to keep navigation fast,
             # but bound staleness so we eventually refresh.
@@ -457,96 +884,11 @@ class AzureDataLakeService:
                     return cached_value
                 if stale_max_seconds > 0 and age < stale_max_seconds:
                     logger.info('Dashboard summary serving stale cache')
+                    self._schedule_dashboard_refresh(user_id, organization_id)
                     return cached_value
 
-            files = self.get_compliance_files(user_id, organization_id)
-            total_files = len(files)
-            
-            if total_files == 0:
-                connection_status = 'Connected - No Files Found' if self.service_client else 'Not Connected to ADLS'
-                result = {
-                    'total_files': 0,
-                    'avg_compliancy_rate': 0,
-                    'total_requirements': 0,
-                    'total_complete': 0,
-                    'total_needs_review': 0,
-                    'total_missing': 0,
-                    'last_updated': datetime.now(),
-                    'file_summaries': [],
-                    'connection_status': connection_status,
-                    'adls_path': f'abfss://{self.container_name}@{self.account_name}.dfs.core.windows.net/{self.results_path}/'
-                }
-
-                # Cache the empty result too; otherwise we retry the ADLS list operation on every request.
-                if cache_seconds > 0:
-                    _DASHBOARD_SUMMARY_CACHE[cache_key] = (time.time(), result)
-
-                return result
-            
-            # Dashboard optimization:
-            # Prefer a single precomputed summary file when present to avoid downloading/parsing many files.
-            # Fallback: limit the number of files processed to keep the dashboard responsive.
-            files_sorted = sorted(
-                files,
-                key=lambda f: (str(f.get('file_name') or '').lower(), f.get('last_modified') or datetime.min),
-                reverse=True,
-            )
-            lower_name = lambda f: str(f.get('file_name') or '').lower()
-            summary_candidates = [f for f in files_sorted if 'compliance_summary' in lower_name(f)]
-            if not summary_candidates:
-                summary_candidates = [f for f in files_sorted if 'summary' in lower_name(f)]
-
-            files_to_process = summary_candidates[:1] if summary_candidates else files_sorted[: max(1, max_files)]
-
-            # Process selected files
-            file_summaries = []
-            total_requirements = 0
-            total_complete = 0
-            total_needs_review = 0
-            total_missing = 0
-            compliancy_rates = []
-            
-            for file_info in files_to_process:
-                summary = self.get_file_analysis_summary(file_info['file_path'])
-                file_summaries.append({
-                    'file_name': summary['file_name'],
-                    'framework': file_info.get('framework', 'Unknown'),
-                    'compliancy_rate': summary['compliancy_rate'],
-                    'overall_status': summary['overall_status'],
-                    'total_requirements': summary['total_requirements'],
-                    'complete_count': summary['complete_count'],
-                    'needs_review_count': summary['needs_review_count'],
-                    'missing_count': summary['missing_count'],
-                    'last_updated': file_info['last_modified'],
-                    'frameworks': summary.get('frameworks', [])
-                })
-                
-                total_requirements += summary['total_requirements']
-                total_complete += summary['complete_count']
-                total_needs_review += summary['needs_review_count']
-                total_missing += summary['missing_count']
-                compliancy_rates.append(summary['compliancy_rate'])
-            
-            avg_compliancy_rate = sum(compliancy_rates) / len(compliancy_rates) if compliancy_rates else 0
-            
-            result = {
-                'total_files': total_files,
-                'avg_compliancy_rate': round(avg_compliancy_rate, 1),
-                'total_requirements': total_requirements,
-                'total_complete': total_complete,
-                'total_needs_review': total_needs_review,
-                'total_missing': total_missing,
-                'last_updated': max([f['last_updated'] for f in file_summaries]) if file_summaries else datetime.now(),
-                'file_summaries': file_summaries,
-                'connection_status': 'Connected - Files Found',
-                'adls_path': f'abfss://{self.container_name}@{self.account_name}.dfs.core.windows.net/{self.results_path}/'
-            }
-
-            if cache_seconds > 0:
-                _DASHBOARD_SUMMARY_CACHE[cache_key] = (time.time(), result)
+            return self._build_dashboard_summary(user_id, organization_id)
 
-            return result
-            
         except Exception as e:
             logger.error(f"Error getting dashboard summary: {e}")
             return {
@@ -562,5 +904,120 @@ class AzureDataLakeService:
                 'adls_path': f'abfss://{self.container_name}@{self.account_name}.dfs.core.windows.net/{self.results_path}/'
             }
 
+    def _get_refresh_executor(self) -> ThreadPoolExecutor:
+        with self._refresh_lock:
+            if self._refresh_executor is None:
+                workers = max(1, _safe_int_env('AZURE_DASHBOARD_REFRESH_WORKERS', 2))
+                self._refresh_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='adls-refresh')
+            return self._refresh_executor
+
+    def _schedule_dashboard_refresh(self, user_id: int = None, organization_id: int = None) -> bool:
+        """Refresh a stale dashboard summary in the background.
+
+        At most one refresh per (user_id, organization_id) runs in this process, and a
+        short lease in the shared cache stops other workers from starting a duplicate.
+        Returns True when a refresh was scheduled.
+        """
+        cache_key = (int(user_id) if user_id is not None else None, int(organization_id) if organization_id is not None else None)
+        lease_seconds = _safe_int_env('AZURE_DASHBOARD_REFRESH_LEASE_SECONDS', 60)
+
+        with self._refresh_lock:
+            if cache_key in self._refresh_in_flight:
+                return False
+            if lease_seconds > 0 and cache_service.get(_DASHBOARD_REFRESH_LEASE_NAMESPACE, cache_key):
+                return False
+            self._refresh_in_flight.add(cache_key)
+
+        if lease_seconds > 0:
+            cache_service.set(_DASHBOARD_REFRESH_LEASE_NAMESPACE, cache_key, time.time(), ttl_seconds=lease_seconds)
+
+        def _refresh():
+            try:
+                self._build_dashboard_summary(user_id, organization_id)
+                logger.info('Dashboard summary refreshed in background')
+            except Exception as e:
+                logger.error(f"Background dashboard refresh failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refresh_in_flight.discard(cache_key)
+                cache_service.delete(_DASHBOARD_REFRESH_LEASE_NAMESPACE, cache_key)
+
+        try:
+            self._get_refresh_executor().submit(_refresh)
+        except Exception as e:
+            logger.error(f"Could not schedule dashboard refresh: {e}")
+            with self._refresh_lock:
+                self._refresh_in_flight.discard(cache_key)
+            cache_service.delete(_DASHBOARD_REFRESH_LEASE_NAMESPACE, cache_key)
+            return False
+        return True
+
+    def adls_path(self) -> str:
+        return f'abfss://{self.container_name}@{self.account_name}.dfs.core.windows.net/{self.results_path}/'
+
+    def _get_fetch_executor(self) -> ThreadPoolExecutor:
+        with self._refresh_lock:
+            if self._fetch_executor is None:
+                workers = max(1, _safe_int_env('AZURE_DASHBOARD_FETCH_WORKERS', 4))
+                self._fetch_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='adls-fetch')
+            return self._fetch_executor
+
+    def _fetch_file_summaries(self, files: List[Dict]) -> List[Dict]:
+        """Run get_file_analysis_summary for each listed file on a bounded pool, preserving order."""
+        def _summarise(file_info: Dict) -> Dict:
+            return self.get_file_analysis_summary(file_info['file_path'], version=file_version(file_info))
+
+        if len(files) <= 1:
+            return [_summarise(f) for f in files]
+        return list(self._get_fetch_executor().map(_summarise, files))
+
+    def _build_dashboard_summary(self, user_id: int = None, organization_id: int = None) -> Dict:
+        """Fetch and aggregate the dashboard summary from ADLS, then cache it."""
+        cache_seconds = _safe_int_env('AZURE_DASHBOARD_CACHE_SECONDS', 300)
+        max_files = _safe_int_env('AZURE_DASHBOARD_MAX_FILES', 4)
+        cache_key = (int(user_id) if user_id is not None else None, int(organization_id) if organization_id is not None else None)
+        stale_max_seconds = _safe_int_env('AZURE_DASHBOARD_STALE_MAX_SECONDS', 3600)
+        # Keep entries around for the whole stale window, not just the fresh TTL.
+        cache_entry_ttl = max(cache_seconds, stale_max_seconds)
+
+        files = self.get_compliance_files(user_id, organization_id)
+        total_files = len(files)
+        
+        if total_files == 0:
+            connection_status = 'Connected - No Files Found' if self.service_client else 'Not Connected to ADLS'
+            result = {
+                'total_files': 0,
+                'avg_compliancy_rate': 0,
+                'total_requirements': 0,
+                'total_complete': 0,
+                'total_needs_review': 0,
+                'total_missing': 0,
+                'last_updated': datetime.now(),
+                'file_summaries': [],
+                'connection_status': connection_status,
+                'adls_path': self.adls_path()
+            }
+
+            # Cache the empty result too; otherwise we retry the ADLS list operation on every request.
+            if cache_seconds > 0:
+                cache_service.set(_DASHBOARD_SUMMARY_CACHE_NAMESPACE, cache_key, (time.time(), result), ttl_seconds=cache_entry_ttl)
+
+            return result
+        
+        files_to_process = select_dashboard_files(files, max_files)
+
+        # Download + parse files concurrently; results come back in files_to_process order
+        # so the merge below is identical to the sequential version.
+        summaries = self._fetch_file_summaries(files_to_process)
+
+        result = merge_dashboard_summaries(files_to_process, summaries, total_files)
+        result['connection_status'] = 'Connected - Files Found'
+        result['adls_path'] = self.adls_path()
+
+        if cache_seconds > 0:
+            cache_service.set(_DASHBOARD_SUMMARY_CACHE_NAMESPACE, cache_key, (time.time(), result), ttl_seconds=cache_entry_ttl)
+
+        return result
+
 # Global service instance
 azure_data_service = AzureDataLakeService()
\ No newline at end of file
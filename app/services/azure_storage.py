@@ -3,7 +3,8 @@ import uuid
 from datetime import datetime, timezone
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
 from azure.storage.filedatalake import DataLakeServiceClient, DataLakeFileClient
-from azure.core.exceptions import AzureError, ResourceNotFoundError
+from azure.core import MatchConditions
+from azure.core.exceptions import AzureError, HttpResponseError, ResourceNotFoundError, ResourceNotModifiedError
 from flask import current_app
 import logging
 
@@ -31,7 +32,14 @@ class AzureBlobStorageService:
                 return
             
             # Blob client is required. ADLS Gen2 (DataLake) is optional depending on account capabilities.
-            self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+            # Downloads fetch AZURE_DOWNLOAD_CHUNK_SIZE per request (SDK default: 32MB first GET),
+            # which bounds the memory a streamed download holds at once.
+            download_chunk_size = int(current_app.config.get('AZURE_DOWNLOAD_CHUNK_SIZE') or 4 * 1024 * 1024)
+            self.blob_service_client = BlobServiceClient.from_connection_string(
+                self.connection_string,
+                max_single_get_size=download_chunk_size,
+                max_chunk_get_size=download_chunk_size,
+            )
 
             try:
                 self.datalake_service_client = DataLakeServiceClient.from_connection_string(self.connection_string)
@@ -150,15 +158,22 @@ class AzureBlobStorageService:
             # Only now do we pay the network cost of ensuring the container exists.
             self._ensure_container_exists_once()
 
+            if (current_app.config.get('AZURE_UPLOAD_MODE') or 'streaming') == 'streaming':
+                return self._upload_file_streaming(file_stream, file_path, content_type, metadata)
+
             # Try ADLS Gen2 upload first (if available)
+            data = None
             if self.datalake_service_client is not None:
+                # Read once: the Blob fallback reuses these bytes, since request streams
+                # (e.g. a ValidatingStream) cannot be rewound for a second attempt.
+                data = file_stream.read()
                 try:
                     file_system_client = self.datalake_service_client.get_file_system_client(self.container_name)
                     file_client = file_system_client.get_file_client(file_path)
 
                     # Upload file data
                     file_client.upload_data(
-                        data=file_stream.read(),
+                        data=data,
                         overwrite=True,
                         metadata=metadata,
                     )
@@ -178,10 +193,11 @@ class AzureBlobStorageService:
                     logger.warning(f"ADLS Gen2 upload failed, falling back to Blob Storage: {adls_error}")
 
             # Blob Storage upload
-            try:
-                file_stream.seek(0)
-            except Exception:
-                pass
+            if data is None:
+                try:
+                    file_stream.seek(0)
+                except Exception:
+                    pass
 
             blob_client = self.blob_service_client.get_blob_client(
                 container=self.container_name,
@@ -189,7 +205,7 @@ class AzureBlobStorageService:
             )
 
             upload_params = {
-                'data': file_stream,
+                'data': file_stream if data is None else data,
                 'overwrite': True
             }
 
@@ -229,6 +245,154 @@ class AzureBlobStorageService:
                 'error_code': 'UPLOAD_ERROR'
             }
     
+    @staticmethod
+    def block_id(index):
+        """Block id for the ``index``-th block; ids must be equal length (the SDK base64-encodes them)."""
+        return f'{int(index):08d}'
+
+    def stage_block(self, file_path, block_index, data):
+        """
+        Stage one block of a blob without committing it (see ``commit_blocks``).
+
+        Re-staging the same index replaces the earlier data, so clients can safely retry.
+
+        Returns:
+            dict: Result with success status
+        """
+        if not self.is_configured():
+            return {
+                'success': False,
+                'error': 'Azure Storage not configured',
+                'error_code': 'STORAGE_NOT_CONFIGURED'
+            }
+
+        try:
+            self._ensure_container_exists_once()
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=file_path
+            )
+            blob_client.stage_block(block_id=self.block_id(block_index), data=data, length=len(data))
+            return {'success': True, 'block_index': int(block_index), 'size': len(data)}
+
+        except AzureError as e:
+            logger.error(f"Azure error staging block {block_index} of {file_path}: {e}")
+            return {
+                'success': False,
+                'error': f'Azure storage error: {str(e)}',
+                'error_code': 'AZURE_ERROR'
+            }
+        except Exception as e:
+            logger.error(f"Unexpected error staging block {block_index} of {file_path}: {e}")
+            return {
+                'success': False,
+                'error': f'Upload failed: {str(e)}',
+                'error_code': 'UPLOAD_ERROR'
+            }
+
+    def commit_blocks(self, file_path, block_count, content_type=None, metadata=None):
+        """
+        Commit blocks ``0..block_count-1`` (staged via ``stage_block``) as the blob content.
+
+        Returns:
+            dict: Upload result with success status and file info
+        """
+        if not self.is_configured():
+            return {
+                'success': False,
+                'error': 'Azure Storage not configured',
+                'error_code': 'STORAGE_NOT_CONFIGURED'
+            }
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=file_path
+            )
+
+            commit_params = {}
+            if content_type:
+                from azure.storage.blob import ContentSettings
+                commit_params['content_settings'] = ContentSettings(content_type=content_type)
+            if metadata:
+                commit_params['metadata'] = metadata
+
+            committed = blob_client.commit_block_list(
+                [self.block_id(i) for i in range(int(block_count))],
+                **commit_params
+            ) or {}
+
+            return {
+                'success': True,
+                'file_path': file_path,
+                'last_modified': committed.get('last_modified'),
+                'etag': committed.get('etag'),
+                'url': blob_client.url,
+                'storage_type': 'Blob_Storage',
+                'blocks': int(block_count),
+            }
+
+        except AzureError as e:
+            logger.error(f"Azure error committing blocks for {file_path}: {e}")
+            return {
+                'success': False,
+                'error': f'Azure storage error: {str(e)}',
+                'error_code': 'AZURE_ERROR'
+            }
+        except Exception as e:
+            logger.error(f"Unexpected error committing blocks for {file_path}: {e}")
+            return {
+                'success': False,
+                'error': f'Upload failed: {str(e)}',
+                'error_code': 'UPLOAD_ERROR'
+            }
+
+    def _upload_file_streaming(self, file_stream, file_path, content_type=None, metadata=None):
+        """Upload by staging fixed-size blocks read from ``file_stream``, then committing them.
+
+        Only one block (AZURE_UPLOAD_BLOCK_SIZE, default 4MB) is held in memory at a time, so
+        the worker never buffers the whole file. Works on HNS (ADLS Gen2) accounts too, since
+        it goes through the Blob API. Staged blocks that are never committed expire in Azure.
+        """
+        block_size = max(64 * 1024, int(current_app.config.get('AZURE_UPLOAD_BLOCK_SIZE') or 4 * 1024 * 1024))
+
+        blob_client = self.blob_service_client.get_blob_client(
+            container=self.container_name,
+            blob=file_path
+        )
+
+        block_ids = []
+        size = 0
+        while True:
+            chunk = file_stream.read(block_size)
+            if not chunk:
+                break
+            block_id = self.block_id(len(block_ids))
+            blob_client.stage_block(block_id=block_id, data=chunk, length=len(chunk))
+            block_ids.append(block_id)
+            size += len(chunk)
+            chunk = None
+
+        commit_params = {}
+        if content_type:
+            from azure.storage.blob import ContentSettings
+            commit_params['content_settings'] = ContentSettings(content_type=content_type)
+        if metadata:
+            commit_params['metadata'] = metadata
+
+        committed = blob_client.commit_block_list(block_ids, **commit_params) or {}
+
+        return {
+            'success': True,
+            'file_path': file_path,
+            'size': size,
+            'last_modified': committed.get('last_modified'),
+            'etag': committed.get('etag'),
+            'url': blob_client.url,
+            'storage_type': 'Blob_Storage',
+            'blocks': len(block_ids),
+        }
+
     def download_file(self, blob_name):
         """
         Download a file from Azure Blob Storage.
@@ -252,18 +416,17 @@ class AzureBlobStorageService:
                 blob=blob_name
             )
             
-            # Download the blob
+            # Download the blob; the response carries its properties too
             blob_data = blob_client.download_blob()
-            
-            # Get blob properties
-            blob_properties = blob_client.get_blob_properties()
+            blob_properties = blob_data.properties
             
             return {
                 'success': True,
                 'data': blob_data.readall(),
                 'content_type': blob_properties.content_settings.content_type,
                 'size': blob_properties.size,
-                'last_modified': blob_properties.last_modified
+                'last_modified': blob_properties.last_modified,
+                'etag': blob_properties.etag
             }
             
         except ResourceNotFoundError:
@@ -288,6 +451,149 @@ class AzureBlobStorageService:
                 'error_code': 'DOWNLOAD_ERROR'
             }
     
+    def get_file_properties(self, blob_name):
+        """
+        Fetch a blob's properties (one HEAD request, no content).
+        
+        Args:
+            blob_name: Name of the blob
+        
+        Returns:
+            dict: Result with 'etag', 'size', 'content_type' and 'last_modified'
+        """
+        if not self.is_configured():
+            return {
+                'success': False,
+                'error': 'Azure Storage not configured',
+                'error_code': 'STORAGE_NOT_CONFIGURED'
+            }
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            properties = blob_client.get_blob_properties()
+            return {
+                'success': True,
+                'etag': properties.etag,
+                'size': properties.size,
+                'content_type': properties.content_settings.content_type,
+                'last_modified': properties.last_modified
+            }
+            
+        except ResourceNotFoundError:
+            return {
+                'success': False,
+                'error': 'File not found',
+                'error_code': 'FILE_NOT_FOUND'
+            }
+        except Exception as e:
+            logger.error(f"Error reading properties of {blob_name}: {e}")
+            return {
+                'success': False,
+                'error': f'Azure storage error: {str(e)}',
+                'error_code': 'AZURE_ERROR'
+            }
+    
+    def open_download(self, blob_name, offset=None, length=None, if_none_match=None, if_range=None):
+        """
+        Start a streaming download of a blob, or of a byte range of it.
+        
+        The first request returns the blob's properties together with the first chunk;
+        the rest is fetched as ``result['chunks']`` is iterated, one
+        AZURE_DOWNLOAD_CHUNK_SIZE chunk at a time.
+        
+        Args:
+            blob_name: Name of the blob to download
+            offset: First byte to return (None for the whole blob)
+            length: Number of bytes from ``offset`` (None for "to the end")
+            if_none_match: ETag the client already holds; if it still matches, nothing is
+                transferred and error_code is 'NOT_MODIFIED'
+            if_range: ETag a range request is conditional on; if the blob changed since,
+                the whole blob is returned instead of the range
+        
+        Returns:
+            dict: Result with 'chunks' iterator, 'size' (bytes to be sent), 'total_size',
+                  'offset', 'partial', 'etag', 'last_modified' and 'content_type'
+        """
+        if not self.is_configured():
+            return {
+                'success': False,
+                'error': 'Azure Storage not configured',
+                'error_code': 'STORAGE_NOT_CONFIGURED'
+            }
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            
+            conditions = {}
+            if if_none_match:
+                conditions = {'etag': if_none_match, 'match_condition': MatchConditions.IfModified}
+            
+            downloader = blob_client.download_blob(offset=offset, length=length, **conditions)
+            if offset is not None and if_range is not None and downloader.properties.etag != if_range:
+                # The client's partial copy is out of date: send the current blob in full.
+                offset = length = None
+                downloader = blob_client.download_blob(**conditions)
+            
+            properties = downloader.properties
+            content_range = getattr(properties, 'content_range', None) or ''
+            try:
+                total_size = int(content_range.rsplit('/', 1)[1])
+            except (IndexError, ValueError):
+                total_size = downloader.size
+            
+            return {
+                'success': True,
+                'chunks': downloader.chunks(),
+                'size': downloader.size,
+                'total_size': total_size,
+                'offset': offset or 0,
+                'partial': offset is not None,
+                'etag': properties.etag,
+                'last_modified': properties.last_modified,
+                'content_type': properties.content_settings.content_type
+            }
+            
+        except ResourceNotModifiedError:
+            return {
+                'success': False,
+                'error': 'Not modified',
+                'error_code': 'NOT_MODIFIED',
+                'etag': if_none_match
+            }
+        except ResourceNotFoundError:
+            logger.error(f"Blob not found: {blob_name}")
+            return {
+                'success': False,
+                'error': 'File not found',
+                'error_code': 'FILE_NOT_FOUND'
+            }
+        except HttpResponseError as e:
+            if getattr(e, 'status_code', None) == 416:
+                return {
+                    'success': False,
+                    'error': 'Requested range not satisfiable',
+                    'error_code': 'RANGE_NOT_SATISFIABLE'
+                }
+            logger.error(f"Azure error downloading file {blob_name}: {e}")
+            return {
+                'success': False,
+                'error': f'Azure storage error: {str(e)}',
+                'error_code': 'AZURE_ERROR'
+            }
+        except Exception as e:
+            logger.error(f"Unexpected error downloading file {blob_name}: {e}")
+            return {
+                'success': False,
+                'error': f'Download failed: {str(e)}',
+                'error_code': 'DOWNLOAD_ERROR'
+            }
+    
     def delete_file(self, blob_name):
         """
         Delete a file from Azure Blob Storage.
@@ -340,13 +646,16 @@ class AzureBlobStorageService:
                 'error_code': 'DELETE_ERROR'
             }
     
-    def get_file_url(self, blob_name, expiry_hours=1):
+    def get_file_url(self, blob_name, expiry_hours=1, expiry_seconds=None, content_disposition=None, content_type=None):
         """
         Generate a signed URL for accessing a blob.
         
         Args:
             blob_name: Name of the blob
             expiry_hours: Hours until the URL expires
+            expiry_seconds: Seconds until the URL expires (overrides expiry_hours)
+            content_disposition: Content-Disposition Azure should send with the blob
+            content_type: Content-Type Azure should send instead of the stored one
         
         Returns:
             dict: Result with success status and URL
@@ -367,14 +676,21 @@ class AzureBlobStorageService:
                 blob=blob_name
             )
             
-            # Generate SAS token
+            lifetime = timedelta(seconds=expiry_seconds) if expiry_seconds else timedelta(hours=expiry_hours)
+            now = datetime.now(timezone.utc)
+            
+            # Generate SAS token: read-only, this blob only
             sas_token = generate_blob_sas(
                 account_name=blob_client.account_name,
                 container_name=self.container_name,
                 blob_name=blob_name,
                 account_key=blob_client.credential.account_key,
                 permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=expiry_hours)
+                # Small backdating tolerates clock skew between us and Azure.
+                start=now - timedelta(minutes=1),
+                expiry=now + lifetime,
+                content_disposition=content_disposition,
+                content_type=content_type
             )
             
             # Construct the full URL
@@ -383,7 +699,8 @@ class AzureBlobStorageService:
             return {
                 'success': True,
                 'url': url,
-                'expires_in_hours': expiry_hours
+                'expires_in_hours': lifetime.total_seconds() / 3600,
+                'expires_in_seconds': int(lifetime.total_seconds())
             }
             
         except Exception as e:
@@ -269,6 +269,49 @@ class AzureStorageService:
             logger.error(f"Error getting blob URL {blob_name}: {e}")
             return None
 
+    def get_sas_url(self, blob_name: str, organization_id: int = None, ttl_seconds: int = 300) -> Optional[str]:
+        """
+        Get a short-lived, read-only SAS URL for one blob in the logos container.
+        
+        Args:
+            blob_name: Name of the blob (with or without org prefix)
+            organization_id: Organization ID (if provided, prepends org folder)
+            ttl_seconds: Lifetime of the URL
+            
+        Returns:
+            Signed URL string if successful, None otherwise
+        """
+        try:
+            if not self.blob_service_client:
+                return None
+            
+            from datetime import datetime, timedelta, timezone
+            from azure.storage.blob import BlobSasPermissions, generate_blob_sas
+            
+            # If organization_id provided and blob_name doesn't start with "org_", prepend it
+            if organization_id and not blob_name.startswith('org_'):
+                blob_name = self._get_org_folder(organization_id) + blob_name
+            
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.logos_container_name,
+                blob=blob_name,
+            )
+            now = datetime.now(timezone.utc)
+            sas_token = generate_blob_sas(
+                account_name=blob_client.account_name,
+                container_name=self.logos_container_name,
+                blob_name=blob_name,
+                account_key=blob_client.credential.account_key,
+                permission=BlobSasPermissions(read=True),
+                start=now - timedelta(minutes=1),
+                expiry=now + timedelta(seconds=ttl_seconds),
+            )
+            return f"{blob_client.url}?{sas_token}"
+            
+        except Exception as e:
+            logger.error(f"Error generating SAS URL for {blob_name}: {e}")
+            return None
+
 
 # Global service instance
 azure_storage_service = AzureStorageService()
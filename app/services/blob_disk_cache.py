@@ -0,0 +1,282 @@
+"""
+Size-capped LRU disk cache for downloaded document blobs.
+
+Entries are keyed by (blob name, etag), so a changed blob is never served from a stale
+copy, and stored as ``<dir>/<aa>/<sha256>.blob``. Next to them, ``<sha256(name)>.latest``
+records the etag and properties of the newest cached version of each blob, so a download
+can be made conditional on it without asking Azure for the properties first. Writes go
+to a temp file in the same directory and are published with ``os.replace``, so readers
+only ever see complete files. Recency is the file's mtime (bumped on every hit); when the cache grows past
+BLOB_DISK_CACHE_MAX_BYTES the least recently used files are removed.
+
+Several gunicorn workers can share one directory: publishing is atomic, and eviction
+is serialised across processes with an advisory ``flock`` on ``<dir>/.lock`` (a
+worker that finds eviction already running skips it).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: eviction is only serialised within a process.
+    fcntl = None
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_SUFFIX = '.blob'
+_LATEST_SUFFIX = '.latest'
+
+
+class BlobDiskCache:
+    """Content cache for blobs on local disk (see module docstring)."""
+
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int):
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entry_bytes = max(0, int(max_entry_bytes))
+        self._evict_lock = threading.Lock()
+        # Bytes written since the last eviction pass; avoids scanning the directory on
+        # every write. Starts "due" so each process checks the cap on its first write.
+        self._written_since_evict = self.max_bytes
+
+    def _path(self, blob_name: str, etag: str) -> str:
+        digest = hashlib.sha256(f'{blob_name}\0{etag}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + _ENTRY_SUFFIX)
+
+    def get(self, blob_name: str, etag: Optional[str]) -> Optional[str]:
+        """Path of the cached copy of this blob version, or None. Marks it recently used."""
+        if not etag:
+            return None
+        path = self._path(blob_name, etag)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def _latest_path(self, blob_name: str) -> str:
+        digest = hashlib.sha256(blob_name.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + _LATEST_SUFFIX)
+
+    def latest(self, blob_name: str) -> Optional[tuple[str, dict]]:
+        """``(path, properties)`` of the newest cached version of this blob, or None.
+
+        ``properties`` holds 'etag', 'size', 'content_type' and 'last_modified' (a POSIX
+        timestamp) as they were when the entry was written.
+        """
+        try:
+            with open(self._latest_path(blob_name), 'r', encoding='utf-8') as fh:
+                properties = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        path = self.get(blob_name, properties.get('etag'))
+        if not path:
+            return None
+        try:
+            os.utime(self._latest_path(blob_name))
+        except OSError:
+            pass
+        return path, properties
+
+    def _record_latest(self, blob_name: str, properties: dict) -> None:
+        path = self._latest_path(blob_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+                json.dump(properties, fh)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not record latest blob cache entry: {e}")
+
+    def writer(
+        self,
+        blob_name: str,
+        etag: Optional[str],
+        expected_size: Optional[int] = None,
+        properties: Optional[dict] = None,
+    ) -> Optional['BlobCacheWriter']:
+        """A writer that publishes this blob version when committed; None if not cacheable.
+
+        ``properties`` (content_type, last_modified) are recorded with the entry for ``latest``.
+        """
+        if not etag or self.max_bytes <= 0:
+            return None
+        if expected_size is not None and expected_size > min(self.max_entry_bytes, self.max_bytes):
+            return None
+        path = self._path(blob_name, etag)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        except OSError as e:
+            logger.warning(f"Blob disk cache unavailable: {e}")
+            return None
+        last_modified = (properties or {}).get('last_modified')
+        latest = {
+            'etag': etag,
+            'size': expected_size,
+            'content_type': (properties or {}).get('content_type'),
+            'last_modified': last_modified.timestamp() if hasattr(last_modified, 'timestamp') else last_modified,
+        }
+        return BlobCacheWriter(self, fd, tmp_path, path, expected_size, on_publish=lambda: self._record_latest(blob_name, latest))
+
+    def _published(self, size: int) -> None:
+        with self._evict_lock:
+            self._written_since_evict += size
+            due = self._written_since_evict >= max(1, self.max_bytes // 10)
+            if due:
+                self._written_since_evict = 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache is under 90% of its cap."""
+        lock_file = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            lock_file = open(os.path.join(self.directory, '.lock'), 'a')
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0  # another worker is evicting
+            with self._evict_lock:
+                return self._evict_locked()
+        except OSError as e:
+            logger.warning(f"Blob disk cache eviction failed: {e}")
+            return 0
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    def _evict_locked(self) -> int:
+        entries = []
+        total = 0
+        stale_tmp_before = time.time() - 3600
+        stale_latest_before = time.time() - 30 * 86400
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+                elif entry.name.endswith('.tmp') and stat.st_mtime < stale_tmp_before:
+                    # Left behind by a worker that died mid-write.
+                    _unlink_quietly(entry.path)
+                elif entry.name.endswith(_LATEST_SUFFIX) and stat.st_mtime < stale_latest_before:
+                    # Not read for a month; its entry has most likely been evicted already.
+                    _unlink_quietly(entry.path)
+
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        if total <= self.max_bytes:
+            return 0
+        for _mtime, size, path in sorted(entries):
+            if total <= target:
+                break
+            _unlink_quietly(path)
+            total -= size
+            removed += 1
+        logger.info(f"Blob disk cache evicted {removed} entries")
+        return removed
+
+
+class BlobCacheWriter:
+    """Receives a blob's bytes as they are streamed and publishes them on commit."""
+
+    def __init__(self, cache: BlobDiskCache, fd: int, tmp_path: str, path: str, expected_size: Optional[int], on_publish=None):
+        self._cache = cache
+        self._on_publish = on_publish
+        self._file = os.fdopen(fd, 'wb')
+        self._tmp_path = tmp_path
+        self._path = path
+        self._expected_size = expected_size
+        self._size = 0
+        self._done = False
+
+    def write(self, data: bytes) -> None:
+        if self._done:
+            return
+        self._size += len(data)
+        if self._size > self._cache.max_entry_bytes:
+            self.discard()
+            return
+        self._file.write(data)
+
+    def commit(self) -> bool:
+        """Publish the entry if every expected byte arrived."""
+        if self._done:
+            return False
+        if self._expected_size is not None and self._size != self._expected_size:
+            self.discard()
+            return False
+        try:
+            self._file.close()
+            os.replace(self._tmp_path, self._path)
+        except OSError as e:
+            logger.warning(f"Could not publish blob cache entry: {e}")
+            self.discard()
+            return False
+        self._done = True
+        if self._on_publish is not None:
+            self._on_publish()
+        self._cache._published(self._size)
+        return True
+
+    def discard(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        _unlink_quietly(self._tmp_path)
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_caches: dict[str, BlobDiskCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_blob_disk_cache() -> Optional[BlobDiskCache]:
+    """The app's blob disk cache, or None when BLOB_DISK_CACHE_MAX_BYTES is 0."""
+    try:
+        max_bytes = int(current_app.config.get('BLOB_DISK_CACHE_MAX_BYTES') or 0)
+        max_entry_bytes = int(current_app.config.get('BLOB_DISK_CACHE_MAX_ENTRY_BYTES') or max_bytes)
+    except (TypeError, ValueError):
+        return None
+    if max_bytes <= 0:
+        return None
+
+    directory = current_app.config.get('BLOB_DISK_CACHE_DIR') or os.path.join(
+        current_app.instance_path, 'cache', 'blobs'
+    )
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None or cache.max_bytes != max_bytes or cache.max_entry_bytes != max_entry_bytes:
+            cache = BlobDiskCache(directory, max_bytes, max_entry_bytes)
+            _caches[directory] = cache
+        return cache
@@ -0,0 +1,586 @@
+"""
+Shared cache service.
+
+Backs the hot-path caches (org switcher context, RBAC permission sets, ADLS
+dashboard summaries/listings and org logo bytes) with a pluggable backend so
+that gunicorn workers can share entries and invalidations.
+
+Backends (selected by ``CACHE_BACKEND``):
+- ``memory``: per-process, one bounded LRU per namespace (see ``DEFAULT_NAMESPACE_LIMITS``).
+- ``file``:   pickled entries under ``CACHE_DIR``, shared by every worker on the host;
+  expired entries are swept periodically, each namespace is held to its budget and
+  the directory as a whole is capped by ``CACHE_FILE_MAX_ENTRIES`` / ``CACHE_FILE_MAX_BYTES``.
+- ``redis``:  any Redis-compatible server at ``CACHE_REDIS_URL`` (needs the optional
+  ``redis`` package), shared across hosts. Bounded by entry TTLs and the server's
+  ``maxmemory`` policy (configure an LRU policy such as ``volatile-lru``).
+
+A cache must never break a request: backend errors are logged and treated as misses.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: sweeps are only serialised within a process.
+    fcntl = None
+
+try:
+    import redis  # type: ignore
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Minimal key/value interface implemented by every backend.
+
+    ``get`` returns ``None`` on a miss, so ``None`` itself is not cacheable.
+    """
+
+    name = 'base'
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the memory footprint of a cached value in bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8', errors='ignore'))
+    if isinstance(value, tuple) and any(isinstance(v, (bytes, bytearray)) for v in value):
+        # (data, content_type)-style entries: count the payload exactly.
+        return sum(_estimate_size(v) for v in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe TTL + LRU cache bounded by entry count and approximate bytes.
+
+    A budget of 0 disables that bound. Values larger than ``max_bytes`` are not
+    stored at all (they would immediately evict everything else).
+    """
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0):
+        self.max_entries = max(0, int(max_entries or 0))
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self._data: 'OrderedDict[str, tuple[float, Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _pop(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, _size = entry
+            if now >= expires_at:
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        size = _estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            with self._lock:
+                self._pop(key)
+            return
+        expires_at = time.monotonic() + max(1, int(ttl_seconds))
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (expires_at, value, size)
+            self.current_bytes += size
+            while self._data and (
+                (self.max_entries and len(self._data) > self.max_entries)
+                or (self.max_bytes and self.current_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._data))
+                self._pop(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process cache (not shared between gunicorn workers).
+
+    Each namespace (the key prefix before the first ':') gets its own bounded
+    LRU so a burst of large entries in one cache cannot evict another cache.
+    """
+
+    name = 'memory'
+
+    def __init__(self, default_max_entries: int = 1024, default_max_bytes: int = 64 * 1024 * 1024,
+                 limits: Optional[dict] = None):
+        self.default_max_entries = default_max_entries
+        self.default_max_bytes = default_max_bytes
+        self.limits: dict[str, tuple[int, int]] = dict(limits or {})
+        self._caches: dict[str, LRUCache] = {}
+        self._lock = threading.Lock()
+
+    def _cache_for(self, key: str) -> LRUCache:
+        namespace = key.split(':', 1)[0]
+        cache = self._caches.get(namespace)
+        if cache is not None:
+            return cache
+        with self._lock:
+            cache = self._caches.get(namespace)
+            if cache is None:
+                max_entries, max_bytes = self.limits.get(namespace, (self.default_max_entries, self.default_max_bytes))
+                cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+                self._caches[namespace] = cache
+            return cache
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache_for(key).get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        self._cache_for(key).set(key, value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._cache_for(key).delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            caches = dict(self._caches)
+        return {namespace: cache.stats() for namespace, cache in caches.items()}
+
+
+class FileCacheBackend(CacheBackend):
+    """Host-local cache shared by all workers via one pickle file per key.
+
+    Writes go to a per-writer temp file followed by ``os.replace`` so readers in
+    other processes never observe a partially written entry. Entries live in one
+    subdirectory per namespace and each file's mtime is set to its expiry time, so
+    a sweep (at most every ``sweep_interval`` seconds per process, serialised
+    across workers with an advisory ``flock``) can drop expired entries and then,
+    without unpickling anything, the entries closest to expiry in any namespace
+    over its ``limits`` budget and in the directory as a whole past
+    ``max_entries``/``max_bytes``.
+    """
+
+    name = 'file'
+
+    def __init__(self, directory: str, max_entries: int = 0, max_bytes: int = 0, sweep_interval: int = 300,
+                 limits: Optional[dict] = None):
+        self.directory = directory
+        self.max_entries = max(0, int(max_entries or 0))
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self.limits: dict[str, tuple[int, int]] = dict(limits or {})
+        self.sweep_interval = max(1, int(sweep_interval or 1))
+        self._sweep_lock = threading.Lock()
+        # Starts due so each process sweeps on its first write.
+        self._last_sweep = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        namespace = _safe_dir_name(key.split(':', 1)[0])
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, namespace, f'{digest}.pkl')
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        if time.time() >= float(expires_at):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        expires_at = time.time() + max(1, int(ttl_seconds))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.utime(tmp_path, (expires_at, expires_at))
+        os.replace(tmp_path, path)
+        self._maybe_sweep()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for namespace_dir in os.scandir(self.directory):
+            if not namespace_dir.is_dir():
+                continue
+            for entry in os.scandir(namespace_dir.path):
+                if entry.name.endswith('.pkl') or entry.name.endswith('.tmp'):
+                    _unlink_quietly(entry.path)
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        with self._sweep_lock:
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+        self.sweep()
+
+    def sweep(self) -> int:
+        """Remove expired entries, then the soonest-expiring ones over the caps; returns the count."""
+        lock_file = None
+        try:
+            lock_file = open(os.path.join(self.directory, '.lock'), 'a')
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0  # another worker is sweeping
+            return self._sweep_locked()
+        except OSError as e:
+            logger.warning(f"File cache sweep failed: {e}")
+            return 0
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    def _sweep_locked(self) -> int:
+        now = time.time()
+        stale_tmp_before = now - 3600
+        kept = []
+        removed = 0
+        for namespace_dir in os.scandir(self.directory):
+            if not namespace_dir.is_dir():
+                continue
+            entries = []
+            for entry in os.scandir(namespace_dir.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith('.pkl'):
+                    if stat.st_mtime <= now:
+                        removed += _unlink_quietly(entry.path)
+                    else:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                elif entry.name.endswith('.tmp') and stat.st_mtime < stale_tmp_before:
+                    # Left behind by a worker that died mid-write.
+                    _unlink_quietly(entry.path)
+            max_entries, max_bytes = self.limits.get(namespace_dir.name, (0, 0))
+            evicted, entries = _evict_over_budget(entries, max_entries, max_bytes)
+            removed += evicted
+            kept.extend(entries)
+
+        evicted, _entries = _evict_over_budget(kept, self.max_entries, self.max_bytes)
+        removed += evicted
+        if removed:
+            logger.info(f"File cache sweep removed {removed} entries")
+        return removed
+
+
+def _evict_over_budget(entries: list, max_entries: int, max_bytes: int) -> tuple[int, list]:
+    """Delete the soonest-expiring ``(expires_at, size, path)`` entries until within budget."""
+    entries = sorted(entries)
+    count = len(entries)
+    total = sum(size for _expires_at, size, _path in entries)
+    removed = 0
+    while entries and ((max_entries and count > max_entries) or (max_bytes and total > max_bytes)):
+        _expires_at, size, path = entries.pop(0)
+        removed += _unlink_quietly(path)
+        count -= 1
+        total -= size
+    return removed, entries
+
+
+def _safe_dir_name(namespace: str) -> str:
+    cleaned = ''.join(c if c.isalnum() or c in '-_' else '_' for c in namespace)
+    return cleaned or '_'
+
+
+def _unlink_quietly(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache stored in a Redis-compatible server (Redis, Valkey, Azure Cache for Redis)."""
+
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'cenaris:cache:'):
+        if redis is None:
+            raise RuntimeError('The redis package is not installed')
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: int) -> None:
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self.prefix + key, raw, ex=max(1, int(ttl_seconds)))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for k in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(k)
+
+
+# Per-namespace (max_entries, max_bytes) budgets, enforced by the memory backend on every
+# write and by the file backend's periodic sweep. Redis entries are bounded by their TTLs
+# and the server's maxmemory policy, not by these budgets.
+# Logos and dashboard summaries are the large ones; permission sets are tiny.
+DEFAULT_NAMESPACE_LIMITS: dict[str, tuple[int, int]] = {
+    'org_switcher': (5000, 16 * 1024 * 1024),
+    'org_switcher_gen': (20000, 2 * 1024 * 1024),
+    'rbac_effective_perms': (5000, 4 * 1024 * 1024),
+    'adls_dashboard_summary': (500, 64 * 1024 * 1024),
+    'adls_compliance_files': (1000, 16 * 1024 * 1024),
+    'adls_compliance_files_failure': (1000, 1 * 1024 * 1024),
+    'adls_parsed_file': (2000, 64 * 1024 * 1024),
+    'adls_org_listing_index': (1000, 32 * 1024 * 1024),
+    'org_logo': (500, 32 * 1024 * 1024),
+}
+
+
+def _make_key(namespace: str, key: Any) -> str:
+    if isinstance(key, tuple):
+        parts = [str(p) for p in key]
+    else:
+        parts = [str(key)]
+    return ':'.join([namespace] + parts)
+
+
+class CacheService:
+    """Namespaced facade over the configured cache backend."""
+
+    def __init__(self):
+        # Usable before init_app (e.g. module-level services created at import time).
+        self.backend: CacheBackend = MemoryCacheBackend(limits=DEFAULT_NAMESPACE_LIMITS)
+        self._counters: dict[str, dict[str, int]] = {}
+        self._counters_lock = threading.Lock()
+
+    @staticmethod
+    def _namespace_limits(app) -> dict:
+        limits = dict(DEFAULT_NAMESPACE_LIMITS)
+        limits.update(app.config.get('CACHE_NAMESPACE_LIMITS') or {})
+        return limits
+
+    @classmethod
+    def _memory_backend_from_config(cls, app) -> MemoryCacheBackend:
+        return MemoryCacheBackend(
+            default_max_entries=int(app.config.get('CACHE_DEFAULT_MAX_ENTRIES') or 1024),
+            default_max_bytes=int(app.config.get('CACHE_DEFAULT_MAX_BYTES') or 64 * 1024 * 1024),
+            limits=cls._namespace_limits(app),
+        )
+
+    def _count(self, namespace: str, field: str) -> None:
+        with self._counters_lock:
+            counters = self._counters.setdefault(namespace, {'hits': 0, 'misses': 0, 'sets': 0})
+            counters[field] += 1
+
+    def init_app(self, app) -> None:
+        backend_name = (app.config.get('CACHE_BACKEND') or 'memory').strip().lower()
+        with self._counters_lock:
+            self._counters = {}
+        try:
+            if backend_name == 'file':
+                directory = app.config.get('CACHE_DIR') or os.path.join(app.instance_path, 'cache', 'shared')
+                self.backend = FileCacheBackend(
+                    directory,
+                    max_entries=int(app.config.get('CACHE_FILE_MAX_ENTRIES') or 0),
+                    max_bytes=int(app.config.get('CACHE_FILE_MAX_BYTES') or 0),
+                    sweep_interval=int(app.config.get('CACHE_FILE_SWEEP_SECONDS') or 300),
+                    limits=self._namespace_limits(app),
+                )
+            elif backend_name == 'redis':
+                url = app.config.get('CACHE_REDIS_URL')
+                if not url:
+                    raise RuntimeError('CACHE_REDIS_URL is not set')
+                self.backend = RedisCacheBackend(url)
+            else:
+                self.backend = self._memory_backend_from_config(app)
+        except Exception as e:
+            logger.warning(f"Cache backend '{backend_name}' unavailable, falling back to memory: {e}")
+            self.backend = self._memory_backend_from_config(app)
+
+        app.extensions['cache_service'] = self
+        logger.info(f'Cache backend: {self.backend.name}')
+
+    def get(self, namespace: str, key: Any) -> Optional[Any]:
+        try:
+            value = self.backend.get(_make_key(namespace, key))
+        except Exception as e:
+            logger.debug(f'Cache get failed ({namespace}): {e}')
+            value = None
+        self._count(namespace, 'misses' if value is None else 'hits')
+        return value
+
+    def set(self, namespace: str, key: Any, value: Any, ttl_seconds: int) -> None:
+        if ttl_seconds <= 0 or value is None:
+            return
+        try:
+            self.backend.set(_make_key(namespace, key), value, ttl_seconds)
+            self._count(namespace, 'sets')
+        except Exception as e:
+            logger.debug(f'Cache set failed ({namespace}): {e}')
+
+    def delete(self, namespace: str, key: Any) -> None:
+        try:
+            self.backend.delete(_make_key(namespace, key))
+        except Exception as e:
+            logger.debug(f'Cache delete failed ({namespace}): {e}')
+
+    def clear(self) -> None:
+        try:
+            self.backend.clear()
+        except Exception as e:
+            logger.debug(f'Cache clear failed: {e}')
+
+    def stats(self) -> dict:
+        """This process's per-namespace hit/miss/set counters, plus size/eviction data for the memory backend."""
+        with self._counters_lock:
+            result = {namespace: dict(counters) for namespace, counters in self._counters.items()}
+        backend_stats = self.backend.stats() if isinstance(self.backend, MemoryCacheBackend) else {}
+        for namespace, lru_stats in backend_stats.items():
+            entry = result.setdefault(namespace, {'hits': 0, 'misses': 0, 'sets': 0})
+            entry.update({k: v for k, v in lru_stats.items() if k not in {'hits', 'misses'}})
+        return result
+
+
+class _InFlightCall:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in flight
+    wait and receive the same result (or exception). Scope is per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Any, _InFlightCall] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Any, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+# Global cache instance
+cache_service = CacheService()
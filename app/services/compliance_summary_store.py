@@ -0,0 +1,211 @@
+"""
+Precomputed compliance summaries stored in the database.
+
+An ingestion job (``flask ingest-compliance-results``) reads new or changed ADLS result
+files and writes one ``ComplianceResultFile`` row per file plus its per-framework
+``ComplianceFrameworkScore`` rows. Pages then build the dashboard summary from those
+indexed rows instead of listing and downloading blobs on every cache miss.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app import db
+from app.models import ComplianceFrameworkScore, ComplianceResultFile, OrganizationMembership
+from app.services.azure_data_service import (
+    azure_data_service,
+    file_version,
+    merge_dashboard_summaries,
+    select_dashboard_files,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_naive(value) -> Optional[datetime]:
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _utc_aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def ingest_compliance_results(user_id: int, organization_id: int) -> Dict:
+    """Ingest the ADLS result files visible to one (user, organization) pair.
+
+    Files whose etag/last_modified matches the stored row are skipped without being
+    downloaded. Rows for files that disappeared from the listing are removed, unless the
+    listing came back empty (which is indistinguishable from an ADLS outage).
+    """
+    user_id = int(user_id)
+    organization_id = int(organization_id)
+    result = {'success': True, 'ingested': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+
+    try:
+        files = azure_data_service.get_compliance_files(user_id, organization_id)
+        existing = {
+            row.file_path: row
+            for row in ComplianceResultFile.query.filter_by(organization_id=organization_id, user_id=user_id).all()
+        }
+
+        for file_info in files:
+            path = file_info['file_path']
+            version = file_version(file_info)
+            row = existing.get(path)
+            if row is not None and version and row.source_version == version:
+                result['unchanged'] += 1
+                continue
+
+            summary = azure_data_service.get_file_analysis_summary(path, version=version)
+            if summary.get('overall_status') == 'Error' or summary.get('read_error'):
+                # Keep whatever was stored before; the file is fetched again on the next run.
+                result['failed'] += 1
+                continue
+
+            if row is None:
+                row = ComplianceResultFile(organization_id=organization_id, user_id=user_id, file_path=path)
+                db.session.add(row)
+            row.file_name = summary.get('file_name') or os.path.basename(path)
+            row.framework = file_info.get('framework')
+            row.source_version = version
+            row.last_modified = _utc_naive(file_info.get('last_modified'))
+            row.compliancy_rate = float(summary.get('compliancy_rate') or 0)
+            row.overall_status = summary.get('overall_status')
+            row.total_requirements = int(summary.get('total_requirements') or 0)
+            row.complete_count = int(summary.get('complete_count') or 0)
+            row.needs_review_count = int(summary.get('needs_review_count') or 0)
+            row.missing_count = int(summary.get('missing_count') or 0)
+            row.ingested_at = datetime.now(timezone.utc)
+            db.session.flush()
+
+            ComplianceFrameworkScore.query.filter_by(result_file_id=row.id).delete(synchronize_session=False)
+            db.session.bulk_insert_mappings(
+                ComplianceFrameworkScore,
+                [
+                    {
+                        'result_file_id': row.id,
+                        'organization_id': organization_id,
+                        'position': position,
+                        'framework_name': str(framework.get('name') or 'Unknown')[:255],
+                        'score': float(framework.get('score') or 0),
+                        'status': str(framework.get('status') or '')[:40],
+                    }
+                    for position, framework in enumerate(summary.get('frameworks') or [])
+                ],
+            )
+            result['ingested'] += 1
+
+        if files:
+            listed = {f['file_path'] for f in files}
+            for path, row in existing.items():
+                if path not in listed:
+                    db.session.delete(row)
+                    result['removed'] += 1
+
+        db.session.commit()
+        return result
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Compliance result ingestion failed for org {organization_id} user {user_id}: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+def ingest_all_compliance_results(organization_id: int | None = None) -> List[Dict]:
+    """Run ``ingest_compliance_results`` for every active membership (optionally one org)."""
+    query = db.session.query(OrganizationMembership.user_id, OrganizationMembership.organization_id).filter(
+        OrganizationMembership.is_active.is_(True)
+    )
+    if organization_id is not None:
+        query = query.filter(OrganizationMembership.organization_id == int(organization_id))
+
+    results = []
+    for user_id, org_id in query.distinct().all():
+        outcome = ingest_compliance_results(user_id, org_id)
+        outcome.update({'user_id': int(user_id), 'organization_id': int(org_id)})
+        results.append(outcome)
+    return results
+
+
+def get_stored_dashboard_summary(user_id: int, organization_id: int) -> Optional[Dict]:
+    """Build the dashboard summary from ingested rows; None when nothing was ingested yet."""
+    rows = (
+        ComplianceResultFile.query
+        .filter_by(organization_id=int(organization_id), user_id=int(user_id))
+        .all()
+    )
+    if not rows:
+        return None
+
+    rows_by_id = {row.id: row for row in rows}
+    files = [
+        {
+            'id': row.id,
+            'file_name': row.file_name,
+            'file_path': row.file_path,
+            'framework': row.framework,
+            'last_modified': _utc_aware(row.last_modified),
+        }
+        for row in rows
+    ]
+    try:
+        max_files = int(os.getenv('AZURE_DASHBOARD_MAX_FILES', '4') or 4)
+    except Exception:
+        max_files = 4
+    selected = select_dashboard_files(files, max_files)
+
+    frameworks_by_file: dict[int, list[Dict]] = {f['id']: [] for f in selected}
+    scores = (
+        ComplianceFrameworkScore.query
+        .filter(ComplianceFrameworkScore.result_file_id.in_(list(frameworks_by_file)))
+        .order_by(ComplianceFrameworkScore.result_file_id, ComplianceFrameworkScore.position)
+        .all()
+    )
+    for score in scores:
+        frameworks_by_file[score.result_file_id].append(
+            {'name': score.framework_name, 'score': score.score, 'status': score.status}
+        )
+
+    summaries = []
+    for file_info in selected:
+        row = rows_by_id[file_info['id']]
+        summaries.append({
+            'file_name': row.file_name,
+            'compliancy_rate': row.compliancy_rate,
+            'overall_status': row.overall_status,
+            'total_requirements': row.total_requirements,
+            'complete_count': row.complete_count,
+            'needs_review_count': row.needs_review_count,
+            'missing_count': row.missing_count,
+            'frameworks': frameworks_by_file[row.id],
+        })
+
+    result = merge_dashboard_summaries(selected, summaries, len(files))
+    result['connection_status'] = 'Connected - Files Found'
+    result['adls_path'] = azure_data_service.adls_path()
+    result['source'] = 'database'
+    return result
+
+
+def get_compliance_summary(user_id: int, organization_id: int | None) -> Dict:
+    """Dashboard summary for pages: stored rows when ingested, otherwise live from ADLS."""
+    if organization_id is not None:
+        try:
+            stored = get_stored_dashboard_summary(user_id, organization_id)
+        except Exception as e:
+            logger.error(f"Reading stored compliance summary failed: {e}")
+            db.session.rollback()
+            stored = None
+        if stored is not None:
+            return stored
+    return azure_data_service.get_dashboard_summary(user_id=user_id, organization_id=organization_id)
@@ -0,0 +1,96 @@
+"""
+Content-addressed blob sharing for uploaded documents.
+
+Byte-identical files uploaded to the same organization reuse one blob. Each
+``DocumentBlob`` row counts the active documents that point at it; the blob is only
+deleted from storage when the last of them is deleted.
+
+None of these helpers commit: they run inside the caller's transaction so the
+reference count changes together with the Document row.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import DocumentBlob
+
+logger = logging.getLogger(__name__)
+
+
+def acquire_existing_blob(organization_id: int, content_hash: str | None) -> DocumentBlob | None:
+    """Take a reference on the org's blob with this content hash, if there is one."""
+    if not content_hash:
+        return None
+
+    blob = DocumentBlob.query.filter_by(organization_id=int(organization_id), content_hash=content_hash).first()
+    if blob is None:
+        return None
+
+    # Conditional increment: a concurrent release may have just removed the row.
+    updated = (
+        DocumentBlob.query
+        .filter(DocumentBlob.id == blob.id, DocumentBlob.ref_count > 0)
+        .update({DocumentBlob.ref_count: DocumentBlob.ref_count + 1}, synchronize_session=False)
+    )
+    if not updated:
+        return None
+    db.session.refresh(blob)
+    return blob
+
+
+def register_blob(
+    organization_id: int,
+    content_hash: str | None,
+    blob_name: str,
+    file_size: int | None = None,
+    content_type: str | None = None,
+) -> DocumentBlob | None:
+    """Record a freshly uploaded blob with one reference.
+
+    If another request registered the same content first, a reference on that blob is
+    taken instead and returned; the caller should then delete its own upload.
+    """
+    if not content_hash:
+        return None
+
+    try:
+        with db.session.begin_nested():
+            blob = DocumentBlob(
+                organization_id=int(organization_id),
+                content_hash=content_hash,
+                blob_name=blob_name,
+                file_size=file_size,
+                content_type=(content_type or None) and content_type[:120],
+                ref_count=1,
+            )
+            db.session.add(blob)
+        return blob
+    except IntegrityError:
+        logger.info(f"Content {content_hash[:12]} registered concurrently; reusing existing blob")
+        return acquire_existing_blob(organization_id, content_hash)
+
+
+def release_blob(organization_id: int, blob_name: str) -> bool:
+    """Drop one reference on ``blob_name``.
+
+    Returns True when the caller should delete the blob from storage: either the last
+    reference was released, or the blob predates deduplication (no DocumentBlob row).
+    """
+    blob = DocumentBlob.query.filter_by(organization_id=int(organization_id), blob_name=blob_name).first()
+    if blob is None:
+        return True
+
+    DocumentBlob.query.filter(DocumentBlob.id == blob.id).update(
+        {DocumentBlob.ref_count: DocumentBlob.ref_count - 1}, synchronize_session=False
+    )
+    deleted = (
+        DocumentBlob.query
+        .filter(DocumentBlob.id == blob.id, DocumentBlob.ref_count <= 0)
+        .delete(synchronize_session=False)
+    )
+    db.session.expire(blob)
+    return bool(deleted)
@@ -0,0 +1,78 @@
+"""
+Version-numbered document filenames within an organization.
+
+Uploading ``policy.pdf`` twice yields ``policy.pdf`` then ``policy (1).pdf``,
+``policy (2).pdf``, ... The next number comes from a per-(org, filename) counter row
+(``DocumentFilenameVersion``) incremented with a single UPDATE, so allocation no longer
+loads every document in the org, and concurrent uploads of the same name cannot be
+handed the same number: the UPDATE row lock serialises them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Document, DocumentFilenameVersion
+
+logger = logging.getLogger(__name__)
+
+# Candidates skipped because a document already has that exact name (e.g. a user uploaded
+# "policy (1).pdf" themselves) before giving up and using the last candidate anyway.
+_MAX_PROBES = 50
+
+
+def _claim_next_version(organization_id: int, filename: str) -> int:
+    """Atomically take the next version number for ``filename`` (0 = the plain name)."""
+    counter = DocumentFilenameVersion.query.filter_by(organization_id=organization_id, filename=filename)
+    while True:
+        updated = counter.update(
+            {DocumentFilenameVersion.last_version: DocumentFilenameVersion.last_version + 1},
+            synchronize_session=False,
+        )
+        if updated:
+            return int(counter.with_entities(DocumentFilenameVersion.last_version).scalar())
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(DocumentFilenameVersion(
+                    organization_id=organization_id, filename=filename, last_version=0
+                ))
+            return 0
+        except IntegrityError:
+            # A concurrent upload created the counter first; increment it instead.
+            continue
+
+
+def _name_in_use(organization_id: int, filename: str) -> bool:
+    return db.session.query(
+        Document.query.filter_by(organization_id=organization_id, filename=filename).exists()
+    ).scalar()
+
+
+def allocate_document_filename(original_filename: str, organization_id: int) -> str:
+    """Reserve and return the name to store an upload of ``original_filename`` under.
+
+    Commits the counter update straight away so its row lock is not held for the
+    duration of the upload. A failed upload leaves a gap in the numbering, which is
+    harmless.
+    """
+    organization_id = int(organization_id)
+    name, ext = os.path.splitext(original_filename)
+
+    candidate = original_filename
+    try:
+        for _ in range(_MAX_PROBES):
+            version = _claim_next_version(organization_id, original_filename)
+            candidate = original_filename if version == 0 else f"{name} ({version}){ext}"
+            if not _name_in_use(organization_id, candidate):
+                break
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Filename version allocation failed for org {organization_id}: {e}")
+        raise
+    return candidate
@@ -1,3 +1,4 @@
+import hashlib
 import os
 import mimetypes
 from werkzeug.utils import secure_filename
@@ -21,6 +22,12 @@ class FileValidationService:
     
     # Maximum file size (16MB)
     MAX_FILE_SIZE = 16 * 1024 * 1024
+
+    # Read size used when hashing streams
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    # Leading bytes needed to check every supported file signature
+    SIGNATURE_LENGTH = 8
     
     @classmethod
     def is_allowed_file(cls, filename):
@@ -101,6 +108,88 @@ class FileValidationService:
                 'error_code': 'SIZE_CHECK_ERROR'
             }
     
+    @classmethod
+    def empty_file_error(cls):
+        return {
+            'success': False,
+            'error': 'File is empty',
+            'error_code': 'EMPTY_FILE'
+        }
+    
+    @classmethod
+    def check_file_signature(cls, header, filename):
+        """
+        Check a file's leading bytes (magic numbers) against its extension.
+        
+        Args:
+            header: First bytes of the file (at least 8 unless the file is shorter)
+            filename: Original filename
+        
+        Returns:
+            dict: Validation result with success status
+        """
+        # Get expected content type based on filename
+        expected_content_type = cls.get_content_type(filename)
+        
+        if not expected_content_type:
+            return {
+                'success': False,
+                'error': 'Unsupported file type',
+                'error_code': 'UNSUPPORTED_TYPE'
+            }
+        
+        # Check file signatures
+        if expected_content_type == 'application/pdf':
+            # PDF files start with %PDF
+            if not header.startswith(b'%PDF'):
+                return {
+                    'success': False,
+                    'error': 'File does not appear to be a valid PDF',
+                    'error_code': 'INVALID_PDF'
+                }
+        
+        elif expected_content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
+            # DOCX files are ZIP archives, check for ZIP signature
+            if not header.startswith(b'PK'):
+                return {
+                    'success': False,
+                    'error': 'File does not appear to be a valid DOCX document',
+                    'error_code': 'INVALID_DOCX'
+                }
+
+        elif expected_content_type == 'application/msword':
+            # Legacy .doc files are typically OLE Compound File Binary Format.
+            # Check for OLE signature: D0 CF 11 E0 A1 B1 1A E1
+            if not header.startswith(b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'):
+                return {
+                    'success': False,
+                    'error': 'File does not appear to be a valid DOC document',
+                    'error_code': 'INVALID_DOC'
+                }
+
+        elif expected_content_type == 'image/png':
+            # PNG signature: 89 50 4E 47 0D 0A 1A 0A
+            if header[:8] != b'\x89PNG\r\n\x1a\n':
+                return {
+                    'success': False,
+                    'error': 'File does not appear to be a valid PNG image',
+                    'error_code': 'INVALID_PNG'
+                }
+
+        elif expected_content_type == 'image/jpeg':
+            # JPEG files start with FF D8 FF
+            if header[:3] != b'\xFF\xD8\xFF':
+                return {
+                    'success': False,
+                    'error': 'File does not appear to be a valid JPEG image',
+                    'error_code': 'INVALID_JPEG'
+                }
+        
+        return {
+            'success': True,
+            'content_type': expected_content_type
+        }
+    
     @classmethod
     def validate_file_content(cls, file_stream, filename):
         """
@@ -119,80 +208,129 @@ class FileValidationService:
             
             # Read first few bytes to check file signature
             file_stream.seek(0)
-            header = file_stream.read(8)
+            header = file_stream.read(cls.SIGNATURE_LENGTH)
             
             # Reset to original position
             file_stream.seek(current_pos)
             
-            # Get expected content type based on filename
-            expected_content_type = cls.get_content_type(filename)
+            return cls.check_file_signature(header, filename)
             
-            if not expected_content_type:
-                return {
-                    'success': False,
-                    'error': 'Unsupported file type',
-                    'error_code': 'UNSUPPORTED_TYPE'
-                }
-            
-            # Check file signatures
-            if expected_content_type == 'application/pdf':
-                # PDF files start with %PDF
-                if not header.startswith(b'%PDF'):
-                    return {
-                        'success': False,
-                        'error': 'File does not appear to be a valid PDF',
-                        'error_code': 'INVALID_PDF'
-                    }
-            
-            elif expected_content_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document':
-                # DOCX files are ZIP archives, check for ZIP signature
-                if not header.startswith(b'PK'):
-                    return {
-                        'success': False,
-                        'error': 'File does not appear to be a valid DOCX document',
-                        'error_code': 'INVALID_DOCX'
-                    }
+        except Exception as e:
+            logger.error(f"Error validating file content: {e}")
+            return {
+                'success': False,
+                'error': 'Unable to validate file content',
+                'error_code': 'CONTENT_CHECK_ERROR'
+            }
+    
+    @classmethod
+    def compute_content_hash(cls, file_stream):
+        """
+        Compute the SHA-256 of a file stream in fixed-size chunks.
+        
+        Args:
+            file_stream: File stream to hash (position is restored afterwards)
+        
+        Returns:
+            dict: Result with success status and hex digest
+        """
+        try:
+            current_pos = file_stream.tell()
+            file_stream.seek(0)
 
-            elif expected_content_type == 'application/msword':
-                # Legacy .doc files are typically OLE Compound File Binary Format.
-                # Check for OLE signature: D0 CF 11 E0 A1 B1 1A E1
-                if not header.startswith(b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'):
-                    return {
-                        'success': False,
-                        'error': 'File does not appear to be a valid DOC document',
-                        'error_code': 'INVALID_DOC'
-                    }
+            digest = hashlib.sha256()
+            while True:
+                chunk = file_stream.read(cls.HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
 
-            elif expected_content_type == 'image/png':
-                # PNG signature: 89 50 4E 47 0D 0A 1A 0A
-                if header[:8] != b'\x89PNG\r\n\x1a\n':
-                    return {
-                        'success': False,
-                        'error': 'File does not appear to be a valid PNG image',
-                        'error_code': 'INVALID_PNG'
-                    }
+            file_stream.seek(current_pos)
 
-            elif expected_content_type == 'image/jpeg':
-                # JPEG files start with FF D8 FF
-                if header[:3] != b'\xFF\xD8\xFF':
-                    return {
-                        'success': False,
-                        'error': 'File does not appear to be a valid JPEG image',
-                        'error_code': 'INVALID_JPEG'
-                    }
-            
             return {
                 'success': True,
-                'content_type': expected_content_type
+                'content_hash': digest.hexdigest()
             }
-            
+
         except Exception as e:
-            logger.error(f"Error validating file content: {e}")
+            logger.error(f"Error hashing file content: {e}")
             return {
                 'success': False,
-                'error': 'Unable to validate file content',
-                'error_code': 'CONTENT_CHECK_ERROR'
+                'error': 'Unable to read file content',
+                'error_code': 'HASH_ERROR'
+            }
+    
+    @classmethod
+    def validate_and_upload(cls, file_stream, filename, upload):
+        """
+        Validate, hash and upload a file in a single streaming pass.
+        
+        ``upload`` is called with a ``ValidatingStream`` over ``file_stream`` and the
+        expected content type, and must read the file from that stream (for example
+        ``AzureBlobStorageService.upload_file``). The signature is checked on the first
+        bytes read and the size as bytes arrive; either failure makes the next read raise,
+        so the upload stops early. The source stream is never seeked, so non-seekable
+        request bodies (chunked transfer-encoding) work.
+        
+        Args:
+            file_stream: File stream to validate and upload
+            filename: Original filename
+            upload: Callable ``(stream, content_type) -> dict`` returning an upload result
+        
+        Returns:
+            dict: Same fields as ``validate_file`` plus 'upload' (the upload result).
+                  On failure 'stage' is 'validation' or 'upload'.
+        """
+        if not cls.is_allowed_file(filename):
+            return {
+                'success': False,
+                'error': f'File type not allowed. Supported formats: {", ".join(cls.ALLOWED_EXTENSIONS.keys())}',
+                'error_code': 'INVALID_EXTENSION',
+                'stage': 'validation'
+            }
+        
+        content_type = cls.get_content_type(filename)
+        stream = ValidatingStream(file_stream, filename)
+        upload_result = None
+        try:
+            upload_result = upload(stream, content_type)
+            if upload_result.get('success'):
+                # Finish the checks even if the uploader stopped reading early.
+                stream.drain()
+        except FileValidationError:
+            pass
+        except Exception as e:
+            if stream.error is None:
+                logger.error(f"Error streaming file upload: {e}")
+                return {
+                    'success': False,
+                    'error': 'Unable to read file content',
+                    'error_code': 'READ_ERROR',
+                    'stage': 'upload',
+                    'upload': upload_result
+                }
+        
+        if stream.error is not None:
+            return dict(stream.error, stage='validation', upload=upload_result)
+        
+        if not upload_result.get('success'):
+            return {
+                'success': False,
+                'error': upload_result.get('error') or 'Upload failed',
+                'error_code': upload_result.get('error_code') or 'UPLOAD_ERROR',
+                'stage': 'upload',
+                'upload': upload_result
             }
+        
+        return {
+            'success': True,
+            'file_size': stream.size,
+            'content_type': content_type,
+            'content_hash': stream.content_hash,
+            'safe_filename': cls.sanitize_filename(filename),
+            'original_filename': filename,
+            'upload': upload_result
+        }
     
     @classmethod
     def sanitize_filename(cls, filename):
@@ -248,12 +386,19 @@ class FileValidationService:
         size_result = cls.validate_file_size(file_stream)
         if not size_result['success']:
             return size_result
+        if size_result['file_size'] == 0:
+            return cls.empty_file_error()
         
         # Validate file content
         content_result = cls.validate_file_content(file_stream, filename)
         if not content_result['success']:
             return content_result
         
+        # Hash content (used to deduplicate identical uploads)
+        hash_result = cls.compute_content_hash(file_stream)
+        if not hash_result['success']:
+            return hash_result
+        
         # Sanitize filename
         safe_filename = cls.sanitize_filename(filename)
         
@@ -261,6 +406,7 @@ class FileValidationService:
             'success': True,
             'file_size': size_result['file_size'],
             'content_type': content_result['content_type'],
+            'content_hash': hash_result['content_hash'],
             'safe_filename': safe_filename,
             'original_filename': filename
         }
@@ -305,4 +451,83 @@ class FileValidationService:
         Returns:
             str: Formatted maximum file size
         """
-        return cls._format_file_size(cls.MAX_FILE_SIZE)
\ No newline at end of file
+        return cls._format_file_size(cls.MAX_FILE_SIZE)
+
+
+class FileValidationError(Exception):
+    """Raised by ``ValidatingStream`` reads once the file has failed validation."""
+
+    def __init__(self, result):
+        super().__init__(result.get('error'))
+        self.result = result
+
+
+class ValidatingStream:
+    """
+    Read-only file-like wrapper that validates a file as it is read.
+    
+    Every read counts bytes against ``FileValidationService.MAX_FILE_SIZE``, feeds a
+    SHA-256 digest and, once the first bytes are available, checks the file signature.
+    A failed check is recorded in ``error`` and raised as ``FileValidationError``.
+    """
+
+    def __init__(self, source, filename, max_size=None):
+        self._source = source
+        self._filename = filename
+        self._max_size = FileValidationService.MAX_FILE_SIZE if max_size is None else max_size
+        self._digest = hashlib.sha256()
+        self._header = b''
+        self._header_checked = False
+        self.size = 0
+        self.error = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def read(self, size=-1):
+        if self.error is not None:
+            raise FileValidationError(self.error)
+
+        data = self._source.read() if size is None or size < 0 else self._source.read(size)
+        data = data or b''
+
+        if not self._header_checked:
+            self._header += data[:FileValidationService.SIGNATURE_LENGTH - len(self._header)]
+            if len(self._header) >= FileValidationService.SIGNATURE_LENGTH or not data:
+                self._header_checked = True
+                if not self._header:
+                    # Reported before the signature check, which any empty file would fail.
+                    self._fail(FileValidationService.empty_file_error())
+                result = FileValidationService.check_file_signature(self._header, self._filename)
+                if not result['success']:
+                    self._fail(result)
+
+        if data:
+            self.size += len(data)
+            if self.size > self._max_size:
+                self._fail({
+                    'success': False,
+                    'error': f'File size exceeds maximum allowed size ({FileValidationService._format_file_size(self._max_size)})',
+                    'error_code': 'FILE_TOO_LARGE',
+                    'file_size': self.size,
+                    'max_size': self._max_size
+                })
+            self._digest.update(data)
+
+        return data
+
+    def drain(self):
+        """Read (and check) whatever the consumer left unread."""
+        while self.read(FileValidationService.HASH_CHUNK_SIZE):
+            pass
+
+    @property
+    def content_hash(self):
+        return self._digest.hexdigest()
+
+    def _fail(self, result):
+        self.error = result
+        raise FileValidationError(result)
@@ -0,0 +1,102 @@
+"""
+Keyset (seek) pagination for newest-first listings.
+
+Rows are ordered by ``(timestamp DESC, id DESC)`` and each page is fetched with a
+``WHERE (timestamp, id) < (last seen)`` predicate instead of ``OFFSET``, so page N costs
+the same as page 1 and no ``COUNT(*)`` is issued. Pages are addressed by opaque cursors
+(URL-safe base64 of the boundary row's key plus a direction); a missing or malformed
+cursor starts from the newest row.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+_AFTER = 'a'   # rows older than the key (next page)
+_BEFORE = 'b'  # rows newer than the key (previous page)
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any] = field(default_factory=list)
+    per_page: int = 50
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def encode_cursor(direction: str, timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([direction, timestamp.isoformat(), int(row_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, datetime, int]]:
+    """``(direction, timestamp, id)`` from a cursor, or None if it is missing or invalid."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, timestamp, row_id = json.loads(raw.decode('utf-8'))
+        if direction not in (_AFTER, _BEFORE):
+            return None
+        return direction, datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def paginate_newest_first(query, time_column, id_column, cursor: Optional[str] = None, per_page: int = 50) -> KeysetPage:
+    """Fetch one page of ``query`` ordered by ``(time_column, id_column)`` descending.
+
+    ``query`` is a legacy ``Query`` already carrying its filters and loader options; the
+    timestamp column must not be NULL for the rows being paged.
+    """
+    per_page = max(1, int(per_page))
+    key = decode_cursor(cursor)
+    time_attr = time_column.key
+    id_attr = id_column.key
+
+    if key is None:
+        rows = query.order_by(time_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        has_newer = False
+        has_older = has_more
+    else:
+        direction, timestamp, row_id = key
+        if direction == _AFTER:
+            seek = or_(time_column < timestamp, and_(time_column == timestamp, id_column < row_id))
+            ordered = query.filter(seek).order_by(time_column.desc(), id_column.desc())
+        else:
+            seek = or_(time_column > timestamp, and_(time_column == timestamp, id_column > row_id))
+            ordered = query.filter(seek).order_by(time_column.asc(), id_column.asc())
+        rows = ordered.limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if direction == _AFTER:
+            has_newer, has_older = True, has_more
+        else:
+            rows.reverse()
+            has_newer, has_older = has_more, True
+
+    page = KeysetPage(items=rows, per_page=per_page)
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_older:
+            page.next_cursor = encode_cursor(_AFTER, getattr(last, time_attr), getattr(last, id_attr))
+        if has_newer:
+            page.prev_cursor = encode_cursor(_BEFORE, getattr(first, time_attr), getattr(first, id_attr))
+    return page
@@ -0,0 +1,205 @@
+"""
+Retention for ``login_events``.
+
+Events older than ``LOG_RETENTION_DAYS`` are first folded into
+``login_event_daily_rollups`` (success/failure counts per organization and UTC day), then
+removed, in the same transaction, so a day is never counted twice or lost.
+
+* PostgreSQL: ``login_events`` is range-partitioned by month (``login_events_pYYYYMM``).
+  A month is summarised and its partition detached and dropped once the whole month is
+  past the window. Partitions for upcoming months are created ahead of time so new rows
+  never land in ``login_events_default``.
+* Other databases (SQLite): expired rows are summarised and deleted in id batches.
+
+Events with no organization (failed logins for unknown emails) are dropped without a
+rollup. Run it daily with ``flask prune-login-events``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import case, func, text
+
+from app import db
+from app.models import LoginEvent, LoginEventDailyRollup
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r'^login_events_p(\d{4})(\d{2})$')
+PARTITIONS_AHEAD = 2
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start (naive UTC midnight) of the oldest day still inside the retention window."""
+    try:
+        days = int(current_app.config.get('LOG_RETENTION_DAYS') or 90)
+    except (TypeError, ValueError):
+        days = 90
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return datetime.combine((now - timedelta(days=max(1, days))).date(), time.min)
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + (month.month // 12), month.month % 12 + 1, 1)
+
+
+def _as_date(value) -> date:
+    # func.date() returns a date on PostgreSQL and an ISO string on SQLite.
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _add_to_rollups(rows: Iterable[Tuple[int, object, int, int]]) -> int:
+    """Add ``(organization_id, day, successes, failures)`` counts to the rollup table."""
+    added = 0
+    for org_id, day, successes, failures in rows:
+        day = _as_date(day)
+        successes, failures = int(successes or 0), int(failures or 0)
+        updated = LoginEventDailyRollup.query.filter_by(organization_id=int(org_id), day=day).update(
+            {
+                LoginEventDailyRollup.success_count: LoginEventDailyRollup.success_count + successes,
+                LoginEventDailyRollup.failure_count: LoginEventDailyRollup.failure_count + failures,
+            },
+            synchronize_session=False,
+        )
+        if not updated:
+            db.session.add(LoginEventDailyRollup(
+                organization_id=int(org_id), day=day, success_count=successes, failure_count=failures,
+            ))
+        added += successes + failures
+    db.session.flush()
+    return added
+
+
+def _daily_counts(*criteria):
+    day = func.date(LoginEvent.created_at)
+    return (
+        db.session.query(
+            LoginEvent.organization_id,
+            day,
+            func.sum(case((LoginEvent.success.is_(True), 1), else_=0)),
+            func.sum(case((LoginEvent.success.is_(True), 0), else_=1)),
+        )
+        .filter(LoginEvent.organization_id.isnot(None), *criteria)
+        .group_by(LoginEvent.organization_id, day)
+        .all()
+    )
+
+
+def is_partitioned() -> bool:
+    if db.engine.dialect.name != 'postgresql':
+        return False
+    return bool(db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'login_events' AND c.relnamespace = to_regnamespace(current_schema())"
+    )).scalar())
+
+
+def _partitions() -> Dict[date, str]:
+    """Monthly partitions of login_events keyed by the first day of their month."""
+    names = db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "WHERE parent.relname = 'login_events'"
+    )).scalars()
+    months = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return months
+
+
+def ensure_partitions(now: Optional[datetime] = None, months_ahead: int = PARTITIONS_AHEAD) -> int:
+    """Create partitions for the current and next ``months_ahead`` months; returns how many were added."""
+    existing = _partitions()
+    month = _month_start((now or datetime.now(timezone.utc)).date())
+    created = 0
+    for _ in range(months_ahead + 1):
+        upper = _next_month(month)
+        if month not in existing:
+            db.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS login_events_p{month:%Y%m} PARTITION OF login_events "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            ))
+            created += 1
+        month = upper
+    db.session.commit()
+    return created
+
+
+def drop_expired_partitions(cutoff: datetime) -> Dict[str, int]:
+    """Roll up, detach and drop every monthly partition that ends at or before ``cutoff``."""
+    counts = {'partitions_dropped': 0, 'rolled_up': 0, 'deleted': 0}
+    for month, name in sorted(_partitions().items()):
+        upper = datetime.combine(_next_month(month), time.min)
+        if upper > cutoff:
+            break
+        try:
+            rows = int(db.session.execute(text(f'SELECT COUNT(*) FROM {name}')).scalar() or 0)
+            counts['rolled_up'] += _add_to_rollups(
+                _daily_counts(LoginEvent.created_at >= datetime.combine(month, time.min), LoginEvent.created_at < upper)
+            )
+            db.session.execute(text(f'ALTER TABLE login_events DETACH PARTITION {name}'))
+            db.session.execute(text(f'DROP TABLE {name}'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        counts['deleted'] += rows
+        counts['partitions_dropped'] += 1
+        logger.info(f"Dropped login event partition {name}")
+    return counts
+
+
+def delete_expired_in_batches(cutoff: datetime, batch_size: int = 5000) -> Dict[str, int]:
+    """Roll up and delete events older than ``cutoff``, ``batch_size`` rows per transaction."""
+    counts = {'deleted': 0, 'rolled_up': 0}
+    batch_size = max(1, int(batch_size))
+    while True:
+        ids = [
+            event_id
+            for (event_id,) in db.session.query(LoginEvent.id)
+            .filter(LoginEvent.created_at < cutoff)
+            .order_by(LoginEvent.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            break
+        try:
+            counts['rolled_up'] += _add_to_rollups(_daily_counts(LoginEvent.id.in_(ids)))
+            counts['deleted'] += LoginEvent.query.filter(LoginEvent.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if len(ids) < batch_size:
+            break
+    return counts
+
+
+def prune_login_events(now: Optional[datetime] = None, batch_size: int = 5000) -> Dict[str, object]:
+    """Apply the retention window; see the module docstring for the per-database strategy."""
+    cutoff = retention_cutoff(now)
+    result: Dict[str, object] = {'cutoff': cutoff, 'deleted': 0, 'rolled_up': 0, 'partitions_dropped': 0, 'partitions_created': 0}
+    if is_partitioned():
+        result['mode'] = 'partitions'
+        result['partitions_created'] = ensure_partitions(now)
+        result.update(drop_expired_partitions(cutoff))
+    else:
+        result['mode'] = 'batched'
+        result.update(delete_expired_in_batches(cutoff, batch_size=batch_size))
+    return result
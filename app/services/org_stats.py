@@ -0,0 +1,204 @@
+"""
+Denormalised per-organization counters (``organization_stats``).
+
+Active document count, total bytes of active documents and membership counts are kept
+up to date by session flush hooks: every flush that adds, changes or deletes a
+``Document`` or ``OrganizationMembership`` through the ORM applies the matching
+``col = col + delta`` UPDATE in the same transaction, so the counters commit or roll
+back together with the rows they describe. Bulk statements bypass the hooks; code that
+uses them calls ``adjust_document_stats`` or ``reconcile_org_stats`` itself.
+
+New organizations get a zero row in the same flush; the migration seeded rows for older ones.
+Reads never write: an org whose row is missing is counted from the source tables until
+``flask reconcile-org-stats`` recreates it.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import case, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Document, Organization, OrganizationMembership, OrganizationStats
+
+logger = logging.getLogger(__name__)
+
+_COUNTERS = ('document_count', 'document_bytes', 'member_count', 'active_member_count')
+_TRACKED = (Document, OrganizationMembership)
+_PENDING_KEY = 'org_stats_pending'
+
+
+def _old_value(obj, key):
+    """Value of ``key`` as last loaded from the database (before this flush)."""
+    state = inspect(obj)
+    history = state.attrs[key].history
+    if not history.has_changes():
+        return getattr(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    if state.key is None:
+        return None
+    # Assigned while expired, so the old value was never loaded: read it back.
+    model = type(obj)
+    return state.session.execute(select(getattr(model, key)).where(model.id == obj.id)).scalar()
+
+
+def _contribution(obj, value) -> Optional[tuple]:
+    """``(organization_id, {counter: amount})`` that ``obj`` adds to its org's stats."""
+    org_id = value(obj, 'organization_id')
+    if org_id is None:
+        return None
+    is_active = value(obj, 'is_active')
+    if isinstance(obj, Document):
+        if is_active is False:
+            return None
+        return int(org_id), {'document_count': 1, 'document_bytes': int(value(obj, 'file_size') or 0)}
+    if isinstance(obj, OrganizationMembership):
+        return int(org_id), {'member_count': 1, 'active_member_count': 0 if is_active is False else 1}
+    return None
+
+
+def _add(deltas, contribution, sign: int) -> None:
+    if contribution is None:
+        return
+    org_id, amounts = contribution
+    for name, amount in amounts.items():
+        deltas[org_id][name] += sign * amount
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changes(session, flush_context, instances):
+    # Old values of changed and deleted rows have to be read before the flush writes them.
+    deltas = defaultdict(lambda: defaultdict(int))
+    for obj in session.dirty:
+        if isinstance(obj, _TRACKED) and session.is_modified(obj):
+            _add(deltas, _contribution(obj, _old_value), -1)
+            _add(deltas, _contribution(obj, getattr), +1)
+    for obj in session.deleted:
+        if isinstance(obj, _TRACKED):
+            _add(deltas, _contribution(obj, _old_value), -1)
+    session.info[_PENDING_KEY] = deltas
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_changes(session, flush_context):
+    deltas = session.info.pop(_PENDING_KEY, None) or defaultdict(lambda: defaultdict(int))
+    new_orgs = []
+    # New rows are counted after the flush, once ids and column defaults are populated.
+    for obj in session.new:
+        if isinstance(obj, Organization):
+            new_orgs.append(int(obj.id))
+        elif isinstance(obj, _TRACKED):
+            _add(deltas, _contribution(obj, getattr), +1)
+
+    connection = session.connection()
+    now = datetime.now(timezone.utc)
+    if new_orgs:
+        connection.execute(
+            insert(OrganizationStats.__table__),
+            [dict({name: 0 for name in _COUNTERS}, organization_id=org_id, updated_at=now) for org_id in new_orgs],
+        )
+    for org_id, amounts in deltas.items():
+        _apply_delta(connection, org_id, amounts, now)
+
+
+def _apply_delta(connection, organization_id: int, amounts: Dict[str, int], now: datetime) -> None:
+    values = {
+        name: getattr(OrganizationStats.__table__.c, name) + amount
+        for name, amount in amounts.items()
+        if amount
+    }
+    if not values:
+        return
+    values['updated_at'] = now
+    # No row yet: it is computed from the source tables on first read.
+    connection.execute(
+        update(OrganizationStats.__table__)
+        .where(OrganizationStats.__table__.c.organization_id == int(organization_id))
+        .values(**values)
+    )
+
+
+def adjust_document_stats(organization_id: int, count: int, total_bytes: int = 0) -> None:
+    """Apply a document delta for rows written with bulk statements (in the caller's transaction)."""
+    _apply_delta(
+        db.session.connection(),
+        int(organization_id),
+        {'document_count': int(count), 'document_bytes': int(total_bytes or 0)},
+        datetime.now(timezone.utc),
+    )
+
+
+def _computed_stats(organization_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Exact counters per org, aggregated from documents and memberships."""
+    org_query = db.session.query(Organization.id)
+    doc_query = (
+        db.session.query(Document.organization_id, func.count(Document.id), func.sum(func.coalesce(Document.file_size, 0)))
+        .filter(Document.is_active.is_(True), Document.organization_id.isnot(None))
+    )
+    member_query = db.session.query(
+        OrganizationMembership.organization_id,
+        func.count(OrganizationMembership.id),
+        func.sum(case((OrganizationMembership.is_active.is_(True), 1), else_=0)),
+    )
+    if organization_ids is not None:
+        ids = [int(i) for i in organization_ids]
+        org_query = org_query.filter(Organization.id.in_(ids))
+        doc_query = doc_query.filter(Document.organization_id.in_(ids))
+        member_query = member_query.filter(OrganizationMembership.organization_id.in_(ids))
+
+    stats = {int(org_id): {name: 0 for name in _COUNTERS} for (org_id,) in org_query}
+    for org_id, count, size in doc_query.group_by(Document.organization_id):
+        if int(org_id) in stats:
+            stats[int(org_id)].update(document_count=int(count or 0), document_bytes=int(size or 0))
+    for org_id, total, active in member_query.group_by(OrganizationMembership.organization_id):
+        if int(org_id) in stats:
+            stats[int(org_id)].update(member_count=int(total or 0), active_member_count=int(active or 0))
+    return stats
+
+
+def reconcile_org_stats(organization_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute stats rows (all orgs by default); returns how many rows were corrected.
+
+    Does not commit.
+    """
+    computed = _computed_stats(organization_ids)
+    existing = {
+        int(row.organization_id): row
+        for row in OrganizationStats.query.filter(OrganizationStats.organization_id.in_(list(computed)))
+    }
+    now = datetime.now(timezone.utc)
+    corrected = 0
+    for org_id, values in computed.items():
+        row = existing.get(org_id)
+        if row is None:
+            db.session.add(OrganizationStats(organization_id=org_id, updated_at=now, **values))
+            corrected += 1
+        elif any(getattr(row, name) != value for name, value in values.items()):
+            logger.info(f"Org {org_id} stats drifted: {[getattr(row, n) for n in _COUNTERS]} -> {[values[n] for n in _COUNTERS]}")
+            for name, value in values.items():
+                setattr(row, name, value)
+            row.updated_at = now
+            corrected += 1
+    return corrected
+
+
+def get_org_stats(organization_id: int) -> OrganizationStats:
+    """The org's stats row; never writes.
+
+    Rows are created with the organization (flush hook), by the migration for older orgs
+    and by ``flask reconcile-org-stats``. If one is still missing, the counters are
+    computed from the source tables and returned in an unsaved row.
+    """
+    org_id = int(organization_id)
+    row = db.session.get(OrganizationStats, org_id)
+    if row is not None:
+        return row
+    logger.warning(f"Org {org_id} has no stats row; counting from source tables (run `flask reconcile-org-stats`)")
+    values = _computed_stats([org_id]).get(org_id) or {name: 0 for name in _COUNTERS}
+    return OrganizationStats(organization_id=org_id, **values)
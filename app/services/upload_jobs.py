@@ -0,0 +1,313 @@
+"""
+Durable queue for work that follows a document upload.
+
+With ``UPLOAD_PROCESSING_MODE=queued`` the ``/upload`` request only validates the file
+while writing it to ``UPLOAD_STAGING_DIR`` on local disk, then enqueues a
+``finalize_upload`` job. A worker (``flask process-upload-jobs``) uploads the staged file
+to Azure, records the Document and removes the staged copy. Jobs live in the
+``upload_jobs`` table so they survive restarts; failed attempts are retried with
+exponential backoff, and a job whose worker died is reclaimed once its lease expires. A
+worker only records a job's outcome while it still holds the claim, so a slow worker whose
+lease was reclaimed cannot finalise the same upload a second time.
+
+The worker must see the same ``UPLOAD_STAGING_DIR`` as the web processes (same host or a
+shared volume). Further post-upload work (text extraction, thumbnails, ...) is added by
+registering a handler in ``JOB_HANDLERS``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app import db
+from app.models import Document, UploadJob
+from app.services.azure_storage import AzureBlobStorageService
+from app.services.document_blobs import acquire_existing_blob, register_blob
+from app.services.file_validation import FileValidationService
+
+logger = logging.getLogger(__name__)
+
+JOB_FINALIZE_UPLOAD = 'finalize_upload'
+
+
+def _config_int(name: str, default: int) -> int:
+    try:
+        return int(current_app.config.get(name) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def staging_dir() -> str:
+    directory = current_app.config.get('UPLOAD_STAGING_DIR') or os.path.join(
+        current_app.instance_path, 'uploads', 'staging'
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _remove_staged(path: Optional[str]) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove staged upload {path}: {e}")
+
+
+def stage_upload(file_stream, filename: str) -> Dict:
+    """Validate and hash ``file_stream`` while writing it to the staging directory.
+
+    Returns the ``FileValidationService.validate_and_upload`` result; on success
+    ``result['upload']['staged_path']`` is the local copy.
+    """
+    path = os.path.join(staging_dir(), f'{uuid.uuid4().hex}.part')
+
+    def write(stream, content_type):
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(stream, out, FileValidationService.HASH_CHUNK_SIZE)
+        return {'success': True, 'staged_path': path}
+
+    result = FileValidationService.validate_and_upload(file_stream, filename, write)
+    if not result['success']:
+        _remove_staged(path)
+    return result
+
+
+def enqueue_job(kind: str, organization_id: int, user_id: Optional[int], payload: Dict) -> UploadJob:
+    """Add a pending job to the session; the caller commits."""
+    job = UploadJob(
+        kind=kind,
+        organization_id=int(organization_id),
+        user_id=int(user_id) if user_id is not None else None,
+        payload=json.dumps(payload),
+        status='pending',
+        attempts=0,
+        max_attempts=_config_int('UPLOAD_JOB_MAX_ATTEMPTS', 5),
+        run_after=datetime.now(timezone.utc),
+    )
+    db.session.add(job)
+    return job
+
+
+def _finalize_upload(job: UploadJob, payload: Dict) -> Optional[Callable[[], None]]:
+    """Upload the staged file to Azure and record its Document (in the job's transaction)."""
+    staged_path = payload['staged_path']
+    blob_name = payload['blob_name']
+    organization_id = int(job.organization_id)
+
+    storage_service = AzureBlobStorageService()
+    if not storage_service.is_configured():
+        raise RuntimeError('Azure Storage is not configured')
+
+    with open(staged_path, 'rb') as staged:
+        upload_result = storage_service.upload_file(
+            file_stream=staged,
+            file_path=blob_name,
+            content_type=payload.get('content_type'),
+            metadata=payload.get('metadata'),
+        )
+    if not upload_result['success']:
+        raise RuntimeError(upload_result.get('error') or 'Upload failed')
+
+    content_hash = payload.get('content_hash')
+    shared_blob = acquire_existing_blob(organization_id, content_hash) or register_blob(
+        organization_id,
+        content_hash,
+        blob_name,
+        file_size=payload.get('file_size'),
+        content_type=payload.get('content_type'),
+    )
+    file_path = shared_blob.blob_name if shared_blob is not None else blob_name
+
+    content_type = (payload.get('content_type') or '').strip() or None
+    document = Document(
+        filename=payload['filename'],
+        blob_name=file_path,
+        file_size=payload.get('file_size'),
+        content_type=content_type[:50] if content_type else None,
+        uploaded_by=job.user_id,
+        organization_id=organization_id,
+        content_hash=content_hash,
+    )
+    db.session.add(document)
+    db.session.flush()
+    job.document_id = document.id
+
+    def after_commit():
+        _remove_staged(staged_path)
+        if file_path != blob_name:
+            # Identical content is already stored for this org; drop the new copy.
+            storage_service.delete_file(blob_name)
+
+    return after_commit
+
+
+def _discard_upload(job: UploadJob, payload: Dict) -> None:
+    """Clean up after a finalize_upload job that ran out of attempts."""
+    _remove_staged(payload.get('staged_path'))
+    storage_service = AzureBlobStorageService()
+    if storage_service.is_configured() and payload.get('blob_name'):
+        storage_service.delete_file(payload['blob_name'])
+
+
+# kind -> handler(job, payload) returning an optional callable to run after commit
+JOB_HANDLERS: Dict[str, Callable[[UploadJob, Dict], Optional[Callable[[], None]]]] = {
+    JOB_FINALIZE_UPLOAD: _finalize_upload,
+}
+
+# kind -> cleanup(job, payload) once a job has failed for good
+JOB_FAILURE_HANDLERS: Dict[str, Callable[[UploadJob, Dict], None]] = {
+    JOB_FINALIZE_UPLOAD: _discard_upload,
+}
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = _config_int('UPLOAD_JOB_RETRY_SECONDS', 30)
+    return timedelta(seconds=min(base * (2 ** max(0, attempts - 1)), 3600))
+
+
+def claim_jobs(worker_id: str, limit: int = 10) -> List[int]:
+    """Claim up to ``limit`` due jobs for ``worker_id`` and return their ids.
+
+    Each claim is a conditional UPDATE, so two workers never run the same job. Jobs left
+    'running' longer than UPLOAD_JOB_LEASE_SECONDS (a crashed worker) are claimable again.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=_config_int('UPLOAD_JOB_LEASE_SECONDS', 600))
+    claimable = or_(
+        and_(UploadJob.status == 'pending', UploadJob.run_after <= now),
+        and_(UploadJob.status == 'running', UploadJob.locked_at < stale_before),
+    )
+
+    candidate_ids = [
+        job_id
+        for (job_id,) in db.session.query(UploadJob.id).filter(claimable).order_by(UploadJob.run_after).limit(limit)
+    ]
+
+    claimed = []
+    for job_id in candidate_ids:
+        updated = UploadJob.query.filter(UploadJob.id == job_id, claimable).update(
+            {
+                UploadJob.status: 'running',
+                UploadJob.locked_by: worker_id[:64],
+                UploadJob.locked_at: now,
+                UploadJob.attempts: UploadJob.attempts + 1,
+                UploadJob.updated_at: now,
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def run_job(job_id: int) -> str:
+    """Run one claimed job; returns its new status ('done', 'pending' for a retry, or 'failed').
+
+    The outcome is only recorded while this worker still holds the claim, identified by the
+    attempt number it took. If the lease expired and another worker reclaimed the job in the
+    meantime, this attempt's changes (including any Document) are rolled back and
+    'superseded' is returned, so a job is never finalised twice.
+    """
+    job = db.session.get(UploadJob, job_id)
+    if job is None:
+        return 'missing'
+    attempt = int(job.attempts)
+    max_attempts = int(job.max_attempts)
+    kind = job.kind
+    payload = json.loads(job.payload)
+
+    def still_claimed():
+        return UploadJob.query.filter(
+            UploadJob.id == job_id,
+            UploadJob.status == 'running',
+            UploadJob.attempts == attempt,
+        )
+
+    after_commit = None
+    try:
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            raise RuntimeError(f'No handler for job kind {kind!r}')
+        after_commit = handler(job, payload)
+        finished = still_claimed().update(
+            {
+                UploadJob.status: 'done',
+                UploadJob.last_error: None,
+                UploadJob.locked_by: None,
+                UploadJob.locked_at: None,
+                UploadJob.updated_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+        if not finished:
+            db.session.rollback()
+            logger.warning(f"Upload job {job_id} was reclaimed by another worker; discarding attempt {attempt}")
+            return 'superseded'
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Upload job {job_id} attempt failed: {e}")
+        values = {
+            UploadJob.last_error: str(e)[:500],
+            UploadJob.locked_by: None,
+            UploadJob.locked_at: None,
+            UploadJob.updated_at: datetime.now(timezone.utc),
+        }
+        if attempt >= max_attempts:
+            status = 'failed'
+            values[UploadJob.status] = 'failed'
+        else:
+            status = 'pending'
+            values[UploadJob.status] = 'pending'
+            values[UploadJob.run_after] = datetime.now(timezone.utc) + _retry_delay(attempt)
+        recorded = still_claimed().update(values, synchronize_session=False)
+        db.session.commit()
+        if not recorded:
+            logger.warning(f"Upload job {job_id} was reclaimed by another worker; not recording attempt {attempt}")
+            return 'superseded'
+        if status == 'failed':
+            cleanup = JOB_FAILURE_HANDLERS.get(kind)
+            if cleanup is not None:
+                try:
+                    cleanup(db.session.get(UploadJob, job_id), payload)
+                except Exception as cleanup_error:
+                    logger.error(f"Cleanup of failed upload job {job_id} failed: {cleanup_error}")
+        return status
+
+    if after_commit is not None:
+        try:
+            after_commit()
+        except Exception as e:
+            logger.warning(f"Post-commit step of upload job {job_id} failed: {e}")
+    return 'done'
+
+
+def process_pending_jobs(worker_id: str, limit: int = 10) -> Dict[str, int]:
+    """Claim and run one batch of due jobs."""
+    counts = {'claimed': 0, 'done': 0, 'retried': 0, 'failed': 0, 'superseded': 0}
+    for job_id in claim_jobs(worker_id, limit=limit):
+        counts['claimed'] += 1
+        status = run_job(job_id)
+        if status == 'done':
+            counts['done'] += 1
+        elif status == 'pending':
+            counts['retried'] += 1
+        elif status == 'failed':
+            counts['failed'] += 1
+        elif status == 'superseded':
+            counts['superseded'] += 1
+    return counts
@@ -3,13 +3,22 @@ from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from app.upload import bp
 from app.services.azure_storage import AzureBlobStorageService
+from app.services.document_blobs import acquire_existing_blob, register_blob
+from app.services.document_names import allocate_document_filename
 from app.services.file_validation import FileValidationService
-from app.models import Document, Organization, OrganizationMembership
+from app.services.org_stats import adjust_document_stats
+from app.services.upload_jobs import JOB_FINALIZE_UPLOAD, enqueue_job, stage_upload
+from app.models import Document, Organization, OrganizationMembership, UploadJob, UploadSession, UploadSessionChunk
 from app import db
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+import hashlib
 import logging
-import re
 import os
+import threading
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -18,41 +27,24 @@ def get_versioned_filename(original_filename, organization_id):
     Check if filename exists in the organization and return a versioned name if needed.
     E.g., policy.pdf -> policy (1).pdf -> policy (2).pdf
     """
-    # Check if the exact filename already exists
-    existing = Document.query.filter_by(
-        filename=original_filename,
-        organization_id=organization_id
-    ).first()
-    
-    if not existing:
-        # Filename doesn't exist, use original
-        return original_filename
-    
-    # Parse filename and extension
-    name, ext = os.path.splitext(original_filename)
-    
-    # Find all files with similar names (e.g., "policy.pdf", "policy (1).pdf", "policy (2).pdf")
-    # Pattern: "name (number).ext"
-    pattern = re.escape(name) + r'(?: \((\d+)\))?' + re.escape(ext)
-    
-    all_docs = Document.query.filter_by(organization_id=organization_id).all()
-    
-    version_numbers = []
-    for doc in all_docs:
-        match = re.fullmatch(pattern, doc.filename)
-        if match:
-            version_str = match.group(1)
-            if version_str:
-                version_numbers.append(int(version_str))
-            else:
-                version_numbers.append(0)  # Original file without version number
-    
-    if not version_numbers:
-        return original_filename
-    
-    # Find the next available version number
-    next_version = max(version_numbers) + 1
-    return f"{name} ({next_version}){ext}"
+    return allocate_document_filename(original_filename, organization_id)
+
+def _is_seekable(stream):
+    """Whether the upload stream can be rewound after hashing (true for spooled FileStorage)."""
+    try:
+        return bool(stream.seekable())
+    except Exception:
+        return False
+
+def _db_content_type(content_type):
+    """The documents.content_type column may be limited (older schema uses VARCHAR(50)).
+
+    DOCX MIME types can exceed that length, so store a safe, truncated value.
+    """
+    value = (content_type or '').strip() or None
+    if value and len(value) > 50:
+        value = value[:50]
+    return value
 
 @bp.route('/upload', methods=['POST'])
 @login_required
@@ -102,16 +94,6 @@ def upload_file():
             flash('No file selected. Please choose a file to upload.', 'error')
             return redirect(referrer)
         
-        # Validate the file
-        validation_result = FileValidationService.validate_file(file.stream, file.filename)
-        
-        if not validation_result['success']:
-            flash(f"File validation failed: {validation_result['error']}", 'error')
-            return redirect(referrer)
-        
-        # Check for duplicate filename and generate versioned name if needed
-        versioned_filename = get_versioned_filename(validation_result['original_filename'], int(org_id))
-        
         # Initialize Azure Storage service
         storage_service = AzureBlobStorageService()
         
@@ -122,42 +104,96 @@ def upload_file():
         
         # Generate unique file path for ADLS
         file_path = storage_service.generate_blob_name(
-            validation_result['original_filename'],
+            file.filename,
             current_user.id,
             organization_id=int(org_id),
         )
         
-        # Prepare metadata
+        # Prepare metadata. The versioned name is only allocated once the file has passed
+        # validation, so rejected uploads do not use up version numbers.
         metadata = {
             'uploaded_by': str(current_user.id),
             'uploaded_by_email': current_user.email,
-            'original_filename': versioned_filename,
+            'original_filename': file.filename,
             'upload_timestamp': str(int(datetime.now(timezone.utc).timestamp()))
         }
         
-        # Reset file stream position
-        file.stream.seek(0)
+        if (current_app.config.get('UPLOAD_PROCESSING_MODE') or 'inline') == 'queued':
+            return _queue_upload(file, org_id, file_path, metadata, referrer)
         
-        # Upload to Azure Data Lake Storage
-        upload_result = storage_service.upload_file(
-            file_stream=file.stream,
-            file_path=file_path,
-            content_type=validation_result['content_type'],
-            metadata=metadata
-        )
+        if _is_seekable(file.stream):
+            # Hash before touching storage so an identical re-upload never writes a blob.
+            validation_result = FileValidationService.validate_file(file.stream, file.filename)
+            if not validation_result['success']:
+                flash(f"File validation failed: {validation_result['error']}", 'error')
+                return redirect(referrer)
+            upload_result = {}
+            uploaded_path = None
+        else:
+            # Validate, hash and upload in one pass over the request stream
+            validation_result = FileValidationService.validate_and_upload(
+                file.stream,
+                file.filename,
+                lambda stream, content_type: storage_service.upload_file(
+                    file_stream=stream,
+                    file_path=file_path,
+                    content_type=content_type,
+                    metadata=metadata
+                ),
+            )
+            upload_result = validation_result.get('upload') or {}
+            
+            if not validation_result['success']:
+                if upload_result.get('success'):
+                    # The uploader stopped reading early and the remainder failed the checks.
+                    storage_service.delete_file(file_path)
+                if validation_result.get('stage') == 'upload':
+                    flash(f"Upload failed: {validation_result['error']}", 'error')
+                    logger.error(f"Azure upload failed for user {current_user.id}: {validation_result['error']}")
+                else:
+                    flash(f"File validation failed: {validation_result['error']}", 'error')
+                return redirect(referrer)
+            uploaded_path = file_path
         
-        if not upload_result['success']:
-            flash(f"Upload failed: {upload_result['error']}", 'error')
-            logger.error(f"Azure upload failed for user {current_user.id}: {upload_result['error']}")
-            return redirect(referrer)
+        content_hash = validation_result.get('content_hash')
         
         # Save document metadata to database
         try:
-            # The documents.content_type column may be limited (older schema uses VARCHAR(50)).
-            # DOCX MIME types can exceed that length, so store a safe, truncated value.
-            db_content_type = (validation_result.get('content_type') or '').strip() or None
-            if db_content_type and len(db_content_type) > 50:
-                db_content_type = db_content_type[:50]
+            # Check for duplicate filename and generate versioned name if needed
+            versioned_filename = get_versioned_filename(file.filename, int(org_id))
+
+            shared_blob = acquire_existing_blob(int(org_id), content_hash)
+            if shared_blob is None and uploaded_path is None:
+                # New content: only now stream the (already validated) file to storage.
+                file.stream.seek(0)
+                upload_result = storage_service.upload_file(
+                    file_stream=file.stream,
+                    file_path=file_path,
+                    content_type=validation_result.get('content_type'),
+                    metadata=metadata
+                )
+                if not upload_result.get('success'):
+                    db.session.rollback()
+                    flash(f"Upload failed: {upload_result.get('error')}", 'error')
+                    logger.error(f"Azure upload failed for user {current_user.id}: {upload_result.get('error')}")
+                    return redirect(referrer)
+                uploaded_path = file_path
+            if shared_blob is None:
+                # A non-seekable stream is only hashed as it uploads, so a concurrent or
+                # earlier identical file is detected here and the new copy dropped.
+                shared_blob = register_blob(
+                    int(org_id),
+                    content_hash,
+                    uploaded_path,
+                    file_size=validation_result['file_size'],
+                    content_type=validation_result.get('content_type'),
+                )
+            if shared_blob is not None and shared_blob.blob_name != uploaded_path:
+                # Identical content is already stored for this org; keep that copy.
+                file_path = shared_blob.blob_name
+                upload_result['deduplicated'] = True
+
+            db_content_type = _db_content_type(validation_result.get('content_type'))
 
             document = Document(
                 filename=versioned_filename,
@@ -165,16 +201,22 @@ def upload_file():
                 file_size=validation_result['file_size'],
                 content_type=db_content_type,
                 uploaded_by=current_user.id,
-                organization_id=int(org_id)
+                organization_id=int(org_id),
+                content_hash=content_hash
             )
             db.session.add(document)
             db.session.commit()
 
+            if uploaded_path and uploaded_path != file_path:
+                storage_service.delete_file(uploaded_path)
+
             storage_type = upload_result.get('storage_type', 'ADLS_Gen2')
             
             # Show appropriate message based on whether filename was versioned
             if versioned_filename != validation_result['original_filename']:
                 flash(f'File uploaded as "{versioned_filename}" (original name already exists).', 'success')
+            elif upload_result.get('deduplicated'):
+                flash(f'File "{versioned_filename}" uploaded successfully (identical content already stored).', 'success')
             else:
                 flash(f'File "{versioned_filename}" uploaded successfully to {storage_type}!', 'success')
             
@@ -182,8 +224,9 @@ def upload_file():
         
         except Exception as e:
             db.session.rollback()
-            # If database save failed, try to clean up the uploaded file
-            storage_service.delete_file(file_path)
+            # If database save failed, try to clean up the file uploaded by this request
+            if uploaded_path:
+                storage_service.delete_file(uploaded_path)
             flash('Upload failed: Database error occurred.', 'error')
             logger.error(f"Database error during file upload: {e}")
         
@@ -194,6 +237,209 @@ def upload_file():
         logger.error(f"Unexpected error in file upload: {e}")
         return redirect(referrer if 'referrer' in locals() else url_for('main.dashboard'))
 
+def _wants_json():
+    return (
+        request.headers.get('X-Requested-With') in {'XMLHttpRequest', 'fetch'}
+        or request.accept_mimetypes.best == 'application/json'
+    )
+
+def _queue_upload(file, org_id, file_path, metadata, referrer):
+    """Stage the upload on local disk and leave the Azure upload and Document to the worker.
+
+    XHR/fetch clients get the job id and its status URL as JSON (202); form posts get them
+    in the flash message.
+    """
+    staged = stage_upload(file.stream, file.filename)
+    if not staged['success']:
+        if _wants_json():
+            return _json_error(f"File validation failed: {staged['error']}", staged.get('error_code') or 'VALIDATION_FAILED')
+        flash(f"File validation failed: {staged['error']}", 'error')
+        return redirect(referrer)
+    
+    staged_path = staged['upload']['staged_path']
+    try:
+        versioned_filename = get_versioned_filename(file.filename, int(org_id))
+        job = enqueue_job(
+            JOB_FINALIZE_UPLOAD,
+            int(org_id),
+            current_user.id,
+            {
+                'staged_path': staged_path,
+                'blob_name': file_path,
+                'filename': versioned_filename,
+                'content_type': staged['content_type'],
+                'content_hash': staged['content_hash'],
+                'file_size': staged['file_size'],
+                'metadata': metadata,
+            },
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        os.remove(staged_path)
+        logger.error(f"Database error queueing upload: {e}")
+        if _wants_json():
+            return _json_error('Upload failed: Database error occurred.', 'DATABASE_ERROR', 500)
+        flash('Upload failed: Database error occurred.', 'error')
+        return redirect(referrer)
+    
+    status_url = url_for('upload.upload_job_status', job_id=job.id)
+    logger.info(f"Upload queued as job {job.id}: {file_path} as {versioned_filename} by user {current_user.id}")
+    if _wants_json():
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': status_url,
+            'filename': versioned_filename,
+        }), 202
+    flash(
+        f'File "{versioned_filename}" received and is being processed (upload job {job.id}, status: {status_url}). '
+        'It will appear in your documents shortly.',
+        'success',
+    )
+    return redirect(referrer)
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+def _get_batch_executor():
+    """Process-wide pool for batch transfers, so concurrent batches share one bound."""
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            workers = max(1, int(current_app.config.get('UPLOAD_BATCH_WORKERS') or 4))
+            _batch_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload-batch')
+        return _batch_executor
+
+@bp.route('/upload/batch', methods=['POST'])
+@login_required
+def upload_batch():
+    """Upload several files (multipart field ``files``) in one request.
+
+    Authorisation and storage setup happen once for the batch, the Azure transfers run
+    concurrently on a bounded pool (UPLOAD_BATCH_WORKERS), and all Document rows are
+    written with one bulk INSERT. Returns one result per file, in request order.
+    """
+    org_id = _chunked_upload_org_id()
+    if org_id is None:
+        return _json_error('Not authorized', 'NOT_AUTHORIZED', 403)
+
+    files = [f for f in request.files.getlist('files') if f and f.filename]
+    if not files:
+        return _json_error('No files selected', 'NO_FILE_SELECTED')
+    max_files = int(current_app.config.get('UPLOAD_BATCH_MAX_FILES') or 20)
+    if len(files) > max_files:
+        return _json_error(f'At most {max_files} files can be uploaded at once', 'TOO_MANY_FILES')
+
+    storage_service = AzureBlobStorageService()
+    if not storage_service.is_configured():
+        return _json_error('File upload is currently unavailable. Azure Storage is not configured.', 'STORAGE_NOT_CONFIGURED', 503)
+
+    upload_timestamp = str(int(datetime.now(timezone.utc).timestamp()))
+    entries = []
+    for file in files:
+        entries.append({
+            'file': file,
+            'file_path': storage_service.generate_blob_name(file.filename, current_user.id, organization_id=org_id),
+            'metadata': {
+                'uploaded_by': str(current_user.id),
+                'uploaded_by_email': current_user.email,
+                'original_filename': file.filename,
+                'upload_timestamp': upload_timestamp
+            },
+        })
+
+    app = current_app._get_current_object()
+
+    def _transfer(entry):
+        with app.app_context():
+            return FileValidationService.validate_and_upload(
+                entry['file'].stream,
+                entry['file'].filename,
+                lambda stream, content_type: storage_service.upload_file(
+                    file_stream=stream,
+                    file_path=entry['file_path'],
+                    content_type=content_type,
+                    metadata=entry['metadata']
+                ),
+            )
+
+    if len(entries) == 1:
+        outcomes = [_transfer(entries[0])]
+    else:
+        outcomes = list(_get_batch_executor().map(_transfer, entries))
+
+    results = []
+    stored = []
+    for entry, outcome in zip(entries, outcomes):
+        result = {'filename': entry['file'].filename, 'success': bool(outcome['success'])}
+        if not outcome['success']:
+            if (outcome.get('upload') or {}).get('success'):
+                storage_service.delete_file(entry['file_path'])
+            result.update(error=outcome['error'], error_code=outcome.get('error_code'))
+        else:
+            stored.append((entry, outcome, result))
+        results.append(result)
+
+    orphaned = []
+    if stored:
+        try:
+            # Only files that passed validation are given a versioned name. Allocation
+            # commits, so it runs before any blob reference is taken below.
+            for entry, _outcome, _result in stored:
+                entry['versioned_filename'] = get_versioned_filename(entry['file'].filename, org_id)
+
+            rows = []
+            for entry, outcome, result in stored:
+                shared_blob = acquire_existing_blob(org_id, outcome['content_hash']) or register_blob(
+                    org_id,
+                    outcome['content_hash'],
+                    entry['file_path'],
+                    file_size=outcome['file_size'],
+                    content_type=outcome['content_type'],
+                )
+                blob_name = shared_blob.blob_name if shared_blob is not None else entry['file_path']
+                if blob_name != entry['file_path']:
+                    orphaned.append(entry['file_path'])
+                    result['deduplicated'] = True
+                rows.append({
+                    'filename': entry['versioned_filename'],
+                    'blob_name': blob_name,
+                    'file_size': outcome['file_size'],
+                    'content_type': _db_content_type(outcome['content_type']),
+                    'uploaded_by': int(current_user.id),
+                    'organization_id': org_id,
+                    'content_hash': outcome['content_hash'],
+                    'uploaded_at': datetime.now(timezone.utc),
+                    'is_active': True,
+                })
+
+            document_ids = db.session.scalars(insert(Document).returning(Document.id, sort_by_parameter_order=True), rows).all()
+            # Bulk inserts skip the ORM flush hooks that maintain organization_stats.
+            adjust_document_stats(org_id, len(rows), sum(int(r['file_size'] or 0) for r in rows))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Database error during batch upload: {e}")
+            for entry, _outcome, result in stored:
+                storage_service.delete_file(entry['file_path'])
+                result.update(success=False, error='Upload failed: Database error occurred.', error_code='DATABASE_ERROR')
+            stored = []
+        else:
+            for (entry, _outcome, result), document_id in zip(stored, document_ids):
+                result.update(document_id=document_id, stored_as=entry['versioned_filename'])
+            for blob_name in orphaned:
+                storage_service.delete_file(blob_name)
+
+    logger.info(f"Batch upload by user {current_user.id}: {len(stored)}/{len(results)} files stored for org {org_id}")
+    return jsonify({
+        'success': all(r['success'] for r in results),
+        'uploaded': sum(1 for r in results if r['success']),
+        'failed': sum(1 for r in results if not r['success']),
+        'results': results,
+    })
+
 @bp.route('/upload/validate', methods=['POST'])
 @login_required
 def validate_file_ajax():
@@ -241,15 +487,326 @@ def validate_file_ajax():
             'error_code': 'VALIDATION_ERROR'
         })
 
+def _json_error(error, error_code, status=400):
+    return jsonify({'success': False, 'error': error, 'error_code': error_code}), status
+
+def _can_upload_to(org_id):
+    """Whether the current user is an active member of ``org_id`` with documents.upload."""
+    if not org_id or not current_user.has_permission('documents.upload', org_id=int(org_id)):
+        return False
+    membership = (
+        OrganizationMembership.query
+        .filter_by(user_id=int(current_user.id), organization_id=int(org_id), is_active=True)
+        .first()
+    )
+    return membership is not None
+
+def _chunked_upload_org_id():
+    """Organisation the current user may upload to, or None."""
+    org_id = getattr(current_user, 'organization_id', None)
+    return int(org_id) if _can_upload_to(org_id) else None
+
+def _get_upload_session(upload_id):
+    """The current user's upload session, or None (also when it has expired)."""
+    upload = db.session.get(UploadSession, str(upload_id))
+    if not upload or int(upload.user_id) != int(current_user.id):
+        return None
+    ttl_hours = int(current_app.config.get('UPLOAD_SESSION_TTL_HOURS') or 24)
+    created_at = upload.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    if upload.status == 'uploading' and datetime.now(timezone.utc) - created_at > timedelta(hours=ttl_hours):
+        return None
+    return upload
+
+def _expected_chunk_size(upload, index):
+    if index < upload.total_chunks - 1:
+        return upload.chunk_size
+    return upload.file_size - upload.chunk_size * (upload.total_chunks - 1)
+
+def _upload_progress_payload(upload):
+    received = (
+        db.session.query(UploadSessionChunk.chunk_index, UploadSessionChunk.size)
+        .filter(UploadSessionChunk.upload_id == upload.id)
+        .order_by(UploadSessionChunk.chunk_index)
+        .all()
+    )
+    bytes_received = sum(int(size) for _, size in received)
+    progress = 100 if upload.status == 'committed' else int(bytes_received * 100 / upload.file_size)
+    return {
+        'success': True,
+        'upload_id': upload.id,
+        'status': upload.status,
+        'progress': progress,
+        'bytes_received': bytes_received,
+        'file_size': upload.file_size,
+        'chunk_size': upload.chunk_size,
+        'total_chunks': upload.total_chunks,
+        'received_chunks': [int(index) for index, _ in received],
+        'document_id': upload.document_id,
+        'error': upload.error,
+    }
+
+@bp.route('/upload/sessions', methods=['POST'])
+@login_required
+def init_chunked_upload():
+    """Start a resumable chunked upload.
+
+    Protocol: POST here with {filename, file_size}; PUT each chunk's raw bytes to
+    /upload/sessions/<upload_id>/chunks/<index> (any order, retries are safe); then POST
+    /upload/sessions/<upload_id>/commit. Each chunk is staged directly as an Azure block, so
+    no request holds more than one chunk. GET /upload/progress/<upload_id> reports which
+    chunks arrived, so a client can resume after a dropped connection.
+    """
+    org_id = _chunked_upload_org_id()
+    if org_id is None:
+        return _json_error('Not authorized', 'NOT_AUTHORIZED', 403)
+
+    payload = request.get_json(silent=True) or {}
+    filename = str(payload.get('filename') or '').strip()
+    try:
+        file_size = int(payload.get('file_size') or 0)
+    except (TypeError, ValueError):
+        file_size = 0
+
+    if not FileValidationService.is_allowed_file(filename):
+        return _json_error(
+            f'File type not allowed. Supported formats: {", ".join(FileValidationService.ALLOWED_EXTENSIONS.keys())}',
+            'INVALID_EXTENSION',
+        )
+    if file_size <= 0:
+        return _json_error('File is empty', 'EMPTY_FILE')
+    if file_size > FileValidationService.MAX_FILE_SIZE:
+        return _json_error(
+            f'File size ({FileValidationService._format_file_size(file_size)}) exceeds maximum allowed size '
+            f'({FileValidationService.get_max_file_size_formatted()})',
+            'FILE_TOO_LARGE',
+        )
+
+    storage_service = AzureBlobStorageService()
+    if not storage_service.is_configured():
+        return _json_error('File upload is currently unavailable. Azure Storage is not configured.', 'STORAGE_NOT_CONFIGURED', 503)
+
+    chunk_size = max(1, int(current_app.config.get('UPLOAD_CHUNK_SIZE') or 4 * 1024 * 1024))
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        organization_id=org_id,
+        user_id=int(current_user.id),
+        filename=filename,
+        content_type=FileValidationService.get_content_type(filename),
+        file_size=file_size,
+        chunk_size=chunk_size,
+        total_chunks=(file_size + chunk_size - 1) // chunk_size,
+        blob_name=storage_service.generate_blob_name(filename, current_user.id, organization_id=org_id),
+        status='uploading',
+    )
+    db.session.add(upload)
+    db.session.commit()
+
+    return jsonify(_upload_progress_payload(upload)), 201
+
+@bp.route('/upload/sessions/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@login_required
+def put_upload_chunk(upload_id, index):
+    """Stage one chunk (raw request body) of a chunked upload as an Azure block."""
+    upload = _get_upload_session(upload_id)
+    if upload is None:
+        return _json_error('Upload not found', 'UPLOAD_NOT_FOUND', 404)
+    # Membership or permissions may have been revoked since the session was started.
+    if not _can_upload_to(upload.organization_id):
+        return _json_error('Not authorized', 'NOT_AUTHORIZED', 403)
+    if upload.status != 'uploading':
+        return _json_error(f'Upload is {upload.status}', 'UPLOAD_NOT_ACTIVE', 409)
+    if index < 0 or index >= upload.total_chunks:
+        return _json_error('Chunk index out of range', 'INVALID_CHUNK_INDEX')
+
+    data = request.get_data(cache=False)
+    expected = _expected_chunk_size(upload, index)
+    if len(data) != expected:
+        return _json_error(f'Chunk {index} must be {expected} bytes, got {len(data)}', 'INVALID_CHUNK_SIZE')
+
+    if index == 0:
+        content_result = FileValidationService.check_file_signature(data[:FileValidationService.SIGNATURE_LENGTH], upload.filename)
+        if not content_result['success']:
+            upload.status = 'failed'
+            upload.error = content_result['error'][:255]
+            db.session.commit()
+            return jsonify(content_result), 400
+
+    storage_service = AzureBlobStorageService()
+    stage_result = storage_service.stage_block(upload.blob_name, index, data)
+    if not stage_result['success']:
+        # The chunk can simply be re-sent; the session stays open.
+        return jsonify(stage_result), 502
+
+    chunk = db.session.get(UploadSessionChunk, (upload.id, index))
+    if chunk is None:
+        db.session.add(UploadSessionChunk(upload_id=upload.id, chunk_index=index, size=len(data)))
+    else:
+        chunk.size = len(data)
+        chunk.received_at = datetime.now(timezone.utc)
+    upload.updated_at = datetime.now(timezone.utc)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent PUT of the same chunk recorded it first; the block was staged either way.
+        db.session.rollback()
+
+    return jsonify(_upload_progress_payload(upload))
+
+def _release_upload_claim(upload_id):
+    """Reopen a session whose commit failed so the client can retry it."""
+    UploadSession.query.filter_by(id=str(upload_id), status='committing').update(
+        {UploadSession.status: 'uploading', UploadSession.updated_at: datetime.now(timezone.utc)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+@bp.route('/upload/sessions/<upload_id>/commit', methods=['POST'])
+@login_required
+def commit_chunked_upload(upload_id):
+    """Commit all staged chunks and record the Document."""
+    upload = _get_upload_session(upload_id)
+    if upload is None:
+        return _json_error('Upload not found', 'UPLOAD_NOT_FOUND', 404)
+    if not _can_upload_to(upload.organization_id):
+        return _json_error('Not authorized', 'NOT_AUTHORIZED', 403)
+    if upload.status == 'committed':
+        return jsonify(_upload_progress_payload(upload))
+    if upload.status != 'uploading':
+        return _json_error(f'Upload is {upload.status}', 'UPLOAD_NOT_ACTIVE', 409)
+
+    progress = _upload_progress_payload(upload)
+    missing = sorted(set(range(upload.total_chunks)) - set(progress['received_chunks']))
+    if missing:
+        return jsonify({
+            'success': False,
+            'error': 'Upload is incomplete',
+            'error_code': 'UPLOAD_INCOMPLETE',
+            'missing_chunks': missing,
+        }), 409
+
+    # Claim the session so a concurrent commit request cannot record a second Document.
+    claimed = UploadSession.query.filter_by(id=upload.id, status='uploading').update(
+        {UploadSession.status: 'committing', UploadSession.updated_at: datetime.now(timezone.utc)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    if not claimed:
+        db.session.refresh(upload)
+        if upload.status == 'committed':
+            return jsonify(_upload_progress_payload(upload))
+        return _json_error(f'Upload is {upload.status}', 'UPLOAD_NOT_ACTIVE', 409)
+
+    versioned_filename = get_versioned_filename(upload.filename, int(upload.organization_id))
+    metadata = {
+        'uploaded_by': str(current_user.id),
+        'uploaded_by_email': current_user.email,
+        'original_filename': versioned_filename,
+        'upload_timestamp': str(int(datetime.now(timezone.utc).timestamp()))
+    }
+
+    storage_service = AzureBlobStorageService()
+    commit_result = storage_service.commit_blocks(
+        upload.blob_name,
+        upload.total_chunks,
+        content_type=upload.content_type,
+        metadata=metadata,
+    )
+    if not commit_result['success']:
+        _release_upload_claim(upload.id)
+        return jsonify(commit_result), 502
+
+    org_id = int(upload.organization_id)
+    content_hash = _hash_committed_blob(storage_service, upload.blob_name)
+    file_path = upload.blob_name
+    try:
+        # Same content-addressed path as inline uploads: identical content already stored
+        # for this org is shared and the blob just committed is dropped.
+        shared_blob = acquire_existing_blob(org_id, content_hash) or register_blob(
+            org_id,
+            content_hash,
+            upload.blob_name,
+            file_size=upload.file_size,
+            content_type=upload.content_type,
+        )
+        if shared_blob is not None:
+            file_path = shared_blob.blob_name
+        document = Document(
+            filename=versioned_filename,
+            blob_name=file_path,
+            file_size=upload.file_size,
+            content_type=_db_content_type(upload.content_type),
+            uploaded_by=current_user.id,
+            organization_id=org_id,
+            content_hash=content_hash
+        )
+        db.session.add(document)
+        db.session.flush()
+        upload.status = 'committed'
+        upload.document_id = document.id
+        upload.updated_at = datetime.now(timezone.utc)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        storage_service.delete_file(upload.blob_name)
+        # The committed blob is gone, so the staged chunks cannot be committed again.
+        UploadSession.query.filter_by(id=str(upload_id), status='committing').update(
+            {UploadSession.status: 'failed', UploadSession.error: 'Database error occurred.'},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        logger.error(f"Database error committing chunked upload {upload_id}: {e}")
+        return _json_error('Upload failed: Database error occurred.', 'DATABASE_ERROR', 500)
+
+    if file_path != upload.blob_name:
+        storage_service.delete_file(upload.blob_name)
+
+    logger.info(f"Chunked upload committed: {file_path} as {versioned_filename} by user {current_user.id}")
+    return jsonify(_upload_progress_payload(upload))
+
+def _hash_committed_blob(storage_service, blob_name):
+    """SHA-256 of a committed blob, read back chunk by chunk in block order; None on failure.
+
+    Chunks may be PUT in any order, so the content hash can only be computed once the
+    block list is committed.
+    """
+    download = storage_service.open_download(blob_name)
+    if not download['success']:
+        logger.warning(f"Could not hash committed upload {blob_name}: {download.get('error')}")
+        return None
+    digest = hashlib.sha256()
+    try:
+        for chunk in download['chunks']:
+            digest.update(chunk)
+    except Exception as e:
+        logger.warning(f"Could not hash committed upload {blob_name}: {e}")
+        return None
+    return digest.hexdigest()
+
 @bp.route('/upload/progress/<upload_id>')
 @login_required
 def upload_progress(upload_id):
-    """Get upload progress (placeholder for future implementation)."""
-    # This is a placeholder for future upload progress tracking
+    """Get server-side progress of a chunked upload."""
+    upload = _get_upload_session(upload_id)
+    if upload is None:
+        return _json_error('Upload not found', 'UPLOAD_NOT_FOUND', 404)
+    return jsonify(_upload_progress_payload(upload))
+
+@bp.route('/upload/jobs/<int:job_id>')
+@login_required
+def upload_job_status(job_id):
+    """Get the processing status of a queued upload."""
+    job = db.session.get(UploadJob, int(job_id))
+    if not job or job.user_id is None or int(job.user_id) != int(current_user.id):
+        return _json_error('Upload job not found', 'UPLOAD_JOB_NOT_FOUND', 404)
     return jsonify({
         'success': True,
-        'progress': 100,
-        'status': 'completed'
+        'job_id': job.id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'document_id': job.document_id,
+        'error': job.last_error if job.status == 'failed' else None,
     })
 
 @bp.route('/upload/info')
@@ -261,5 +818,7 @@ def upload_info():
         'max_file_size': FileValidationService.MAX_FILE_SIZE,
         'max_file_size_formatted': FileValidationService.get_max_file_size_formatted(),
         'allowed_extensions': FileValidationService.get_allowed_extensions_list(),
+        'chunk_size': int(current_app.config.get('UPLOAD_CHUNK_SIZE') or 4 * 1024 * 1024),
+        'batch_max_files': int(current_app.config.get('UPLOAD_BATCH_MAX_FILES') or 20),
         'azure_configured': AzureBlobStorageService().is_configured()
     })
\ No newline at end of file
@@ -20,6 +20,20 @@ class Config:
     # Azure Storage Configuration
     AZURE_STORAGE_CONNECTION_STRING = os.environ.get('AZURE_STORAGE_CONNECTION_STRING')
     AZURE_CONTAINER_NAME = os.environ.get('AZURE_CONTAINER_NAME') or 'compliance-documents'
+    # Upload mode: 'streaming' stages the request stream as fixed-size blocks (bounded memory);
+    # 'buffered' reads the whole file and uploads it in one call (legacy behaviour).
+    AZURE_UPLOAD_MODE = (os.environ.get('AZURE_UPLOAD_MODE') or 'streaming').strip().lower()
+    AZURE_UPLOAD_BLOCK_SIZE = int(os.environ.get('AZURE_UPLOAD_BLOCK_SIZE') or 4 * 1024 * 1024)
+    # Bytes per Azure GET when streaming downloads (bounds memory per download).
+    AZURE_DOWNLOAD_CHUNK_SIZE = int(os.environ.get('AZURE_DOWNLOAD_CHUNK_SIZE') or 4 * 1024 * 1024)
+    # Document/logo downloads: 'proxy' streams bytes through the app; 'redirect' answers with a
+    # 302 to a read-only SAS URL for that one blob, valid for DOWNLOAD_SAS_TTL_SECONDS.
+    DOWNLOAD_DELIVERY_MODE = (os.environ.get('DOWNLOAD_DELIVERY_MODE') or 'proxy').strip().lower()
+    DOWNLOAD_SAS_TTL_SECONDS = int(os.environ.get('DOWNLOAD_SAS_TTL_SECONDS') or 300)
+    # Local LRU disk cache of downloaded documents (0 disables). Default dir: <instance>/cache/blobs.
+    BLOB_DISK_CACHE_DIR = os.environ.get('BLOB_DISK_CACHE_DIR')
+    BLOB_DISK_CACHE_MAX_BYTES = int(os.environ.get('BLOB_DISK_CACHE_MAX_BYTES') or 1024 * 1024 * 1024)
+    BLOB_DISK_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('BLOB_DISK_CACHE_MAX_ENTRY_BYTES') or 64 * 1024 * 1024)
     
     # Database Configuration
     # For SQLite, Flask-SQLAlchemy resolves relative file paths against the Flask instance folder.
@@ -72,6 +86,19 @@ class Config:
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+    # Chunked (resumable) uploads: bytes per PUT chunk / Azure staged block, and session lifetime.
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE') or 4 * 1024 * 1024)
+    UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('UPLOAD_SESSION_TTL_HOURS') or 24)
+    # 'inline' uploads to Azure inside the request; 'queued' stages the file on local disk
+    # and a worker (`flask process-upload-jobs`) finishes it. The worker must share UPLOAD_STAGING_DIR.
+    UPLOAD_PROCESSING_MODE = (os.environ.get('UPLOAD_PROCESSING_MODE') or 'inline').strip().lower()
+    UPLOAD_STAGING_DIR = os.environ.get('UPLOAD_STAGING_DIR')  # default: <instance>/uploads/staging
+    UPLOAD_JOB_MAX_ATTEMPTS = int(os.environ.get('UPLOAD_JOB_MAX_ATTEMPTS') or 5)
+    UPLOAD_JOB_RETRY_SECONDS = int(os.environ.get('UPLOAD_JOB_RETRY_SECONDS') or 30)
+    UPLOAD_JOB_LEASE_SECONDS = int(os.environ.get('UPLOAD_JOB_LEASE_SECONDS') or 600)
+    # Batch uploads (/upload/batch): files per request and concurrent Azure transfers per process.
+    UPLOAD_BATCH_MAX_FILES = int(os.environ.get('UPLOAD_BATCH_MAX_FILES') or 20)
+    UPLOAD_BATCH_WORKERS = int(os.environ.get('UPLOAD_BATCH_WORKERS') or 4)
     
     # Security Configuration
     WTF_CSRF_ENABLED = True
@@ -90,6 +117,26 @@ class Config:
     # Rate limiting (Flask-Limiter)
     RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI') or 'memory://'
 
+    # Shared cache (org switcher context, RBAC permissions, ADLS summaries, org logos)
+    # - memory: per-worker (each gunicorn worker has its own cache)
+    # - file:   shared by all workers on the host (CACHE_DIR, defaults to instance/cache/shared)
+    # - redis:  shared across hosts (CACHE_REDIS_URL; requires the `redis` package)
+    CACHE_BACKEND = (os.environ.get('CACHE_BACKEND') or 'memory').strip().lower()
+    CACHE_DIR = os.environ.get('CACHE_DIR')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')
+    # The file backend sweeps expired entries every CACHE_FILE_SWEEP_SECONDS and keeps the
+    # directory under these caps by dropping the entries closest to expiry (0 disables a cap).
+    CACHE_FILE_MAX_ENTRIES = int(os.environ.get('CACHE_FILE_MAX_ENTRIES') or 50000)
+    CACHE_FILE_MAX_BYTES = int(os.environ.get('CACHE_FILE_MAX_BYTES') or 512 * 1024 * 1024)
+    CACHE_FILE_SWEEP_SECONDS = int(os.environ.get('CACHE_FILE_SWEEP_SECONDS') or 300)
+    # Per-namespace budgets for the memory backend (one LRU per namespace) and the file
+    # backend (enforced by its sweep); overrides are {namespace: (max_entries, max_bytes)}.
+    # The CACHE_DEFAULT_* budgets apply to namespaces without one in the memory backend only.
+    # Redis is bounded by TTLs and the server's maxmemory policy.
+    CACHE_DEFAULT_MAX_ENTRIES = int(os.environ.get('CACHE_DEFAULT_MAX_ENTRIES') or 1024)
+    CACHE_DEFAULT_MAX_BYTES = int(os.environ.get('CACHE_DEFAULT_MAX_BYTES') or 64 * 1024 * 1024)
+    CACHE_NAMESPACE_LIMITS: dict = {}
+
     # Feature flags
     # ML/ADLS summary is not shipped yet; keep disabled unless explicitly enabled.
     ML_SUMMARY_ENABLED = (os.environ.get('ML_SUMMARY_ENABLED') or '0').strip().lower() in {'1', 'true', 'yes', 'on'}
@@ -135,6 +182,9 @@ class ProductionConfig(Config):
 
     # In production, default to requiring email verification unless explicitly disabled.
     REQUIRE_EMAIL_VERIFICATION = (os.environ.get('REQUIRE_EMAIL_VERIFICATION') or 'true').strip().lower() in {'1', 'true', 'yes', 'on'}
+
+    # Production runs several gunicorn workers; share cache entries and invalidations between them.
+    CACHE_BACKEND = (os.environ.get('CACHE_BACKEND') or 'file').strip().lower()
     
     @classmethod
     def init_app(cls, app):
@@ -163,6 +213,9 @@ class TestingConfig(DevelopmentConfig):
     # Disable secure cookies in testing so they work with test client
     SESSION_COOKIE_SECURE = False
     REMEMBER_COOKIE_SECURE = False
+    # Keep caches per-process so tests never share state through disk/Redis.
+    CACHE_BACKEND = 'memory'
+    BLOB_DISK_CACHE_MAX_BYTES = 0
 
 config = {
     'development': DevelopmentConfig,
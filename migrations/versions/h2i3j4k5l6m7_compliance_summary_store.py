@@ -0,0 +1,82 @@
+"""compliance summary store
+
+Revision ID: h2i3j4k5l6m7
+Revises: g1h2j3k4l5m6
+Create Date: 2026-10-16
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'h2i3j4k5l6m7'
+down_revision = 'g1h2j3k4l5m6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'compliance_result_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=1024), nullable=False),
+        sa.Column('file_name', sa.String(length=255), nullable=False),
+        sa.Column('framework', sa.String(length=120), nullable=True),
+        sa.Column('source_version', sa.String(length=120), nullable=True),
+        sa.Column('last_modified', sa.DateTime(), nullable=True),
+        sa.Column('compliancy_rate', sa.Float(), nullable=False),
+        sa.Column('overall_status', sa.String(length=40), nullable=True),
+        sa.Column('total_requirements', sa.Integer(), nullable=False),
+        sa.Column('complete_count', sa.Integer(), nullable=False),
+        sa.Column('needs_review_count', sa.Integer(), nullable=False),
+        sa.Column('missing_count', sa.Integer(), nullable=False),
+        sa.Column('ingested_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('organization_id', 'user_id', 'file_path', name='uq_compliance_result_files_org_user_path'),
+    )
+    op.create_index(
+        'ix_compliance_result_files_org_user_modified',
+        'compliance_result_files',
+        ['organization_id', 'user_id', 'last_modified'],
+        unique=False,
+    )
+
+    op.create_table(
+        'compliance_framework_scores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('result_file_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('framework_name', sa.String(length=255), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=40), nullable=True),
+        sa.ForeignKeyConstraint(['result_file_id'], ['compliance_result_files.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_compliance_framework_scores_file_position',
+        'compliance_framework_scores',
+        ['result_file_id', 'position'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_compliance_framework_scores_org_framework',
+        'compliance_framework_scores',
+        ['organization_id', 'framework_name'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_compliance_framework_scores_org_framework', table_name='compliance_framework_scores')
+    op.drop_index('ix_compliance_framework_scores_file_position', table_name='compliance_framework_scores')
+    op.drop_table('compliance_framework_scores')
+    op.drop_index('ix_compliance_result_files_org_user_modified', table_name='compliance_result_files')
+    op.drop_table('compliance_result_files')
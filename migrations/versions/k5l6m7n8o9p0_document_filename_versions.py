@@ -0,0 +1,67 @@
+"""document filename version counters
+
+Revision ID: k5l6m7n8o9p0
+Revises: j4k5l6m7n8o9
+Create Date: 2026-10-16
+
+"""
+
+import os
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'k5l6m7n8o9p0'
+down_revision = 'j4k5l6m7n8o9'
+branch_labels = None
+depends_on = None
+
+
+_VERSIONED = re.compile(r'^(?P<name>.*) \((?P<version>\d+)\)$')
+
+
+def upgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index('ix_documents_org_filename', ['organization_id', 'filename'], unique=False)
+
+    counters = op.create_table(
+        'document_filename_versions',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('last_version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id', 'filename'),
+    )
+
+    # Seed counters from existing documents so the first upload after the migration
+    # does not have to probe past every existing "name (N).ext".
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        'SELECT DISTINCT organization_id, filename FROM documents '
+        'WHERE organization_id IS NOT NULL AND filename IS NOT NULL'
+    ))
+    latest = {}
+    for org_id, filename in rows:
+        latest.setdefault((int(org_id), filename), 0)
+        name, ext = os.path.splitext(filename)
+        match = _VERSIONED.match(name)
+        if match:
+            base = (int(org_id), match.group('name') + ext)
+            latest[base] = max(latest.get(base, 0), int(match.group('version')))
+
+    records = [
+        {'organization_id': org_id, 'filename': filename, 'last_version': version}
+        for (org_id, filename), version in latest.items()
+    ]
+    for start in range(0, len(records), 1000):
+        op.bulk_insert(counters, records[start:start + 1000])
+
+
+def downgrade():
+    op.drop_table('document_filename_versions')
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_org_filename')
@@ -0,0 +1,69 @@
+"""per-organization stats counters
+
+Revision ID: m7n8o9p0q1r2
+Revises: l6m7n8o9p0q1
+Create Date: 2026-10-16
+
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'm7n8o9p0q1r2'
+down_revision = 'l6m7n8o9p0q1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    stats = op.create_table(
+        'organization_stats',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('document_count', sa.Integer(), nullable=False),
+        sa.Column('document_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('member_count', sa.Integer(), nullable=False),
+        sa.Column('active_member_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id'),
+    )
+
+    # Seed one row per organization from the current documents and memberships.
+    bind = op.get_bind()
+    documents = {
+        int(org_id): (int(count or 0), int(size or 0))
+        for org_id, count, size in bind.execute(sa.text(
+            'SELECT organization_id, COUNT(*), SUM(COALESCE(file_size, 0)) FROM documents '
+            'WHERE organization_id IS NOT NULL AND is_active = :active GROUP BY organization_id'
+        ), {'active': True})
+    }
+    members = {
+        int(org_id): (int(total or 0), int(active or 0))
+        for org_id, total, active in bind.execute(sa.text(
+            'SELECT organization_id, COUNT(*), '
+            'SUM(CASE WHEN is_active = :active THEN 1 ELSE 0 END) '
+            'FROM organization_memberships GROUP BY organization_id'
+        ), {'active': True})
+    }
+    now = datetime.now(timezone.utc)
+    records = [
+        {
+            'organization_id': int(org_id),
+            'document_count': documents.get(int(org_id), (0, 0))[0],
+            'document_bytes': documents.get(int(org_id), (0, 0))[1],
+            'member_count': members.get(int(org_id), (0, 0))[0],
+            'active_member_count': members.get(int(org_id), (0, 0))[1],
+            'updated_at': now,
+        }
+        for (org_id,) in bind.execute(sa.text('SELECT id FROM organizations'))
+    ]
+    for start in range(0, len(records), 1000):
+        op.bulk_insert(stats, records[start:start + 1000])
+
+
+def downgrade():
+    op.drop_table('organization_stats')
@@ -0,0 +1,55 @@
+"""organization_id on login events
+
+Revision ID: n8o9p0q1r2s3
+Revises: m7n8o9p0q1r2
+Create Date: 2026-10-16
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'n8o9p0q1r2s3'
+down_revision = 'm7n8o9p0q1r2'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 10000
+
+
+def upgrade():
+    with op.batch_alter_table('login_events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('organization_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_login_events_organization_id', 'organizations', ['organization_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index('ix_login_events_org_created_at', ['organization_id', 'created_at'], unique=False)
+
+    # Backfill from each user's current organization, one primary-key range per committed
+    # statement, so no single transaction locks or rewrites the whole table.
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text('SELECT MIN(id), MAX(id) FROM login_events')).one()
+    if low is None:
+        return
+    with op.get_context().autocommit_block():
+        start = int(low)
+        while start <= int(high):
+            bind.execute(
+                sa.text(
+                    'UPDATE login_events SET organization_id = ('
+                    'SELECT users.organization_id FROM users WHERE users.id = login_events.user_id'
+                    ') WHERE id >= :start AND id < :stop AND user_id IS NOT NULL AND organization_id IS NULL'
+                ),
+                {'start': start, 'stop': start + BATCH_SIZE},
+            )
+            start += BATCH_SIZE
+
+
+def downgrade():
+    with op.batch_alter_table('login_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_login_events_org_created_at')
+        batch_op.drop_constraint('fk_login_events_organization_id', type_='foreignkey')
+        batch_op.drop_column('organization_id')
@@ -0,0 +1,129 @@
+"""login event daily rollups and monthly partitions
+
+Revision ID: o9p0q1r2s3t4
+Revises: n8o9p0q1r2s3
+Create Date: 2026-10-16
+
+"""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'o9p0q1r2s3t4'
+down_revision = 'n8o9p0q1r2s3'
+branch_labels = None
+depends_on = None
+
+
+_COLUMNS = 'id, user_id, email, provider, success, reason, ip_address, user_agent, created_at, organization_id'
+_INDEXES = (
+    ('ix_login_events_ip_created_at', 'ip_address, created_at'),
+    ('ix_login_events_user_id_created_at', 'user_id, created_at'),
+    ('ix_login_events_org_created_at', 'organization_id, created_at'),
+)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + (month.month // 12), month.month % 12 + 1, 1)
+
+
+def upgrade():
+    op.create_table(
+        'login_event_daily_rollups',
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('success_count', sa.Integer(), nullable=False),
+        sa.Column('failure_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id', 'day'),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # SQLite and others keep a plain table; retention uses batched deletes there.
+        return
+
+    # Rebuild login_events as a table range-partitioned by month on created_at, so expired
+    # months are dropped with DETACH/DROP PARTITION instead of row-by-row deletes.
+    for name, _columns in _INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    op.execute('ALTER TABLE login_events RENAME TO login_events_unpartitioned')
+    op.execute('ALTER TABLE login_events_unpartitioned RENAME CONSTRAINT login_events_pkey TO login_events_unpartitioned_pkey')
+    op.execute('ALTER TABLE login_events_unpartitioned DROP CONSTRAINT IF EXISTS fk_login_events_organization_id')
+    op.execute(
+        """
+        CREATE TABLE login_events (
+            id INTEGER NOT NULL DEFAULT nextval('login_events_id_seq'),
+            user_id INTEGER CONSTRAINT login_events_user_id_fkey REFERENCES users (id),
+            email VARCHAR(120),
+            provider VARCHAR(20) NOT NULL,
+            success BOOLEAN NOT NULL,
+            reason VARCHAR(80),
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(255),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            organization_id INTEGER,
+            CONSTRAINT login_events_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT fk_login_events_organization_id FOREIGN KEY (organization_id)
+                REFERENCES organizations (id) ON DELETE SET NULL
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute('CREATE TABLE login_events_default PARTITION OF login_events DEFAULT')
+
+    oldest = bind.execute(sa.text('SELECT MIN(created_at) FROM login_events_unpartitioned')).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = _next_month(_next_month(date(today.year, today.month, 1)))
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE login_events_p{month:%Y%m} PARTITION OF login_events "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    op.execute(f'INSERT INTO login_events ({_COLUMNS}) SELECT {_COLUMNS} FROM login_events_unpartitioned')
+    op.execute('ALTER SEQUENCE login_events_id_seq OWNED BY login_events.id')
+    op.execute('DROP TABLE login_events_unpartitioned')
+    for name, columns in _INDEXES:
+        op.execute(f'CREATE INDEX {name} ON login_events ({columns})')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for name, _columns in _INDEXES:
+            op.execute(f'DROP INDEX IF EXISTS {name}')
+        op.execute('ALTER TABLE login_events RENAME TO login_events_partitioned')
+        op.execute('ALTER TABLE login_events_partitioned RENAME CONSTRAINT login_events_pkey TO login_events_partitioned_pkey')
+        op.execute(
+            """
+            CREATE TABLE login_events (
+                id INTEGER NOT NULL DEFAULT nextval('login_events_id_seq'),
+                user_id INTEGER CONSTRAINT login_events_user_id_fkey REFERENCES users (id),
+                email VARCHAR(120),
+                provider VARCHAR(20) NOT NULL,
+                success BOOLEAN NOT NULL,
+                reason VARCHAR(80),
+                ip_address VARCHAR(45),
+                user_agent VARCHAR(255),
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                organization_id INTEGER,
+                CONSTRAINT login_events_pkey PRIMARY KEY (id),
+                CONSTRAINT fk_login_events_organization_id FOREIGN KEY (organization_id)
+                    REFERENCES organizations (id) ON DELETE SET NULL
+            )
+            """
+        )
+        op.execute(f'INSERT INTO login_events ({_COLUMNS}) SELECT {_COLUMNS} FROM login_events_partitioned')
+        op.execute('ALTER SEQUENCE login_events_id_seq OWNED BY login_events.id')
+        op.execute('DROP TABLE login_events_partitioned CASCADE')
+        for name, columns in _INDEXES:
+            op.execute(f'CREATE INDEX {name} ON login_events ({columns})')
+
+    op.drop_table('login_event_daily_rollups')
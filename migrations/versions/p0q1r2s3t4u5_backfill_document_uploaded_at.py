@@ -0,0 +1,30 @@
+"""backfill NULL documents.uploaded_at
+
+Revision ID: p0q1r2s3t4u5
+Revises: o9p0q1r2s3t4
+Create Date: 2026-10-16
+
+Rows written outside the ORM could have no upload time. The documents listing pages on
+(uploaded_at, id), which needs a timestamp on every row, so they are stamped with the
+time of the migration.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'p0q1r2s3t4u5'
+down_revision = 'o9p0q1r2s3t4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.text('UPDATE documents SET uploaded_at = CURRENT_TIMESTAMP WHERE uploaded_at IS NULL'))
+
+
+def downgrade():
+    # The original NULLs cannot be told apart from real timestamps; nothing to undo.
+    pass
@@ -0,0 +1,52 @@
+"""copy login events to every active membership
+
+Revision ID: q1r2s3t4u5v6
+Revises: p0q1r2s3t4u5
+Create Date: 2026-10-16
+
+Login events are now written once per organisation the user is an active member of.
+Existing events were backfilled to the user's current organisation only, so they are
+copied into the user's other active memberships, one primary-key range at a time.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'q1r2s3t4u5v6'
+down_revision = 'p0q1r2s3t4u5'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 10000
+
+
+def upgrade():
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text('SELECT MIN(id), MAX(id) FROM login_events')).one()
+    if low is None:
+        return
+    with op.get_context().autocommit_block():
+        start = int(low)
+        while start <= int(high):
+            bind.execute(
+                sa.text(
+                    'INSERT INTO login_events (user_id, email, provider, success, reason, ip_address, '
+                    'user_agent, organization_id, created_at) '
+                    'SELECT e.user_id, e.email, e.provider, e.success, e.reason, e.ip_address, '
+                    'e.user_agent, m.organization_id, e.created_at '
+                    'FROM login_events e JOIN organization_memberships m '
+                    'ON m.user_id = e.user_id AND m.is_active = :active AND m.organization_id <> e.organization_id '
+                    'WHERE e.id >= :start AND e.id < :stop AND e.organization_id IS NOT NULL'
+                ),
+                {'start': start, 'stop': start + BATCH_SIZE, 'active': True},
+            )
+            start += BATCH_SIZE
+
+
+def downgrade():
+    # The copies cannot be told apart from events written per membership; nothing to undo.
+    pass
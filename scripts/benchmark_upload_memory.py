@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory of one document upload in 'buffered' vs 'streaming' mode.
+
+Each mode runs in a fresh subprocess that uploads a temp file through
+AzureBlobStorageService with in-process fake storage clients (no network), and
+reports the peak RSS growth of that process plus the peak traced Python allocation.
+
+Usage:
+    python scripts/benchmark_upload_memory.py [--size-mb 16] [--block-size-mb 4]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class _DiscardingFileClient:
+    """ADLS file client stand-in: accepts the bytes handed to it and drops them."""
+
+    url = 'https://benchmark.invalid/container/file'
+
+    def upload_data(self, data, overwrite=True, metadata=None):
+        return None
+
+    def get_file_properties(self):
+        return SimpleNamespace(size=0, last_modified=None, etag='"bench"')
+
+
+class _DiscardingBlobClient:
+    """Blob client stand-in for the staged-block path."""
+
+    url = 'https://benchmark.invalid/container/blob'
+
+    def stage_block(self, block_id, data, length=None):
+        return None
+
+    def commit_block_list(self, block_list, **kwargs):
+        return {'etag': '"bench"', 'last_modified': None}
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _run_single(mode: str, path: str, block_size: int) -> dict:
+    os.environ.setdefault('FLASK_CONFIG', 'testing')
+    from app import create_app
+    from app.services.azure_storage import AzureBlobStorageService
+
+    app = create_app('testing')
+    app.config['AZURE_UPLOAD_MODE'] = mode
+    app.config['AZURE_UPLOAD_BLOCK_SIZE'] = block_size
+
+    with app.app_context():
+        service = AzureBlobStorageService()
+        service.connection_string = 'benchmark'
+        service.blob_service_client = SimpleNamespace(get_blob_client=lambda container, blob: _DiscardingBlobClient())
+        # Buffered mode goes through the ADLS upload_data(file_stream.read()) path.
+        file_client = _DiscardingFileClient()
+        service.datalake_service_client = SimpleNamespace(
+            get_file_system_client=lambda name: SimpleNamespace(get_file_client=lambda path: file_client)
+        )
+        service._container_checked = True
+
+        baseline_rss = _max_rss_bytes()
+        tracemalloc.start()
+        with open(path, 'rb') as stream:
+            result = service.upload_file(stream, 'benchmark/upload.bin', content_type='application/octet-stream')
+        _current, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'mode': mode,
+        'success': bool(result.get('success')),
+        'peak_rss_growth_mb': round((_max_rss_bytes() - baseline_rss) / (1024 * 1024), 2),
+        'peak_traced_mb': round(peak_traced / (1024 * 1024), 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=16)
+    parser.add_argument('--block-size-mb', type=int, default=4)
+    parser.add_argument('--single', choices=['buffered', 'streaming'], help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    block_size = args.block_size_mb * 1024 * 1024
+
+    if args.single:
+        print(json.dumps(_run_single(args.single, args.path, block_size)))
+        return 0
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.bin') as tmp:
+        chunk = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            tmp.write(chunk)
+        path = tmp.name
+
+    try:
+        print(f'Upload size: {args.size_mb} MB, block size: {args.block_size_mb} MB')
+        print(f"{'mode':<10} {'peak RSS growth':>16} {'peak traced':>12}")
+        for mode in ('buffered', 'streaming'):
+            out = subprocess.run(
+                [sys.executable, __file__, '--single', mode, '--path', path,
+                 '--block-size-mb', str(args.block_size_mb)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(f"{r['mode']:<10} {r['peak_rss_growth_mb']:>13.2f} MB {r['peak_traced_mb']:>9.2f} MB")
+    finally:
+        os.unlink(path)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,358 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture()
+def adls_service(app, monkeypatch):
+    """An AzureDataLakeService with no Azure clients and a fresh cache backend."""
+    from app.services.azure_data_service import AzureDataLakeService
+
+    monkeypatch.delenv("AZURE_STORAGE_CONNECTION_STRING", raising=False)
+    return AzureDataLakeService()
+
+
+def _seed_dashboard_cache(key, value, age_seconds):
+    from app.services.azure_data_service import _DASHBOARD_SUMMARY_CACHE_NAMESPACE
+    from app.services.cache_service import cache_service
+
+    cache_service.set(_DASHBOARD_SUMMARY_CACHE_NAMESPACE, key, (time.time() - age_seconds, value), ttl_seconds=3600)
+
+
+def test_stale_dashboard_summary_is_served_and_refreshed_once(adls_service, monkeypatch):
+    monkeypatch.setenv("AZURE_DASHBOARD_CACHE_SECONDS", "300")
+    monkeypatch.setenv("AZURE_DASHBOARD_STALE_MAX_SECONDS", "3600")
+
+    release = threading.Event()
+    calls = []
+
+    def fake_build(user_id=None, organization_id=None):
+        calls.append((user_id, organization_id))
+        release.wait(timeout=5)
+        fresh = {"total_files": 2, "connection_status": "fresh"}
+        _seed_dashboard_cache((user_id, organization_id), fresh, age_seconds=0)
+        return fresh
+
+    monkeypatch.setattr(adls_service, "_build_dashboard_summary", fake_build)
+    _seed_dashboard_cache((1, 10), {"total_files": 1, "connection_status": "stale"}, age_seconds=600)
+
+    # Concurrent stale reads return immediately and schedule a single refresh.
+    first = adls_service.get_dashboard_summary(user_id=1, organization_id=10)
+    second = adls_service.get_dashboard_summary(user_id=1, organization_id=10)
+    assert first["connection_status"] == "stale"
+    assert second["connection_status"] == "stale"
+
+    release.set()
+    deadline = time.time() + 5
+    while adls_service._refresh_in_flight and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert calls == [(1, 10)]
+    assert adls_service.get_dashboard_summary(user_id=1, organization_id=10)["connection_status"] == "fresh"
+
+
+def test_concurrent_list_calls_are_coalesced(adls_service, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_list(user_id=None, organization_id=None):
+        calls.append((user_id, organization_id))
+        started.set()
+        release.wait(timeout=5)
+        return [{"file_path": "a.csv"}]
+
+    monkeypatch.setattr(adls_service, "_get_compliance_files", slow_list)
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(adls_service.get_compliance_files(1, 10)))
+    leader.start()
+    assert started.wait(timeout=5)
+
+    followers = [
+        threading.Thread(target=lambda: results.append(adls_service.get_compliance_files(1, 10)))
+        for _ in range(3)
+    ]
+    for t in followers:
+        t.start()
+    deadline = time.time() + 5
+    while adls_service.coalescing_stats()["list"]["coalesced"] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in [leader] + followers:
+        t.join(timeout=5)
+
+    assert calls == [(1, 10)]
+    assert results == [[{"file_path": "a.csv"}]] * 4
+    stats = adls_service.coalescing_stats()["list"]
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 3
+    assert stats["in_flight"] == 0
+
+
+def test_dashboard_files_are_fetched_concurrently_and_merged_in_order(adls_service, monkeypatch):
+    from datetime import datetime
+
+    monkeypatch.setenv("AZURE_DASHBOARD_MAX_FILES", "4")
+    monkeypatch.setenv("AZURE_DASHBOARD_FETCH_WORKERS", "4")
+
+    files = [
+        {"file_name": f"result_{i}.csv", "file_path": f"p/result_{i}.csv", "last_modified": datetime(2026, 1, i + 1)}
+        for i in range(4)
+    ]
+    monkeypatch.setattr(adls_service, "get_compliance_files", lambda user_id=None, organization_id=None: files)
+
+    # Every fetch must be in flight at the same time for the barrier to release.
+    barrier = threading.Barrier(4, timeout=5)
+
+    def fake_summary(file_path, version=None):
+        barrier.wait()
+        n = int(file_path[-5])
+        return {
+            "file_name": file_path.rsplit("/", 1)[-1],
+            "compliancy_rate": float(n),
+            "overall_status": "Good",
+            "total_requirements": n + 1,
+            "complete_count": n,
+            "needs_review_count": 1,
+            "missing_count": 0,
+            "frameworks": [],
+        }
+
+    monkeypatch.setattr(adls_service, "get_file_analysis_summary", fake_summary)
+
+    result = adls_service._build_dashboard_summary(user_id=1, organization_id=10)
+
+    assert [f["file_name"] for f in result["file_summaries"]] == [
+        "result_3.csv", "result_2.csv", "result_1.csv", "result_0.csv",
+    ]
+    assert result["total_requirements"] == 10
+    assert result["total_complete"] == 6
+    assert result["total_needs_review"] == 4
+    assert result["avg_compliancy_rate"] == 1.5
+
+
+class _FakeDownload:
+    def __init__(self, content, etag, last_modified):
+        from types import SimpleNamespace
+
+        self._content = content
+        self.properties = SimpleNamespace(etag=etag, last_modified=last_modified)
+
+    def readall(self):
+        return self._content
+
+
+class _FakeBlobClient:
+    def __init__(self, store, calls):
+        self._store = store
+        self._calls = calls
+
+    def download_blob(self, timeout=None, etag=None, match_condition=None):
+        from azure.core.exceptions import ResourceNotModifiedError
+
+        self._calls.append(etag)
+        content, current_etag, last_modified = self._store["blob"]
+        if etag is not None and etag == current_etag:
+            raise ResourceNotModifiedError(message="Not Modified")
+        return _FakeDownload(content, current_etag, last_modified)
+
+
+def test_unchanged_result_files_are_not_downloaded_again(adls_service):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    modified = datetime(2026, 1, 1)
+    store = {"blob": (b"Framework,Compliance_Score,Status\nISO,80,Complete\n", '"v1"', modified)}
+    calls = []
+    blob_client = _FakeBlobClient(store, calls)
+    adls_service.blob_service_client = SimpleNamespace(get_blob_client=lambda container, blob: blob_client)
+
+    summary = adls_service.summarise_adls_file("p/result.csv")
+    assert summary["frameworks"] == [{"name": "ISO", "score": 80.0, "status": "Complete"}]
+    assert calls == [None]
+
+    # Listing version matches the cached etag: no request at all.
+    assert adls_service.summarise_adls_file("p/result.csv", version='"v1"') == summary
+    assert calls == [None]
+
+    # Unknown version: conditional request answered with 304, cached summary reused.
+    assert adls_service.summarise_adls_file("p/result.csv") == summary
+    assert calls == [None, '"v1"']
+
+    # The blob changed: the conditional request transfers and re-aggregates it.
+    store["blob"] = (b"Framework,Compliance_Score,Status\nISO,40,Missing\n", '"v2"', datetime(2026, 1, 2))
+    changed = adls_service.summarise_adls_file("p/result.csv", version='"v2"')
+    assert changed["missing_count"] == 1
+    assert changed["frameworks"] == [{"name": "ISO", "score": 40.0, "status": "Missing"}]
+    assert calls == [None, '"v1"', '"v1"']
+
+
+def test_vectorised_aggregation_matches_row_path(adls_service):
+    import random
+
+    rng = random.Random(7)
+    statuses = ["Complete", "Needs Review", "missing", "Unknown", "COMPLETE"]
+    rows = [
+        {"Framework": f"FW-{i % 37}", "Compliance_Score": round(rng.uniform(0, 10), 3), "Status": rng.choice(statuses)}
+        for i in range(20000)
+    ]
+    rows.insert(5000, {"Framework": "Overall", "Compliance_Score": 7.456, "Status": "Good"})
+    rows.append({"Framework": "overall", "Compliance_Score": 1.0, "Status": "Ignored"})
+
+    vectorised = adls_service._process_adls_data_vectorised(rows)
+    assert vectorised is not None
+    assert vectorised == adls_service._process_adls_data_rows(rows)
+    assert adls_service.process_adls_data(rows) == vectorised
+    assert vectorised["compliancy_rate"] == 7.46
+    # Streamed in batches, the "Overall" row lands in a later batch than the first one.
+    assert adls_service.summarise_adls_rows(iter(rows)) == vectorised
+
+    # No overall row, integer scores.
+    no_overall = [{"Framework": "A", "Compliance_Score": 3, "Status": "Complete"}] * 300
+    assert adls_service._process_adls_data_vectorised(no_overall) == adls_service._process_adls_data_rows(no_overall)
+
+    # Rows the row-wise path treats specially fall back to it.
+    irregular = no_overall + [{"Framework": "B", "Status": "Missing"}]
+    assert adls_service._process_adls_data_vectorised(irregular) is None
+    assert adls_service.process_adls_data(irregular) == adls_service._process_adls_data_rows(irregular)
+
+
+def test_csv_results_are_streamed_chunk_by_chunk(adls_service):
+    from types import SimpleNamespace
+
+    body = 'Framework,Compliance_Score,Status\n"Privacy\nAct",7.5,Complete\nNDIS – Core,3,Missing\n'.encode("utf-8")
+    # Small chunks split the quoted newline and the multi-byte dash across boundaries.
+    chunks = [body[i:i + 5] for i in range(0, len(body), 5)]
+
+    class ChunkedDownload:
+        properties = SimpleNamespace(etag='"c1"', last_modified=None)
+
+        def chunks(self):
+            return iter(chunks)
+
+        def readall(self):
+            raise AssertionError("CSV results must not be read whole")
+
+    adls_service.blob_service_client = SimpleNamespace(
+        get_blob_client=lambda container, blob: SimpleNamespace(download_blob=lambda **kwargs: ChunkedDownload())
+    )
+
+    assert adls_service.read_adls_file("p/big.csv") == [
+        {"Framework": "Privacy\nAct", "Compliance_Score": 7.5, "Status": "Complete"},
+        {"Framework": "NDIS – Core", "Compliance_Score": 3.0, "Status": "Missing"},
+    ]
+    summary = adls_service.summarise_adls_file("p/big.csv")
+    assert (summary["complete_count"], summary["missing_count"]) == (1, 1)
+
+
+def test_org_listing_index_is_shared_by_users_and_spans_months(adls_service, monkeypatch):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    monkeypatch.setenv("AZURE_ADLS_INDEX_MONTHS", "2")
+    monkeypatch.setenv("AZURE_ADLS_INDEX_SETTLE_SECONDS", "0")
+
+    now = datetime.now()
+    prev_year, prev_month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+    root = adls_service.results_path
+    names = [
+        f"{root}/{now.year}/{now.month:02d}/org_10/user_1/a.csv",
+        f"{root}/{now.year}/{now.month:02d}/org_10/user_2/b.csv",
+        f"{root}/{prev_year}/{prev_month:02d}/organizations/10/user_3/c.csv",
+        f"{root}/{now.year}/{now.month:02d}/org_11/user_1/other_org.csv",
+    ]
+    list_calls = []
+
+    def get_paths(path, timeout=None):
+        list_calls.append(path)
+        return [
+            SimpleNamespace(name=n, is_directory=False, last_modified=now, etag='"e"', content_length=1)
+            for n in names
+            if n.startswith(path + "/")
+        ]
+
+    fs_client = SimpleNamespace(get_paths=get_paths)
+    adls_service.service_client = SimpleNamespace(get_file_system_client=lambda container: fs_client)
+
+    found = {user: adls_service.get_compliance_files(user, 10) for user in (1, 2, 3)}
+    assert [f["file_name"] for f in found[1]] == ["a.csv"]
+    assert [f["file_name"] for f in found[2]] == ["b.csv"]
+    assert [f["file_name"] for f in found[3]] == ["c.csv"]
+    # Two org-scoped prefixes for each of two months, regardless of the number of users.
+    assert len(list_calls) == 4
+
+    # Once the per-user list cache expires only the current month is listed again;
+    # the settled previous month is served from the index.
+    monkeypatch.setenv("AZURE_ADLS_LIST_CACHE_SECONDS", "0")
+    list_calls.clear()
+    adls_service.get_compliance_files(1, 10)
+    assert sorted(list_calls) == [
+        f"{root}/{now.year}/{now.month:02d}/org_10",
+        f"{root}/{now.year}/{now.month:02d}/organizations/10",
+    ]
+
+
+def test_blob_fallback_index_keeps_entries_on_failure_and_never_settles_capped_listings(adls_service, monkeypatch):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    from app.services.azure_data_service import _ORG_LISTING_INDEX_NAMESPACE
+    from app.services.cache_service import cache_service
+
+    monkeypatch.setenv("AZURE_ADLS_INDEX_MONTHS", "2")
+    monkeypatch.setenv("AZURE_ADLS_INDEX_SETTLE_SECONDS", "0")
+    monkeypatch.setenv("AZURE_ADLS_LIST_CACHE_SECONDS", "0")
+    monkeypatch.setenv("AZURE_ADLS_LIST_MAX_BLOBS", "1")
+
+    now = datetime.now()
+    prev_year, prev_month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+    root = adls_service.results_path
+    names = [
+        f"{root}/{prev_year}/{prev_month:02d}/org_10/user_1/a.csv",
+        f"{root}/{prev_year}/{prev_month:02d}/org_10/user_1/b.csv",
+    ]
+    fail = []
+
+    def list_blobs(name_starts_with, timeout=None):
+        if fail:
+            raise RuntimeError("blob endpoint down")
+        return [SimpleNamespace(name=n, last_modified=now, etag='"e"', size=1) for n in names if n.startswith(name_starts_with)]
+
+    container = SimpleNamespace(list_blobs=list_blobs)
+    adls_service.blob_service_client = SimpleNamespace(get_container_client=lambda name: container)
+
+    files = adls_service._refresh_org_listing_index(10, None, timeout_seconds=5)
+    assert [f["file_name"] for f in files] == ["a.csv"]
+    index = cache_service.get(_ORG_LISTING_INDEX_NAMESPACE, 10)
+    # The past month's listing hit the cap, so it is listed again instead of settling.
+    assert index[f"{prev_year}/{prev_month:02d}"]["settled"] is False
+
+    # A failed re-listing keeps the previous entries rather than replacing them with nothing.
+    fail.append(True)
+    files = adls_service._refresh_org_listing_index(10, None, timeout_seconds=5)
+    assert [f["file_name"] for f in files] == ["a.csv"]
+    assert cache_service.get(_ORG_LISTING_INDEX_NAMESPACE, 10) == index
+
+
+def test_blob_fallback_index_caps_each_user_separately(adls_service, monkeypatch):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    monkeypatch.setenv("AZURE_ADLS_INDEX_MONTHS", "1")
+    monkeypatch.setenv("AZURE_ADLS_LIST_MAX_BLOBS", "2")
+
+    now = datetime.now()
+    prefix = f"{adls_service.results_path}/{now.year}/{now.month:02d}/org_10"
+    # The busy user's files come first in the listing and exceed the cap on their own.
+    names = [f"{prefix}/user_1/{i}.csv" for i in range(5)] + [f"{prefix}/user_2/mine.csv"]
+
+    def list_blobs(name_starts_with, timeout=None):
+        return [SimpleNamespace(name=n, last_modified=now, etag='"e"', size=1) for n in names if n.startswith(name_starts_with)]
+
+    container = SimpleNamespace(list_blobs=list_blobs)
+    adls_service.blob_service_client = SimpleNamespace(get_container_client=lambda name: container)
+
+    assert [f["file_name"] for f in adls_service.get_compliance_files(2, 10)] == ["mine.csv"]
+    assert [f["file_name"] for f in adls_service.get_compliance_files(1, 10)] == ["0.csv", "1.csv"]
@@ -0,0 +1,306 @@
+import io
+from types import SimpleNamespace
+
+
+class _RecordingBlobClient:
+    url = "https://example.blob.core.windows.net/docs/a.pdf"
+
+    def __init__(self):
+        self.staged = []
+        self.committed = None
+        self.commit_kwargs = None
+
+    def stage_block(self, block_id, data, length=None):
+        self.staged.append((block_id, bytes(data)))
+
+    def commit_block_list(self, block_list, **kwargs):
+        self.committed = list(block_list)
+        self.commit_kwargs = kwargs
+        return {"etag": '"0x1"', "last_modified": None}
+
+
+def _service_with(app, blob_client):
+    from app.services.azure_storage import AzureBlobStorageService
+
+    with app.app_context():
+        service = AzureBlobStorageService()
+    service.connection_string = "UseDevelopmentStorage=true"
+    service.blob_service_client = SimpleNamespace(get_blob_client=lambda container, blob: blob_client)
+    service.datalake_service_client = None
+    service._container_checked = True
+    return service
+
+
+class _NoWholeReadStream(io.BytesIO):
+    def read(self, size=-1):
+        assert size is not None and size > 0, "stream must not be read whole"
+        return super().read(size)
+
+
+def test_streaming_upload_stages_fixed_size_blocks(app):
+    app.config["AZURE_UPLOAD_MODE"] = "streaming"
+    app.config["AZURE_UPLOAD_BLOCK_SIZE"] = 64 * 1024
+    payload = bytes(range(256)) * 1024  # 256 KiB + 1 partial block below
+    payload += b"tail"
+
+    blob_client = _RecordingBlobClient()
+    service = _service_with(app, blob_client)
+
+    with app.app_context():
+        result = service.upload_file(
+            _NoWholeReadStream(payload), "docs/a.pdf", content_type="application/pdf", metadata={"k": "v"}
+        )
+
+    assert result["success"] is True
+    assert result["size"] == len(payload)
+    assert result["etag"] == '"0x1"'
+    assert result["blocks"] == 5
+    assert [len(data) for _, data in blob_client.staged] == [65536] * 4 + [4]
+    assert b"".join(data for _, data in blob_client.staged) == payload
+    assert blob_client.committed == [block_id for block_id, _ in blob_client.staged]
+    assert blob_client.commit_kwargs["metadata"] == {"k": "v"}
+    assert blob_client.commit_kwargs["content_settings"].content_type == "application/pdf"
+
+
+def test_buffered_upload_falls_back_to_blob_with_the_bytes_already_read(app):
+    from app.services.file_validation import FileValidationService
+
+    app.config["AZURE_UPLOAD_MODE"] = "buffered"
+    payload = b"%PDF-1.4\n" + b"x" * 4096
+    uploaded = {}
+
+    class FailingFileClient:
+        def upload_data(self, data, overwrite=True, metadata=None):
+            raise RuntimeError("ADLS endpoint unsupported")
+
+    class BlobClient:
+        url = "https://example.blob.core.windows.net/docs/a.pdf"
+
+        def upload_blob(self, data, overwrite=True, **kwargs):
+            uploaded["data"] = data if isinstance(data, bytes) else data.read()
+
+        def get_blob_properties(self):
+            return SimpleNamespace(size=len(uploaded["data"]), last_modified=None, etag='"0x2"')
+
+    service = _service_with(app, BlobClient())
+    service.datalake_service_client = SimpleNamespace(
+        get_file_system_client=lambda name: SimpleNamespace(get_file_client=lambda path: FailingFileClient())
+    )
+
+    with app.app_context():
+        result = FileValidationService.validate_and_upload(
+            io.BytesIO(payload),
+            "a.pdf",
+            lambda stream, content_type: service.upload_file(stream, "docs/a.pdf", content_type=content_type),
+        )
+
+    assert result["success"] is True
+    assert result["upload"]["storage_type"] == "Blob_Storage"
+    assert uploaded["data"] == payload
+    assert result["file_size"] == len(payload)
+
+
+class _RangeDownloader:
+    def __init__(self, data, offset, length, etag, chunk_size):
+        from datetime import datetime, timezone
+
+        offset = offset or 0
+        end = len(data) if length is None else min(len(data), offset + length)
+        self._body = data[offset:end]
+        self._chunk_size = chunk_size
+        self.size = len(self._body)
+        self.properties = SimpleNamespace(
+            etag=etag,
+            last_modified=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            content_settings=SimpleNamespace(content_type="application/pdf"),
+            content_range=f"bytes {offset}-{end - 1}/{len(data)}",
+            size=self.size,
+        )
+
+    def chunks(self):
+        for i in range(0, self.size, self._chunk_size):
+            yield self._body[i:i + self._chunk_size]
+
+    def readall(self):
+        raise AssertionError("downloads must be streamed")
+
+
+class _RangeBlobClient:
+    def __init__(self, data, etag):
+        self.data = data
+        self.etag = etag
+        self.calls = []
+
+    def download_blob(self, offset=None, length=None, etag=None, match_condition=None):
+        from azure.core.exceptions import HttpResponseError, ResourceNotModifiedError
+
+        self.calls.append((offset, length, etag))
+        if etag is not None and etag == self.etag:
+            raise ResourceNotModifiedError(message="Not Modified")
+        if offset is not None and offset >= len(self.data):
+            error = HttpResponseError(message="InvalidRange")
+            error.status_code = 416
+            raise error
+        return _RangeDownloader(self.data, offset, length, self.etag, chunk_size=1000)
+
+    def get_blob_properties(self):
+        raise AssertionError("properties come with the download response")
+
+
+def test_document_download_streams_with_range_and_etag(client, app, db_session, seed_org_user, monkeypatch):
+    from types import SimpleNamespace
+
+    from tests.conftest import login
+    from app.models import Document
+    import app.services.azure_storage as azure_storage
+
+    org_id, user_id, _membership_id = seed_org_user
+    with app.app_context():
+        doc = Document(
+            filename="évidence.pdf", blob_name="org/evidence.pdf", content_type="application/pdf",
+            organization_id=org_id, uploaded_by=user_id, is_active=True,
+        )
+        db_session.session.add(doc)
+        db_session.session.commit()
+        doc_id = doc.id
+
+    data = bytes(range(256)) * 20  # 5120 bytes, several 1000-byte chunks
+    blob_client = _RangeBlobClient(data, '"0xABC"')
+    service = _service_with(app, blob_client)
+    monkeypatch.setattr(azure_storage, "AzureBlobStorageService", lambda: service)
+    login(client)
+    url = f"/document/{doc_id}/download"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.data == data
+    assert full.headers["Content-Length"] == str(len(data))
+    assert full.headers["ETag"] == '"0xABC"'
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert "filename*=UTF-8''%C3%A9vidence.pdf" in full.headers["Content-Disposition"]
+
+    # Resuming an interrupted download.
+    part = client.get(url, headers={"Range": "bytes=1000-2499", "If-Range": '"0xABC"'})
+    assert part.status_code == 206
+    assert part.data == data[1000:2500]
+    assert part.headers["Content-Range"] == f"bytes 1000-2499/{len(data)}"
+    assert blob_client.calls[-1] == (1000, 1500, None)
+
+    # The blob changed since the partial copy was taken: the whole file is sent.
+    stale = client.get(url, headers={"Range": "bytes=1000-", "If-Range": '"0xOLD"'})
+    assert stale.status_code == 200 and stale.data == data
+
+    not_modified = client.get(url, headers={"If-None-Match": '"0xABC"'})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == '"0xABC"'
+
+    # Only an unsatisfiable range needs the properties request, for the total size.
+    blob_client.get_blob_properties = lambda: SimpleNamespace(
+        etag=blob_client.etag, size=len(data), last_modified=None,
+        content_settings=SimpleNamespace(content_type="application/pdf"),
+    )
+    unsatisfiable = client.get(url, headers={"Range": "bytes=999999-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(data)}"
+
+
+def test_redirect_mode_sends_short_lived_sas_urls(client, app, db_session, seed_org_user, monkeypatch):
+    from urllib.parse import parse_qs, urlparse
+
+    from azure.storage.blob import BlobServiceClient
+
+    from tests.conftest import login
+    from app.models import Document, Organization
+    import app.services.azure_storage as azure_storage
+    from app.services.azure_storage_service import azure_storage_service
+
+    org_id, user_id, _membership_id = seed_org_user
+    with app.app_context():
+        doc = Document(
+            filename="report.pdf", blob_name="org/report.pdf", content_type="application/pdf",
+            organization_id=org_id, uploaded_by=user_id, is_active=True,
+        )
+        db_session.session.add(doc)
+        org = db_session.session.get(Organization, org_id)
+        org.logo_blob_name = "branding/logo.png"
+        db_session.session.commit()
+        doc_id = doc.id
+
+    # Signing is local (account key), so a real client works without network access.
+    blob_service = BlobServiceClient.from_connection_string(
+        "DefaultEndpointsProtocol=https;AccountName=acct;AccountKey=a2V5;EndpointSuffix=core.windows.net"
+    )
+    blob_client = _RangeBlobClient(b"unused", '"0x1"')
+    service = _service_with(app, blob_client)
+    service.blob_service_client = blob_service
+    monkeypatch.setattr(azure_storage, "AzureBlobStorageService", lambda: service)
+    monkeypatch.setattr(azure_storage_service, "blob_service_client", blob_service)
+    app.config.update(DOWNLOAD_DELIVERY_MODE="redirect", DOWNLOAD_SAS_TTL_SECONDS=120)
+    login(client)
+
+    resp = client.get(f"/document/{doc_id}/download")
+    assert resp.status_code == 302
+    assert resp.headers["Cache-Control"] == "no-store"
+    location = urlparse(resp.headers["Location"])
+    assert location.netloc == "acct.blob.core.windows.net"
+    assert location.path.endswith("/org/report.pdf")
+    sas = parse_qs(location.query)
+    assert sas["sp"] == ["r"]
+    assert sas["rscd"] == ['attachment; filename=report.pdf']
+    assert "se" in sas and "sig" in sas
+
+    logo = client.get("/organization/logo")
+    assert logo.status_code == 302
+    assert urlparse(logo.headers["Location"]).path.endswith(f"/org_{org_id}/branding/logo.png")
+    assert logo.headers["Cache-Control"] == "private, max-age=60"
+
+    # Bytes never went through the app.
+    assert blob_client.calls == []
+
+
+def test_repeat_downloads_are_served_from_the_blob_disk_cache(client, app, db_session, seed_org_user, monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    from tests.conftest import login
+    from app.models import Document
+    import app.services.azure_storage as azure_storage
+
+    org_id, user_id, _membership_id = seed_org_user
+    with app.app_context():
+        doc = Document(
+            filename="audit.pdf", blob_name="org/audit.pdf", content_type="application/pdf",
+            organization_id=org_id, uploaded_by=user_id, is_active=True,
+        )
+        db_session.session.add(doc)
+        db_session.session.commit()
+        doc_id = doc.id
+
+    data = bytes(range(256)) * 12  # 3072 bytes
+    blob_client = _RangeBlobClient(data, '"0xA"')
+    service = _service_with(app, blob_client)
+    monkeypatch.setattr(azure_storage, "AzureBlobStorageService", lambda: service)
+    cache_dir = tmp_path / "blobs"
+    app.config.update(BLOB_DISK_CACHE_DIR=str(cache_dir), BLOB_DISK_CACHE_MAX_BYTES=5000)
+    login(client)
+    url = f"/document/{doc_id}/download"
+
+    assert client.get(url).data == data
+    assert len(blob_client.calls) == 1
+    assert len(list(cache_dir.glob("*/*.blob"))) == 1
+
+    # Served from disk, including ranges; Azure only answers a conditional request with 304.
+    again = client.get(url)
+    assert again.status_code == 200 and again.data == data
+    assert again.headers["ETag"] == '"0xA"'
+    part = client.get(url, headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206 and part.data == data[100:200]
+    assert blob_client.calls[1:] == [(None, None, '"0xA"'), (100, 100, '"0xA"')]
+
+    # A new blob version comes back from the same conditional request and is cached under
+    # its own key; the old entry is evicted by size.
+    blob_client.data = bytes(reversed(data))
+    blob_client.etag = '"0xB"'
+    assert client.get(url).data == blob_client.data
+    assert len(blob_client.calls) == 4
+    entries = list(cache_dir.glob("*/*.blob"))
+    assert len(entries) == 1 and entries[0].read_bytes() == blob_client.data
@@ -0,0 +1,133 @@
+import time
+
+from app.services.cache_service import CacheService, FileCacheBackend, LRUCache, MemoryCacheBackend
+
+
+def test_memory_backend_roundtrip_and_expiry():
+    backend = MemoryCacheBackend()
+    backend.set("k", {"a": 1}, ttl_seconds=60)
+    assert backend.get("k") == {"a": 1}
+
+    backend.delete("k")
+    assert backend.get("k") is None
+
+    # Force an already-expired entry.
+    backend._cache_for("old")._data["old"] = (time.monotonic() - 1, "stale", 0)
+    assert backend.get("old") is None
+
+
+def test_lru_evicts_least_recently_used_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=0)
+    cache.set("a", "1", ttl_seconds=60)
+    cache.set("b", "2", ttl_seconds=60)
+    assert cache.get("a") == "1"  # "a" is now most recently used
+    cache.set("c", "3", ttl_seconds=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.evictions == 1
+
+    sized = LRUCache(max_entries=0, max_bytes=10)
+    sized.set("x", b"123456", ttl_seconds=60)
+    sized.set("y", b"123456", ttl_seconds=60)
+    assert sized.get("x") is None
+    assert sized.current_bytes == 6
+
+    # Values larger than the whole budget are never stored.
+    sized.set("huge", b"0" * 11, ttl_seconds=60)
+    assert sized.get("huge") is None
+
+    stats = sized.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 0
+    assert stats["misses"] == 2
+
+
+def test_memory_backend_keeps_namespaces_isolated():
+    backend = MemoryCacheBackend(limits={"small": (1, 0)})
+    backend.set("big:1", "keep", ttl_seconds=60)
+    backend.set("small:1", "a", ttl_seconds=60)
+    backend.set("small:2", "b", ttl_seconds=60)
+    assert backend.get("small:1") is None
+    assert backend.get("big:1") == "keep"
+    assert backend.stats()["small"]["evictions"] == 1
+
+
+def test_file_backend_is_shared_between_instances(tmp_path):
+    writer = FileCacheBackend(str(tmp_path))
+    reader = FileCacheBackend(str(tmp_path))
+
+    writer.set("org_logo:1:logo.png", (b"\x89PNG", "image/png"), ttl_seconds=60)
+    assert reader.get("org_logo:1:logo.png") == (b"\x89PNG", "image/png")
+
+    # Invalidation from one "worker" is visible to the other.
+    reader.delete("org_logo:1:logo.png")
+    assert writer.get("org_logo:1:logo.png") is None
+
+
+def test_file_backend_sweeps_expired_entries_and_enforces_caps(tmp_path):
+    import os
+
+    backend = FileCacheBackend(str(tmp_path), max_entries=2, sweep_interval=3600)
+    backend.set("org_switcher_gen:1", "old", ttl_seconds=60)
+    # Expire it on disk, as if its TTL had passed long ago.
+    expired = backend._path("org_switcher_gen:1")
+    os.utime(expired, (time.time() - 10, time.time() - 10))
+
+    backend.set("a", "1", ttl_seconds=60)
+    backend.set("b", "2", ttl_seconds=600)
+    backend.set("c", "3", ttl_seconds=6000)
+    assert backend.sweep() == 2
+    assert not os.path.exists(expired)
+    # Over the entry cap, the entry closest to expiry goes first.
+    assert backend.get("a") is None
+    assert backend.get("b") == "2"
+    assert backend.get("c") == "3"
+
+
+def test_file_backend_enforces_namespace_budgets(tmp_path):
+    backend = FileCacheBackend(str(tmp_path), limits={"small": (1, 0)}, sweep_interval=3600)
+    backend.set("big:1", "keep", ttl_seconds=60)
+    backend.set("small:1", "a", ttl_seconds=60)
+    backend.set("small:2", "b", ttl_seconds=600)
+    assert backend.sweep() == 1
+    assert backend.get("small:1") is None
+    assert backend.get("small:2") == "b"
+    assert backend.get("big:1") == "keep"
+
+
+def test_cache_service_uses_configured_backend(app, tmp_path):
+    service = CacheService()
+    app.config["CACHE_BACKEND"] = "file"
+    app.config["CACHE_DIR"] = str(tmp_path / "shared")
+    service.init_app(app)
+    assert service.backend.name == "file"
+
+    service.set("ns", (1, None), "value", ttl_seconds=30)
+    assert service.get("ns", (1, None)) == "value"
+    assert service.get("ns", (2, None)) is None
+    assert service.stats()["ns"] == {"hits": 1, "misses": 1, "sets": 1}
+
+    # Unknown / unavailable backends fall back to memory instead of failing startup.
+    app.config["CACHE_BACKEND"] = "redis"
+    app.config["CACHE_REDIS_URL"] = None
+    service.init_app(app)
+    assert service.backend.name == "memory"
+
+
+def test_org_switcher_invalidation_bumps_generation(app):
+    from app import _org_switcher_generation, invalidate_org_switcher_context_cache
+
+    with app.app_context():
+        before = _org_switcher_generation(42)
+        assert _org_switcher_generation(42) == before
+        invalidate_org_switcher_context_cache(42, 7)
+        after = _org_switcher_generation(42)
+
+        # An evicted generation is replaced by a fresh one, never by a reused constant.
+        from app.services.cache_service import cache_service
+
+        cache_service.delete("org_switcher_gen", 42)
+        reseeded = _org_switcher_generation(42)
+
+    assert before != after
+    assert reseeded not in {before, after, "0"}
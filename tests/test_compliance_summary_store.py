@@ -0,0 +1,155 @@
+from datetime import datetime, timezone
+
+
+def _fake_adls(monkeypatch, files, frameworks_by_path):
+    from app.services.azure_data_service import azure_data_service
+
+    fetched = []
+
+    def fake_files(user_id=None, organization_id=None):
+        return files
+
+    def fake_summary(file_path, version=None):
+        fetched.append(file_path)
+        frameworks = frameworks_by_path[file_path]
+        return {
+            "file_name": file_path.rsplit("/", 1)[-1],
+            "compliancy_rate": 7.5,
+            "overall_status": "Good",
+            "total_requirements": len(frameworks),
+            "complete_count": sum(1 for f in frameworks if f["status"] == "Complete"),
+            "needs_review_count": 0,
+            "missing_count": sum(1 for f in frameworks if f["status"] == "Missing"),
+            "frameworks": frameworks,
+        }
+
+    monkeypatch.setattr(azure_data_service, "get_compliance_files", fake_files)
+    monkeypatch.setattr(azure_data_service, "get_file_analysis_summary", fake_summary)
+    return azure_data_service, fetched
+
+
+def test_ingested_summary_matches_live_adls_summary(app, seed_org_user, monkeypatch):
+    from app.models import ComplianceFrameworkScore, ComplianceResultFile
+    from app.services.compliance_summary_store import (
+        get_stored_dashboard_summary,
+        ingest_all_compliance_results,
+    )
+
+    org_id, user_id, _ = seed_org_user
+    files = [
+        {"file_name": "a.csv", "file_path": "r/a.csv", "etag": '"a1"', "framework": "Multiple Frameworks",
+         "last_modified": datetime(2026, 3, 1, tzinfo=timezone.utc)},
+        {"file_name": "b.csv", "file_path": "r/b.csv", "etag": '"b1"', "framework": "Multiple Frameworks",
+         "last_modified": datetime(2026, 3, 2, tzinfo=timezone.utc)},
+    ]
+    frameworks = {
+        "r/a.csv": [{"name": "ISO 27001", "score": 8.0, "status": "Complete"},
+                    {"name": "SOC 2", "score": 2.5, "status": "Missing"}],
+        "r/b.csv": [{"name": "NDIS", "score": 6.0, "status": "Complete"}],
+    }
+    service, fetched = _fake_adls(monkeypatch, files, frameworks)
+
+    with app.app_context():
+        assert get_stored_dashboard_summary(user_id, org_id) is None
+
+        [outcome] = ingest_all_compliance_results()
+        assert outcome["success"] and outcome["ingested"] == 2
+        assert ComplianceResultFile.query.count() == 2
+        assert ComplianceFrameworkScore.query.count() == 3
+
+        stored = get_stored_dashboard_summary(user_id, org_id)
+        live = service._build_dashboard_summary(user_id=user_id, organization_id=org_id)
+        assert stored.pop("source") == "database"
+        assert stored == live
+
+        # Unchanged files are not fetched again; removed files are dropped.
+        fetched.clear()
+        files.pop(0)
+        [outcome] = ingest_all_compliance_results(organization_id=org_id)
+        assert fetched == []
+        assert (outcome["unchanged"], outcome["removed"]) == (1, 1)
+        assert ComplianceFrameworkScore.query.count() == 1
+
+
+def test_gap_analysis_reads_stored_summary(app, client, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.services.compliance_summary_store import ingest_compliance_results
+
+    org_id, user_id, _ = seed_org_user
+    files = [{"file_name": "compliance_summary.csv", "file_path": "r/compliance_summary.csv", "etag": '"s1"',
+              "framework": "Compliance Summary", "last_modified": datetime(2026, 3, 1, tzinfo=timezone.utc)}]
+    service, _ = _fake_adls(monkeypatch, files, {"r/compliance_summary.csv": [
+        {"name": "ISO 27001", "score": 8.0, "status": "Complete"},
+    ]})
+
+    with app.app_context():
+        assert ingest_compliance_results(user_id, org_id)["ingested"] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dashboard summary should come from the database")
+
+    monkeypatch.setattr(service, "get_dashboard_summary", fail)
+    login(client)
+    resp = client.get("/gap-analysis")
+    assert resp.status_code == 200
+    assert b"ISO 27001" in resp.data
+
+
+def test_failed_stored_summary_read_rolls_back_and_falls_back_to_adls(app, seed_org_user, monkeypatch):
+    from sqlalchemy import text
+
+    from app import db
+    from app.models import Organization
+    from app.services import compliance_summary_store
+
+    org_id, user_id, _ = seed_org_user
+    service, _ = _fake_adls(monkeypatch, [], {})
+
+    def broken_read(user_id, organization_id):
+        db.session.execute(text("SELECT * FROM no_such_table"))
+
+    monkeypatch.setattr(compliance_summary_store, "get_stored_dashboard_summary", broken_read)
+    monkeypatch.setattr(service, "get_dashboard_summary", lambda user_id=None, organization_id=None: {"source": "adls"})
+
+    with app.app_context():
+        rollbacks = []
+        real_rollback = db.session.rollback
+        monkeypatch.setattr(db.session, "rollback", lambda: (rollbacks.append(True), real_rollback()))
+        assert compliance_summary_store.get_compliance_summary(user_id, org_id) == {"source": "adls"}
+        assert rollbacks
+        # The session is usable for the rest of the request.
+        assert db.session.get(Organization, org_id) is not None
+
+
+def test_empty_result_files_are_versioned_and_unreadable_ones_retried(app, seed_org_user, monkeypatch):
+    from app.models import ComplianceResultFile
+    from app.services.azure_data_service import azure_data_service
+    from app.services.compliance_summary_store import ingest_compliance_results
+
+    org_id, user_id, _ = seed_org_user
+    files = [
+        {"file_name": "empty.csv", "file_path": "r/empty.csv", "etag": '"e1"', "framework": "Multiple Frameworks",
+         "last_modified": datetime(2026, 3, 1, tzinfo=timezone.utc)},
+        {"file_name": "broken.csv", "file_path": "r/broken.csv", "etag": '"x1"', "framework": "Multiple Frameworks",
+         "last_modified": datetime(2026, 3, 1, tzinfo=timezone.utc)},
+    ]
+    fetched = []
+
+    def fake_summarise(file_path, version=None):
+        fetched.append(file_path)
+        return None if file_path == "r/broken.csv" else azure_data_service.process_adls_data([])
+
+    monkeypatch.setattr(azure_data_service, "get_compliance_files", lambda user_id=None, organization_id=None: files)
+    monkeypatch.setattr(azure_data_service, "summarise_adls_file", fake_summarise)
+
+    with app.app_context():
+        outcome = ingest_compliance_results(user_id, org_id)
+        assert (outcome["ingested"], outcome["failed"]) == (1, 1)
+        [row] = ComplianceResultFile.query.all()
+        assert (row.file_path, row.overall_status, row.source_version) == ("r/empty.csv", "No Data", '"e1"')
+
+        # The empty file is not downloaded again; the unreadable one is.
+        fetched.clear()
+        outcome = ingest_compliance_results(user_id, org_id)
+        assert fetched == ["r/broken.csv"]
+        assert (outcome["unchanged"], outcome["failed"]) == (1, 1)
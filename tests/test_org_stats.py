@@ -0,0 +1,107 @@
+def _stats(org_id):
+    from app import db
+    from app.models import OrganizationStats
+
+    db.session.expire_all()
+    row = db.session.get(OrganizationStats, org_id)
+    return row and (row.document_count, row.document_bytes, row.member_count, row.active_member_count)
+
+
+def test_org_stats_follow_document_and_membership_changes(app, db_session, seed_org_user):
+    from app.models import Document, OrganizationMembership, User
+
+    org_id, user_id, membership_id = seed_org_user
+
+    with app.app_context():
+        session = db_session.session
+        assert _stats(org_id) == (0, 0, 1, 1)
+
+        docs = [
+            Document(filename=f"d{i}.pdf", blob_name=f"b{i}", file_size=100 * (i + 1), organization_id=org_id, uploaded_by=user_id)
+            for i in range(3)
+        ]
+        session.add_all(docs)
+        session.commit()
+        assert _stats(org_id) == (3, 600, 1, 1)
+
+        # Soft delete, size change and hard delete.
+        docs[0].is_active = False
+        docs[1].file_size = 250
+        session.commit()
+        assert _stats(org_id) == (2, 550, 1, 1)
+        session.delete(docs[2])
+        session.commit()
+        assert _stats(org_id) == (1, 250, 1, 1)
+
+        # Inactive documents and rolled-back work do not count.
+        session.add(Document(filename="x.pdf", blob_name="x", file_size=5, organization_id=org_id, is_active=False))
+        session.add(Document(filename="y.pdf", blob_name="y", file_size=7, organization_id=org_id))
+        session.flush()
+        session.rollback()
+        assert _stats(org_id) == (1, 250, 1, 1)
+
+        other = User(email="second@example.com", email_verified=True, is_active=True)
+        session.add(other)
+        session.flush()
+        invited = OrganizationMembership(organization_id=org_id, user_id=other.id, role="User", is_active=False)
+        session.add(invited)
+        session.commit()
+        assert _stats(org_id) == (1, 250, 2, 1)
+
+        invited.is_active = True
+        session.commit()
+        assert _stats(org_id) == (1, 250, 2, 2)
+        session.delete(invited)
+        session.commit()
+        assert _stats(org_id) == (1, 250, 1, 1)
+
+
+def test_reconcile_org_stats_command_repairs_drift(app, db_session, seed_org_user):
+    from app.models import Document, Organization, OrganizationStats
+
+    org_id, user_id, _membership_id = seed_org_user
+
+    with app.app_context():
+        session = db_session.session
+        session.add(Document(filename="a.pdf", blob_name="a", file_size=10, organization_id=org_id, uploaded_by=user_id))
+        session.commit()
+        row = session.get(OrganizationStats, org_id)
+        row.document_count = 99
+        session.commit()
+
+    result = app.test_cli_runner().invoke(args=["reconcile-org-stats"])
+    assert result.exit_code == 0, result.output
+    assert "Corrected 1 organization stats row(s)." in result.output
+
+    with app.app_context():
+        assert _stats(org_id) == (1, 10, 1, 1)
+
+        # A missing row is counted from the source tables without writing anything.
+        from app.services.org_stats import get_org_stats
+
+        OrganizationStats.query.filter_by(organization_id=org_id).delete()
+        db_session.session.commit()
+        assert get_org_stats(org_id).document_count == 1
+        db_session.session.commit()
+        assert _stats(org_id) is None
+
+    result = app.test_cli_runner().invoke(args=["reconcile-org-stats"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert _stats(org_id) == (1, 10, 1, 1)
+
+
+def test_dashboards_read_counts_from_org_stats(client, app, db_session, seed_org_user):
+    from app.models import OrganizationStats
+    from tests.conftest import login
+
+    org_id, _user_id, _membership_id = seed_org_user
+
+    with app.app_context():
+        row = db_session.session.get(OrganizationStats, org_id)
+        row.document_count = 4321
+        db_session.session.commit()
+
+    login(client)
+    assert "4321" in client.get("/dashboard").get_data(as_text=True)
+    assert "4321" in client.get("/org/admin").get_data(as_text=True)
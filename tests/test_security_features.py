@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -168,6 +169,225 @@ def test_login_activity_logged(app, client, db_session, seed_org_user):
         assert any(e.provider == "password" and e.success is True for e in evts)
 
 
+def test_system_logs_are_org_scoped_paginated_and_counted_in_sql(app, client, db_session, seed_org_user):
+    import re
+
+    from app.models import LoginEvent, Organization, User
+
+    org_id, user_id, _m_id = seed_org_user
+    now = datetime.now(timezone.utc)
+
+    with app.app_context():
+        other_org = Organization(name="Org B")
+        outsider = User(email="outsider@example.com", email_verified=True, is_active=True)
+        db_session.session.add_all([other_org, outsider])
+        db_session.session.flush()
+        other_org_id = other_org.id
+        for i in range(120):
+            db_session.session.add(LoginEvent(
+                user_id=user_id, email="user@example.com", success=i % 4 != 0, organization_id=org_id,
+                ip_address="10.0.0.1", created_at=now - timedelta(minutes=i + 1),
+            ))
+        # Outside the 24h window, and another org's user: neither is listed or counted.
+        db_session.session.add(LoginEvent(user_id=user_id, email="user@example.com", success=False,
+                                          organization_id=org_id, created_at=now - timedelta(days=3)))
+        for i in range(5):
+            db_session.session.add(LoginEvent(user_id=outsider.id, email="outsider@example.com", success=False,
+                                              organization_id=other_org_id, created_at=now - timedelta(minutes=i)))
+        db_session.session.commit()
+        assert LoginEvent.query.filter_by(organization_id=other_org_id).count() == 5
+
+    login(client)  # adds one more successful event for the member
+
+    with app.app_context():
+        latest = LoginEvent.query.filter_by(user_id=user_id).order_by(LoginEvent.id.desc()).first()
+        assert latest.success is True and latest.organization_id == org_id
+
+    def stat(body, label):
+        return int(re.search(r'>(\d+)</div>\s*<div class="text-body-secondary small">' + label, body).group(1))
+
+    resp = client.get("/system-logs?per_page=50")
+    assert resp.status_code == 200
+    body = resp.get_data(as_text=True)
+    assert "outsider@example.com" not in body
+    assert stat(body, "Total Log Entries") == 121
+    assert stat(body, "Failed Logins") == 30
+
+    rows = body.count("<strong>LOGIN_")
+    next_links = []
+    while "Older" in body:
+        href = re.search(r'href="([^"]*cursor=[^"]*)"[^>]*>\s*Older', body).group(1).replace("&amp;", "&")
+        next_links.append(href)
+        body = client.get(href).get_data(as_text=True)
+        rows += body.count("<strong>LOGIN_")
+    assert rows == 121 and len(next_links) == 2
+
+    body = client.get("/system-logs?event_type=LOGIN_FAILURE").get_data(as_text=True)
+    assert stat(body, "Total Log Entries") == 30
+    assert body.count("<strong>LOGIN_FAILURE") == 30
+
+
+def test_login_events_follow_active_memberships_across_orgs(app, client, db_session, seed_org_user):
+    from app.models import LoginEvent, Organization, OrganizationMembership, User
+    from tests.conftest import _complete_org
+
+    org_id, user_id, _m_id = seed_org_user
+    now = datetime.now(timezone.utc)
+
+    other_org = _complete_org(Organization(name="Org B"))
+    former = User(email="former@example.com", email_verified=True, is_active=True)
+    db_session.session.add_all([other_org, former])
+    db_session.session.flush()
+    other_org_id = other_org.id
+    db_session.session.add(OrganizationMembership(
+        organization_id=other_org_id, user_id=user_id, role="Admin", is_active=True,
+    ))
+    # A member who has since left Org A: their old events stay out of its log.
+    former_membership = OrganizationMembership(organization_id=org_id, user_id=former.id, role="User", is_active=True)
+    db_session.session.add(former_membership)
+    db_session.session.add(LoginEvent(user_id=former.id, email="former@example.com", success=True,
+                                      organization_id=org_id, created_at=now - timedelta(minutes=5)))
+    former_membership.is_active = False
+    db_session.session.commit()
+
+    login(client)
+
+    events = LoginEvent.query.filter_by(user_id=user_id, success=True).all()
+    assert sorted(e.organization_id for e in events) == sorted([org_id, other_org_id])
+
+    body = client.get("/system-logs").get_data(as_text=True)
+    assert body.count("<strong>LOGIN_SUCCESS") == 1
+    assert "former@example.com" not in body
+
+    db_session.session.get(User, user_id).organization_id = other_org_id
+    db_session.session.commit()
+    body = client.get("/system-logs").get_data(as_text=True)
+    assert body.count("<strong>LOGIN_SUCCESS") == 1
+    assert "user@example.com" in body
+
+
+def test_prune_login_events_rolls_up_then_deletes_expired_events(app, db_session, seed_org_user):
+    from datetime import date
+
+    from app.models import LoginEvent, LoginEventDailyRollup
+
+    org_id, user_id, _m_id = seed_org_user
+    app.config["LOG_RETENTION_DAYS"] = 30
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    old_day = (now - timedelta(days=40)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    with app.app_context():
+        for i in range(7):
+            db_session.session.add(LoginEvent(user_id=user_id, organization_id=org_id, success=i < 5,
+                                              created_at=old_day + timedelta(minutes=i)))
+        db_session.session.add(LoginEvent(user_id=user_id, organization_id=org_id, success=True,
+                                          created_at=old_day + timedelta(days=1)))
+        db_session.session.add(LoginEvent(email="nobody@example.com", success=False, created_at=old_day))
+        db_session.session.add(LoginEvent(user_id=user_id, organization_id=org_id, success=True,
+                                          created_at=now - timedelta(days=2)))
+        db_session.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["prune-login-events", "--batch-size", "4"])
+    assert result.exit_code == 0, result.output
+    assert "mode=batched" in result.output
+    assert "rolled_up=8 deleted=9" in result.output
+
+    with app.app_context():
+        assert LoginEvent.query.count() == 1
+        rollups = {
+            r.day: (r.success_count, r.failure_count)
+            for r in LoginEventDailyRollup.query.filter_by(organization_id=org_id)
+        }
+        assert rollups == {old_day.date(): (5, 2), old_day.date() + timedelta(days=1): (1, 0)}
+        assert all(isinstance(day, date) for day in rollups)
+
+    # Nothing left to expire: a second run changes nothing.
+    result = runner.invoke(args=["prune-login-events"])
+    assert "rolled_up=0 deleted=0" in result.output
+    with app.app_context():
+        assert LoginEventDailyRollup.query.filter_by(organization_id=org_id, day=old_day.date()).one().success_count == 5
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"),
+    reason="set TEST_POSTGRES_URL to a disposable PostgreSQL database to run the partition tests",
+)
+def test_login_event_partitions_are_rolled_up_dropped_and_reversible(monkeypatch):
+    """Runs the real migrations against PostgreSQL; the database's public schema is wiped."""
+    from flask_migrate import downgrade, upgrade
+    from sqlalchemy import text
+
+    from app import create_app, db
+    from app.models import LoginEventDailyRollup
+    from app.services.login_event_retention import is_partitioned, prune_login_events, retention_cutoff
+
+    import config
+
+    monkeypatch.setattr(config.TestingConfig, "SQLALCHEMY_DATABASE_URI", os.environ["TEST_POSTGRES_URL"])
+    app = create_app("testing")
+    app.config.update(LOG_RETENTION_DAYS=60)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+        upgrade(revision="n8o9p0q1r2s3")
+
+        # Five events a day for 150 days, written before the table is partitioned.
+        db.session.execute(text("INSERT INTO organizations (id, name) VALUES (1, 'Org A')"))
+        db.session.execute(text(
+            "INSERT INTO users (id, email, organization_id, email_verified, failed_login_count, session_version) "
+            "VALUES (1, 'a@example.com', 1, true, 0, 1)"
+        ))
+        stamps = [now - timedelta(days=day, hours=hour) for day in range(1, 151) for hour in range(5)]
+        db.session.execute(
+            text("INSERT INTO login_events (user_id, organization_id, provider, success, created_at) "
+                 "VALUES (1, 1, 'password', :success, :created_at)"),
+            [{"success": i % 5 != 0, "created_at": ts} for i, ts in enumerate(stamps)],
+        )
+        db.session.commit()
+
+        upgrade(revision="o9p0q1r2s3t4")
+        assert is_partitioned()
+        assert db.session.execute(text("SELECT COUNT(*) FROM login_events")).scalar() == len(stamps)
+        assert db.session.execute(text("SELECT COUNT(*) FROM login_events_default")).scalar() == 0
+        # New rows keep drawing ids from the original sequence.
+        new_id = db.session.execute(text(
+            "INSERT INTO login_events (provider, success, created_at) VALUES ('password', true, now()) RETURNING id"
+        )).scalar()
+        assert new_id == len(stamps) + 1
+        db.session.commit()
+
+        cutoff = retention_cutoff(now)
+        first_kept_month = datetime(cutoff.year, cutoff.month, 1)
+        expired = [ts for ts in stamps if ts < first_kept_month]
+
+        result = prune_login_events(now=now)
+        assert result["mode"] == "partitions"
+        assert result["deleted"] == len(expired)
+        assert result["rolled_up"] == len(expired)
+        assert db.session.execute(text("SELECT COUNT(*) FROM login_events")).scalar() == len(stamps) - len(expired) + 1
+        assert db.session.execute(text("SELECT MIN(created_at) FROM login_events")).scalar() >= first_kept_month
+        rollups = LoginEventDailyRollup.query.all()
+        assert sum(r.success_count + r.failure_count for r in rollups) == len(expired)
+        assert sum(r.failure_count for r in rollups) == sum(1 for i, ts in enumerate(stamps) if ts in expired and i % 5 == 0)
+
+        # A second run finds nothing else to drop.
+        assert prune_login_events(now=now)["partitions_dropped"] == 0
+
+        remaining = db.session.execute(text("SELECT COUNT(*) FROM login_events")).scalar()
+        db.session.commit()
+        downgrade(revision="n8o9p0q1r2s3")
+        assert not is_partitioned()
+        assert db.session.execute(text("SELECT COUNT(*) FROM login_events")).scalar() == remaining
+        db.session.commit()
+        upgrade()
+        assert is_partitioned()
+        db.session.commit()
+
+
 def test_cannot_demote_last_admin_role(app, client, db_session, seed_org_user):
     from app.models import OrganizationMembership
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import io
 from pathlib import Path
 
 
@@ -69,3 +71,680 @@ def test_upload_allows_when_billing_incomplete(client, app, db_session, seed_org
         )
         assert docs
         assert docs[0].filename == "test_doc.pdf"
+
+
+def test_rejected_upload_does_not_use_up_a_version_number(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document
+    import app.upload.routes as upload_routes
+
+    org_id, _user_id, _membership_id = seed_org_user
+
+    class FakeStorage:
+        def is_configured(self):
+            return True
+
+        def generate_blob_name(self, original_filename, user_id, organization_id=None):
+            return f"org_{organization_id}/{original_filename}"
+
+        def upload_file(self, file_stream, file_path, content_type=None, metadata=None):
+            file_stream.read()
+            return {"success": True, "file_path": file_path, "storage_type": "Blob_Storage"}
+
+        def delete_file(self, blob_name):
+            return True
+
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", FakeStorage)
+    login(client)
+
+    pdf = (Path("tests") / "test_files" / "test_doc.pdf").read_bytes()
+    for data in (pdf, b"NOTAPDF!" * 8, pdf):
+        client.post("/upload", data={"file": (io.BytesIO(data), "policy.pdf")}, content_type="multipart/form-data")
+
+    with app.app_context():
+        names = sorted(d.filename for d in Document.query.filter_by(organization_id=int(org_id)))
+    assert names == ["policy (1).pdf", "policy.pdf"]
+
+
+class _ChunkedFakeStorage:
+    staged: dict = {}
+    committed: dict = {}
+    deleted: list = []
+
+    def is_configured(self):
+        return True
+
+    def generate_blob_name(self, original_filename, user_id, organization_id=None):
+        return f"org_{organization_id}/user_{user_id}/{original_filename}"
+
+    def stage_block(self, file_path, block_index, data):
+        self.staged.setdefault(file_path, {})[block_index] = bytes(data)
+        return {"success": True, "block_index": block_index, "size": len(data)}
+
+    def commit_blocks(self, file_path, block_count, content_type=None, metadata=None):
+        blocks = self.staged[file_path]
+        self.committed[file_path] = b"".join(blocks[i] for i in range(block_count))
+        return {"success": True, "file_path": file_path, "storage_type": "Blob_Storage"}
+
+    def open_download(self, blob_name, offset=None, length=None, if_none_match=None, if_range=None):
+        data = self.committed[blob_name]
+        return {"success": True, "chunks": iter([data[i:i + 1000] for i in range(0, len(data), 1000)]), "size": len(data)}
+
+    def delete_file(self, blob_name):
+        self.deleted.append(blob_name)
+        return {"success": True}
+
+
+def _missing_chunks(progress):
+    return sorted(set(range(progress["total_chunks"])) - set(progress["received_chunks"]))
+
+
+def test_chunked_upload_resumes_and_commits(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document
+    import app.upload.routes as upload_routes
+
+    org_id, _user_id, _membership_id = seed_org_user
+    app.config["UPLOAD_CHUNK_SIZE"] = 1024
+    _ChunkedFakeStorage.staged = {}
+    _ChunkedFakeStorage.committed = {}
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", _ChunkedFakeStorage)
+    login(client)
+
+    payload = (Path("tests") / "test_files" / "test_doc.pdf").read_bytes()
+    payload = payload + b"\0" * max(0, 2500 - len(payload))
+    chunks = [payload[i:i + 1024] for i in range(0, len(payload), 1024)]
+
+    resp = client.post("/upload/sessions", json={"filename": "big.pdf", "file_size": len(payload)})
+    assert resp.status_code == 201
+    upload_id = resp.get_json()["upload_id"]
+    assert resp.get_json()["total_chunks"] == len(chunks)
+
+    # Chunks may arrive out of order, and a retried chunk simply replaces the staged block.
+    assert client.put(f"/upload/sessions/{upload_id}/chunks/{len(chunks) - 1}", data=chunks[-1]).status_code == 200
+    assert client.put(f"/upload/sessions/{upload_id}/chunks/0", data=chunks[0]).status_code == 200
+    assert client.put(f"/upload/sessions/{upload_id}/chunks/0", data=chunks[0]).status_code == 200
+
+    # Simulated dropped connection: commit reports what is missing, progress lets the client resume.
+    early = client.post(f"/upload/sessions/{upload_id}/commit")
+    assert early.status_code == 409
+    assert early.get_json()["missing_chunks"] == list(range(1, len(chunks) - 1))
+
+    progress = client.get(f"/upload/progress/{upload_id}").get_json()
+    assert progress["status"] == "uploading"
+    assert progress["received_chunks"] == [0, len(chunks) - 1]
+    assert 0 < progress["progress"] < 100
+
+    for index in _missing_chunks(progress):
+        assert client.put(f"/upload/sessions/{upload_id}/chunks/{index}", data=chunks[index]).status_code == 200
+
+    done = client.post(f"/upload/sessions/{upload_id}/commit")
+    assert done.status_code == 200
+    body = done.get_json()
+    assert body["status"] == "committed"
+    assert body["progress"] == 100
+    assert _ChunkedFakeStorage.committed[f"org_{org_id}/user_{_user_id}/big.pdf"] == payload
+
+    with app.app_context():
+        document = db_session.session.get(Document, body["document_id"])
+        assert document.filename == "big.pdf"
+        assert document.file_size == len(payload)
+        assert document.content_hash == hashlib.sha256(payload).hexdigest()
+
+
+def _chunked_upload(client, filename, payload, chunk_size=1024):
+    upload_id = client.post("/upload/sessions", json={"filename": filename, "file_size": len(payload)}).get_json()["upload_id"]
+    for index, start in enumerate(range(0, len(payload), chunk_size)):
+        assert client.put(f"/upload/sessions/{upload_id}/chunks/{index}", data=payload[start:start + chunk_size]).status_code == 200
+    return upload_id
+
+
+def test_chunked_uploads_share_blobs_with_identical_content(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document, DocumentBlob
+    import app.upload.routes as upload_routes
+
+    org_id, user_id, _membership_id = seed_org_user
+    app.config["UPLOAD_CHUNK_SIZE"] = 1024
+    _ChunkedFakeStorage.staged, _ChunkedFakeStorage.committed, _ChunkedFakeStorage.deleted = {}, {}, []
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", _ChunkedFakeStorage)
+    login(client)
+
+    payload = (Path("tests") / "test_files" / "test_doc.pdf").read_bytes()
+    payload = payload + b"\0" * max(0, 2500 - len(payload))
+    first = client.post(f"/upload/sessions/{_chunked_upload(client, 'a.pdf', payload)}/commit").get_json()
+    second = client.post(f"/upload/sessions/{_chunked_upload(client, 'b.pdf', payload)}/commit").get_json()
+
+    first_doc = db_session.session.get(Document, first["document_id"])
+    second_doc = db_session.session.get(Document, second["document_id"])
+    assert first_doc.blob_name == second_doc.blob_name == f"org_{org_id}/user_{user_id}/a.pdf"
+    assert _ChunkedFakeStorage.deleted == [f"org_{org_id}/user_{user_id}/b.pdf"]
+    blob = DocumentBlob.query.filter_by(organization_id=org_id).one()
+    assert blob.ref_count == 2 and blob.content_hash == first_doc.content_hash
+
+
+def test_chunked_upload_rechecks_membership_on_every_request(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document, OrganizationMembership
+    import app.upload.routes as upload_routes
+
+    _org_id, _user_id, membership_id = seed_org_user
+    app.config["UPLOAD_CHUNK_SIZE"] = 1024
+    _ChunkedFakeStorage.staged, _ChunkedFakeStorage.committed = {}, {}
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", _ChunkedFakeStorage)
+    login(client)
+
+    payload = (Path("tests") / "test_files" / "test_doc.pdf").read_bytes()
+    payload = payload + b"\0" * max(0, 2500 - len(payload))
+    upload_id = client.post("/upload/sessions", json={"filename": "gone.pdf", "file_size": len(payload)}).get_json()["upload_id"]
+    assert client.put(f"/upload/sessions/{upload_id}/chunks/0", data=payload[:1024]).status_code == 200
+
+    # Removed from the organisation mid-upload.
+    db_session.session.get(OrganizationMembership, membership_id).is_active = False
+    db_session.session.commit()
+
+    resp = client.put(f"/upload/sessions/{upload_id}/chunks/1", data=payload[1024:2048])
+    assert resp.status_code == 403 and resp.get_json()["error_code"] == "NOT_AUTHORIZED"
+    assert client.post(f"/upload/sessions/{upload_id}/commit").status_code == 403
+    assert Document.query.filter_by(filename="gone.pdf").count() == 0
+
+
+def test_chunked_upload_tolerates_concurrent_chunk_puts_and_commits(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document, UploadSession, UploadSessionChunk
+    import app.upload.routes as upload_routes
+
+    org_id, _user_id, _membership_id = seed_org_user
+    app.config["UPLOAD_CHUNK_SIZE"] = 1024
+    _ChunkedFakeStorage.staged = {}
+    _ChunkedFakeStorage.committed = {}
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", _ChunkedFakeStorage)
+    login(client)
+
+    payload = (Path("tests") / "test_files" / "test_doc.pdf").read_bytes()[:1024]
+    upload_id = client.post("/upload/sessions", json={"filename": "race.pdf", "file_size": len(payload)}).get_json()["upload_id"]
+    assert client.put(f"/upload/sessions/{upload_id}/chunks/0", data=payload).status_code == 200
+
+    # A second PUT of the same chunk that raced the first one: its lookup saw no row, so its insert conflicts.
+    session_get = upload_routes.db.session.get
+    with monkeypatch.context() as m:
+        m.setattr(
+            upload_routes.db.session, "get",
+            lambda model, key, **kw: None if model is UploadSessionChunk else session_get(model, key, **kw),
+        )
+        resp = client.put(f"/upload/sessions/{upload_id}/chunks/0", data=payload)
+    assert resp.status_code == 200
+    assert resp.get_json()["received_chunks"] == [0]
+
+    # A commit already in flight elsewhere holds the claim: this one must not record a Document.
+    # (Requests share the fixture's app context and session here, so update through it.)
+    db_session.session.get(UploadSession, upload_id).status = "committing"
+    db_session.session.commit()
+    resp = client.post(f"/upload/sessions/{upload_id}/commit")
+    assert resp.status_code == 409
+    assert Document.query.filter_by(filename="race.pdf").count() == 0
+    db_session.session.get(UploadSession, upload_id).status = "uploading"
+    db_session.session.commit()
+
+    first = client.post(f"/upload/sessions/{upload_id}/commit")
+    second = client.post(f"/upload/sessions/{upload_id}/commit")
+    assert first.status_code == second.status_code == 200
+    assert first.get_json()["document_id"] == second.get_json()["document_id"]
+    with app.app_context():
+        assert Document.query.filter_by(filename="race.pdf").count() == 1
+
+
+def test_chunked_upload_rejects_bad_content_and_unknown_sessions(client, app, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    import app.upload.routes as upload_routes
+
+    _ChunkedFakeStorage.staged = {}
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", _ChunkedFakeStorage)
+    login(client)
+
+    assert client.get("/upload/progress/does-not-exist").status_code == 404
+    assert client.post("/upload/sessions", json={"filename": "x.exe", "file_size": 10}).status_code == 400
+
+    upload_id = client.post("/upload/sessions", json={"filename": "fake.pdf", "file_size": 8}).get_json()["upload_id"]
+    resp = client.put(f"/upload/sessions/{upload_id}/chunks/0", data=b"NOTAPDF!")
+    assert resp.status_code == 400
+    assert resp.get_json()["error_code"] == "INVALID_PDF"
+    assert client.get(f"/upload/progress/{upload_id}").get_json()["status"] == "failed"
+
+
+def test_identical_uploads_share_one_blob_until_last_delete(client, app, db_session, seed_org_user, monkeypatch):
+    from tests.conftest import login
+    from app.models import Document, DocumentBlob
+    import app.upload.routes as upload_routes
+    import app.services.azure_storage as azure_storage
+
+    org_id, _user_id, _membership_id = seed_org_user
+    uploads, deletes = [], []
+
+    class CountingStorage:
+        def is_configured(self):
+            return True
+
+        def generate_blob_name(self, original_filename, user_id, organization_id=None):
+            return f"org_{organization_id}/blob_{len(uploads)}.pdf"
+
+        def upload_file(self, file_stream, file_path, content_type=None, metadata=None):
+            uploads.append(file_path)
+            file_stream.read()
+            return {"success": True, "file_path": file_path, "storage_type": "Blob_Storage"}
+
+        def delete_file(self, blob_name):
+            deletes.append(blob_name)
+            return {"success": True}
+
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", CountingStorage)
+    monkeypatch.setattr(azure_storage, "AzureBlobStorageService", CountingStorage)
+    login(client)
+
+    test_pdf = Path("tests") / "test_files" / "test_doc.pdf"
+    for name in ("first.pdf", "second.pdf"):
+        with test_pdf.open("rb") as f:
+            client.post("/upload", data={"file": (f, name)}, content_type="multipart/form-data")
+
+    # The second copy is hashed before any storage write and reuses the first blob.
+    assert uploads == [f"org_{org_id}/blob_0.pdf"]
+    assert deletes == []
+    with app.app_context():
+        docs = Document.query.filter_by(organization_id=org_id).order_by(Document.id).all()
+        assert [d.blob_name for d in docs] == [uploads[0], uploads[0]]
+        assert docs[0].content_hash and docs[0].content_hash == docs[1].content_hash
+        assert DocumentBlob.query.one().ref_count == 2
+        doc_ids = [d.id for d in docs]
+
+    client.post(f"/document/{doc_ids[0]}/delete")
+    assert deletes == []
+    with app.app_context():
+        assert DocumentBlob.query.one().ref_count == 1
+
+    client.post(f"/document/{doc_ids[1]}/delete")
+    assert deletes == [uploads[0]]
+    with app.app_context():
+        assert DocumentBlob.query.count() == 0
+
+
+def test_single_pass_upload_accepts_non_seekable_streams_and_aborts_early(app):
+    import hashlib
+
+    from app.services.file_validation import FileValidationService
+
+    class PipeStream:
+        """Request body as seen with chunked transfer-encoding: read() only, no seek/tell."""
+
+        def __init__(self, data, piece=3):
+            self._data = data
+            self._piece = piece
+            self.reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            # Short reads, like a socket.
+            n = self._piece if size is None or size < 0 else min(size, self._piece)
+            out, self._data = self._data[:n], self._data[n:]
+            return out
+
+    def uploader(received):
+        def upload(stream, content_type):
+            while True:
+                block = stream.read(4)
+                if not block:
+                    break
+                received.append(block)
+            return {"success": True, "content_type": content_type}
+        return upload
+
+    body = Path("tests", "test_files", "test_doc.pdf").read_bytes()
+    received = []
+    result = FileValidationService.validate_and_upload(PipeStream(body), "doc.pdf", uploader(received))
+    assert result["success"] is True
+    assert b"".join(received) == body
+    assert result["file_size"] == len(body)
+    assert result["content_hash"] == hashlib.sha256(body).hexdigest()
+    assert result["content_type"] == "application/pdf"
+
+    # A bad signature stops the upload as soon as the header has been read.
+    received = []
+    source = PipeStream(b"MZ" + b"\0" * 1000)
+    result = FileValidationService.validate_and_upload(source, "doc.pdf", uploader(received))
+    assert result["error_code"] == "INVALID_PDF"
+    assert result["stage"] == "validation"
+    assert source.reads == 3 and received == [b"MZ\0", b"\0\0\0"]
+
+    # Oversize is detected while streaming, without reading the rest.
+    original_max = FileValidationService.MAX_FILE_SIZE
+    FileValidationService.MAX_FILE_SIZE = 12
+    try:
+        source = PipeStream(b"%PDF" + b"x" * 100)
+        result = FileValidationService.validate_and_upload(source, "doc.pdf", uploader([]))
+    finally:
+        FileValidationService.MAX_FILE_SIZE = original_max
+    assert result["error_code"] == "FILE_TOO_LARGE"
+    assert source.reads == 5
+
+
+def test_versioned_filenames_are_allocated_without_collisions(app, db_session, seed_org_user):
+    import threading
+
+    from app.models import Document
+    from app.services.document_names import allocate_document_filename
+
+    org_id, user_id, _membership_id = seed_org_user
+
+    with app.app_context():
+        # Documents that predate the counters, including a user-chosen "(1)" name.
+        for name in ("policy.pdf", "policy (1).pdf"):
+            db_session.session.add(Document(filename=name, blob_name=name, organization_id=org_id, uploaded_by=user_id))
+        db_session.session.commit()
+
+        assert allocate_document_filename("fresh.pdf", org_id) == "fresh.pdf"
+        assert allocate_document_filename("fresh.pdf", org_id) == "fresh (1).pdf"
+        # The existing names are skipped over once, then the counter takes over.
+        assert allocate_document_filename("policy.pdf", org_id) == "policy (2).pdf"
+        assert allocate_document_filename("policy.pdf", org_id) == "policy (3).pdf"
+
+    results = []
+    errors = []
+
+    def allocate():
+        try:
+            with app.app_context():
+                results.append(allocate_document_filename("report.pdf", org_id))
+        except Exception as e:  # pragma: no cover - surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=allocate) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+
+    assert errors == []
+    assert len(results) == 6
+    assert set(results) == {"report.pdf"} | {f"report ({n}).pdf" for n in range(1, 6)}
+
+
+def test_queued_upload_is_finalised_by_worker_with_retries(client, app, db_session, seed_org_user, monkeypatch, tmp_path):
+    import os
+    from datetime import datetime, timedelta, timezone
+
+    from tests.conftest import login
+    from app.models import Document, UploadJob
+    import app.services.upload_jobs as upload_jobs
+    import app.upload.routes as upload_routes
+
+    org_id, _user_id, _membership_id = seed_org_user
+    app.config.update(UPLOAD_PROCESSING_MODE="queued", UPLOAD_STAGING_DIR=str(tmp_path / "staging"))
+    outcomes = [False, True]
+    uploaded = {}
+
+    class FlakyStorage:
+        def is_configured(self):
+            return True
+
+        def generate_blob_name(self, original_filename, user_id, organization_id=None):
+            return f"org_{organization_id}/queued.pdf"
+
+        def upload_file(self, file_stream, file_path, content_type=None, metadata=None):
+            data = file_stream.read()
+            if not outcomes.pop(0):
+                return {"success": False, "error": "Azure unavailable"}
+            uploaded[file_path] = data
+            return {"success": True, "file_path": file_path}
+
+        def delete_file(self, blob_name):
+            return {"success": True}
+
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", FlakyStorage)
+    monkeypatch.setattr(upload_jobs, "AzureBlobStorageService", FlakyStorage)
+    login(client)
+
+    body = Path("tests", "test_files", "test_doc.pdf").read_bytes()
+    with Path("tests", "test_files", "test_doc.pdf").open("rb") as f:
+        resp = client.post("/upload", data={"file": (f, "queued.pdf")}, content_type="multipart/form-data")
+    assert resp.status_code in {302, 303}
+    with client.session_transaction() as sess:
+        flashed = " ".join(message for _category, message in sess["_flashes"])
+
+    with app.app_context():
+        # The request only staged the file and queued a job.
+        assert Document.query.count() == 0
+        job = UploadJob.query.one()
+        assert job.status == "pending"
+        staged_path = upload_jobs.json.loads(job.payload)["staged_path"]
+        assert Path(staged_path).read_bytes() == body
+        job_id = job.id
+        assert f"upload job {job_id}" in flashed and f"/upload/jobs/{job_id}" in flashed
+
+        # First attempt fails and is rescheduled with backoff.
+        assert upload_jobs.process_pending_jobs("test-worker") == {"claimed": 1, "done": 0, "retried": 1, "failed": 0, "superseded": 0}
+        job = db_session.session.get(UploadJob, job_id)
+        assert job.status == "pending" and job.attempts == 1 and job.last_error == "Azure unavailable"
+        assert upload_jobs.process_pending_jobs("test-worker")["claimed"] == 0
+
+        job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.session.commit()
+        assert upload_jobs.process_pending_jobs("test-worker")["done"] == 1
+
+        doc = Document.query.one()
+        assert doc.filename == "queued.pdf" and doc.blob_name == f"org_{org_id}/queued.pdf"
+        assert uploaded[doc.blob_name] == body
+        assert db_session.session.get(UploadJob, job_id).document_id == doc.id
+        assert not os.path.exists(staged_path)
+
+    status = client.get(f"/upload/jobs/{job_id}").get_json()
+    assert status["status"] == "done" and status["document_id"] == doc.id
+
+
+def test_queued_upload_reports_job_and_is_finalised_once_after_lease_reclaim(client, app, db_session, seed_org_user, monkeypatch, tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from tests.conftest import login
+    from app.models import Document, UploadJob
+    import app.services.upload_jobs as upload_jobs
+    import app.upload.routes as upload_routes
+
+    app.config.update(UPLOAD_PROCESSING_MODE="queued", UPLOAD_STAGING_DIR=str(tmp_path / "staging"))
+    reclaim = []
+
+    class SlowStorage:
+        def is_configured(self):
+            return True
+
+        def generate_blob_name(self, original_filename, user_id, organization_id=None):
+            return f"org_{organization_id}/slow.pdf"
+
+        def upload_file(self, file_stream, file_path, content_type=None, metadata=None):
+            file_stream.read()
+            if reclaim:
+                # While this worker is still uploading, its lease runs out and another worker takes the job.
+                job_id = reclaim.pop()
+                UploadJob.query.filter_by(id=job_id).update(
+                    {UploadJob.locked_at: datetime.now(timezone.utc) - timedelta(hours=1)}, synchronize_session=False
+                )
+                db_session.session.commit()
+                assert upload_jobs.claim_jobs("worker-b") == [job_id]
+            return {"success": True, "file_path": file_path}
+
+        def delete_file(self, blob_name):
+            return {"success": True}
+
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", SlowStorage)
+    monkeypatch.setattr(upload_jobs, "AzureBlobStorageService", SlowStorage)
+    login(client)
+
+    with Path("tests", "test_files", "test_doc.pdf").open("rb") as f:
+        resp = client.post(
+            "/upload",
+            data={"file": (f, "slow.pdf")},
+            content_type="multipart/form-data",
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+    assert resp.status_code == 202
+    body = resp.get_json()
+    assert body["status"] == "pending"
+    assert body["status_url"] == f"/upload/jobs/{body['job_id']}"
+    assert client.get(body["status_url"]).get_json()["status"] == "pending"
+
+    with app.app_context():
+        job_id = body["job_id"]
+        assert upload_jobs.claim_jobs("worker-a") == [job_id]
+        reclaim.append(job_id)
+        assert upload_jobs.run_job(job_id) == "superseded"
+        assert Document.query.count() == 0
+
+        assert upload_jobs.run_job(job_id) == "done"
+        assert Document.query.count() == 1
+        assert db_session.session.get(UploadJob, job_id).attempts == 2
+
+
+def test_batch_upload_transfers_concurrently_and_reports_per_file(client, app, db_session, seed_org_user, monkeypatch):
+    import io
+    import threading
+
+    from tests.conftest import login
+    from app.models import Document
+    import app.upload.routes as upload_routes
+
+    org_id, _user_id, _membership_id = seed_org_user
+    # Every transfer must be in flight at once for the barrier to release.
+    barrier = threading.Barrier(3, timeout=5)
+    names = iter(range(100))
+    deleted = []
+
+    class ConcurrentStorage:
+        def is_configured(self):
+            return True
+
+        def generate_blob_name(self, original_filename, user_id, organization_id=None):
+            return f"org_{organization_id}/batch_{next(names)}.pdf"
+
+        def upload_file(self, file_stream, file_path, content_type=None, metadata=None):
+            barrier.wait()
+            file_stream.read()
+            return {"success": True, "file_path": file_path}
+
+        def delete_file(self, blob_name):
+            deleted.append(blob_name)
+            return {"success": True}
+
+    monkeypatch.setattr(upload_routes, "AzureBlobStorageService", ConcurrentStorage)
+    login(client)
+
+    body = Path("tests", "test_files", "test_doc.pdf").read_bytes()
+    resp = client.post(
+        "/upload/batch",
+        data={"files": [
+            (io.BytesIO(body), "policy.pdf"),
+            (io.BytesIO(b"not a pdf"), "broken.pdf"),
+            (io.BytesIO(body), "policy.pdf"),
+        ]},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    payload = resp.get_json()
+    assert payload["uploaded"] == 2 and payload["failed"] == 1
+    ok_first, broken, ok_second = payload["results"]
+    assert broken["success"] is False and broken["error_code"] == "INVALID_PDF"
+    assert ok_first["stored_as"] == "policy.pdf"
+    assert ok_second["stored_as"] == "policy (1).pdf"
+    # Identical content: the second copy points at the first blob and its own is removed.
+    assert ok_second["deduplicated"] is True
+    assert deleted == [f"org_{org_id}/batch_2.pdf"]
+
+    with app.app_context():
+        docs = Document.query.filter_by(organization_id=org_id).order_by(Document.id).all()
+        assert [d.id for d in docs] == [ok_first["document_id"], ok_second["document_id"]]
+        assert {d.blob_name for d in docs} == {f"org_{org_id}/batch_0.pdf"}
+
+        from app.services.org_stats import get_org_stats
+
+        stats = get_org_stats(org_id)
+        assert stats.document_count == 2
+        assert stats.document_bytes == 2 * len(body)
+
+
+def test_document_listings_use_keyset_cursors(client, app, db_session, seed_org_user):
+    from datetime import datetime, timedelta
+
+    from app.models import Document, Organization
+    from app.services.keyset_pagination import decode_cursor
+    from tests.conftest import login
+
+    org_id, user_id, _membership_id = seed_org_user
+
+    with app.app_context():
+        other = Organization(name="Org B")
+        db_session.session.add(other)
+        db_session.session.flush()
+        base = datetime(2026, 1, 1, 12, 0, 0)
+        # Pairs of documents share a timestamp so the id tie-break is exercised.
+        for i in range(25):
+            db_session.session.add(Document(
+                filename=f"doc_{i:02d}.pdf", blob_name=f"b{i}", organization_id=org_id,
+                uploaded_by=user_id, uploaded_at=base + timedelta(minutes=i // 2), is_active=True,
+            ))
+        db_session.session.add(Document(filename="deleted.pdf", blob_name="x", organization_id=org_id,
+                                        uploaded_at=base, is_active=False))
+        db_session.session.add(Document(filename="other.pdf", blob_name="y", organization_id=other.id,
+                                        uploaded_at=base, is_active=True))
+        db_session.session.commit()
+        expected = [
+            d.filename
+            for d in Document.query.filter_by(organization_id=org_id, is_active=True)
+            .order_by(Document.uploaded_at.desc(), Document.id.desc())
+        ]
+    assert expected[0] == "doc_24.pdf" and len(expected) == 25
+
+    login(client)
+
+    def cursor_link(html, label):
+        import html as html_lib
+        import re
+
+        for match in re.finditer(r'href="([^"]*cursor=[^"]*)"[^>]*>\s*(?:<i[^>]*></i>)?\s*(\w+)', html):
+            if match.group(2) == label:
+                return html_lib.unescape(match.group(1))
+        return None
+
+    # Walk forward with "Older" links.
+    pages = []
+    url = "/evidence-repository?per_page=10"
+    while url:
+        resp = client.get(url)
+        assert resp.status_code == 200
+        body = resp.get_data(as_text=True)
+        assert "other.pdf" not in body and "deleted.pdf" not in body
+        pages.append(body)
+        url = cursor_link(body, "Older")
+    assert len(pages) == 3
+    seen = [name for body in pages for name in expected if f'title="{name}"' in body]
+    assert seen == expected
+
+    # And back again with "Newer" from the last page.
+    newer = cursor_link(pages[-1], "Newer")
+    assert newer and decode_cursor(newer.split("cursor=")[1].split("&")[0])[0] == "b"
+    body = client.get(newer).get_data(as_text=True)
+    assert [n for n in expected if f'title="{n}"' in body] == expected[10:20]
+
+    # documents() shares the listing; a garbage cursor falls back to the first page.
+    resp = client.get("/documents?per_page=10&cursor=not-a-cursor")
+    assert resp.status_code == 200
+    assert [n for n in expected if f'title="{n}"' in resp.get_data(as_text=True)] == expected[:10]
+
+
+def test_empty_upload_is_reported_as_empty_not_as_bad_signature(app):
+    from app.services.file_validation import FileValidationService
+
+    def upload(stream, content_type):
+        stream.read()
+        return {"success": True}
+
+    with app.app_context():
+        streamed = FileValidationService.validate_and_upload(io.BytesIO(b""), "empty.pdf", upload)
+        checked = FileValidationService.validate_file(io.BytesIO(b""), "empty.pdf")
+    assert streamed["error_code"] == checked["error_code"] == "EMPTY_FILE"
+    assert streamed["stage"] == "validation"